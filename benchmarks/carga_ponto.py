@@ -0,0 +1,118 @@
+"""Teste de carga do /registrar_ponto: várias batidas simultâneas em processos separados.
+
+Simula o pico das 8:00 contra um banco SQLite temporário (o app.db não é tocado). Cada
+funcionário dá um "toque duplo" no botão; ao final confere que cada um tem exatamente um
+registro em aberto e que nenhuma requisição falhou.
+
+Uso:
+    python benchmarks/carga_ponto.py --funcionarios 300 --processos 8 --threads 8
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+warnings.filterwarnings('ignore')
+
+
+def _importar_app():
+    from app import app
+    from interno import modelos
+    return app, modelos
+
+
+def _preparar_banco(total):
+    app, modulo = _importar_app()
+    from werkzeug.security import generate_password_hash
+    senha = generate_password_hash('senha', method='pbkdf2:sha256:1000') # Hash barato: o alvo aqui é a batida, não o login
+    with app.app_context():
+        modulo.db.create_all()
+        modulo.db.session.bulk_insert_mappings(modulo.Funcionario, [
+            {'username': f'func{i}', 'nome': f'Funcionário {i}', 'setor': 'Expedicao', 'data_nascimento': date(1990, 1, 1), 'nascimento_mes': 1, 'nascimento_dia': 1,
+             'password_hash': senha, 'role': 'user', 'horario_especial_09': False}
+            for i in range(total)])
+        modulo.db.session.commit()
+        modulo.db.engine.dispose()
+
+
+def _trabalhador(usuarios, threads, barreira, fila):
+    app, _ = _importar_app()
+    clientes = []
+    for usuario in usuarios:
+        cliente = app.test_client()
+        resposta = cliente.post('/login', data={'username': usuario, 'password': 'senha'})
+        if resposta.status_code != 302: fila.put(('erro_login', usuario, resposta.status_code)); return
+        clientes.append((usuario, cliente))
+
+    def toque_duplo(item):
+        usuario, cliente = item; resultados = []
+        for _ in range(2):
+            inicio = time.perf_counter(); resposta = cliente.post('/registrar_ponto'); duracao = time.perf_counter() - inicio
+            with cliente.session_transaction() as sessao: mensagens = sessao.pop('_flashes', [])
+            erro = resposta.status_code != 302 or any(categoria == 'danger' for categoria, _ in mensagens)
+            resultados.append((duracao, erro, [m for _, m in mensagens]))
+        return usuario, resultados
+
+    barreira.wait()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for usuario, resultados in executor.map(toque_duplo, clientes):
+            fila.put(('ok', usuario, resultados))
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))] if ordenados else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--funcionarios', type=int, default=300)
+    parser.add_argument('--processos', type=int, default=8)
+    parser.add_argument('--threads', type=int, default=8, help='Requisições simultâneas por processo.')
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix='carga_ponto_')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(pasta, 'carga.db')
+    _preparar_banco(args.funcionarios)
+
+    usuarios = [f'func{i}' for i in range(args.funcionarios)]
+    lotes = [usuarios[i::args.processos] for i in range(args.processos)]
+    contexto = mp.get_context('spawn'); barreira = contexto.Barrier(args.processos + 1); fila = contexto.Queue()
+    processos = [contexto.Process(target=_trabalhador, args=(lote, args.threads, barreira, fila)) for lote in lotes]
+    for p in processos: p.start()
+    barreira.wait(); inicio = time.perf_counter()
+
+    latencias = []; erros = []; ignoradas = 0
+    for _ in range(args.funcionarios):
+        tipo, usuario, dados = fila.get()
+        if tipo != 'ok': erros.append((usuario, dados)); continue
+        for duracao, erro, mensagens in dados:
+            latencias.append(duracao)
+            if erro: erros.append((usuario, mensagens))
+            if any('ignorada' in m for m in mensagens): ignoradas += 1
+    total = time.perf_counter() - inicio
+    for p in processos: p.join()
+
+    app, modulo = _importar_app()
+    with app.app_context():
+        db = modulo.db; RegistroPonto = modulo.RegistroPonto
+        por_funcionario = db.session.query(RegistroPonto.funcionario_id, db.func.count(), db.func.sum(db.case((RegistroPonto.timestamp_saida == None, 1), else_=0))).group_by(RegistroPonto.funcionario_id).all()
+    inconsistentes = [linha for linha in por_funcionario if linha[1] != 1 or linha[2] != 1]
+    faltando = args.funcionarios - len(por_funcionario)
+
+    print(f'Requisições: {len(latencias)} em {total:.2f}s ({len(latencias) / total:.1f} req/s) | {args.processos} processos x {args.threads} threads')
+    print(f'Latência: p50={_percentil(latencias, 50) * 1000:.1f}ms p95={_percentil(latencias, 95) * 1000:.1f}ms max={max(latencias, default=0) * 1000:.1f}ms')
+    print(f'Toques duplos ignorados: {ignoradas} | Erros: {len(erros)} | Funcionários com registros inconsistentes: {len(inconsistentes) + faltando}')
+    for erro in erros[:10]: print('  erro:', erro)
+    if erros or inconsistentes or faltando: sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
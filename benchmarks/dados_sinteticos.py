@@ -0,0 +1,117 @@
+"""Gera um banco SQLite compatível com o app.db, com dados sintéticos em escala configurável.
+
+Funcionários dos dois setores (grupos de sábado A/B, alguns com entrada às 09:00), anos de
+RegistroPonto seguindo a jornada esperada (com variação de alguns minutos), feriados nacionais,
+escala de limpeza gerada pelo próprio rodízio do app, avisos e o banco de horas (SaldoDiario)
+já calculado. Tudo é gravado com bulk insert; o resultado é determinístico para a mesma --semente.
+
+Usuários criados: "admin" (administrador) e "func0".."funcN-1", todos com a senha "senha".
+
+Uso:
+    python benchmarks/dados_sinteticos.py --funcionarios 50 --anos 2 --saida /tmp/bench.db
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import warnings
+from datetime import date, datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+warnings.filterwarnings('ignore')
+
+SENHA = 'senha'
+FERIADOS_FIXOS = [((1, 1), 'Confraternização Universal'), ((4, 21), 'Tiradentes'), ((5, 1), 'Dia do Trabalho'), ((9, 7), 'Independência'),
+                  ((10, 12), 'Nossa Senhora Aparecida'), ((11, 2), 'Finados'), ((11, 15), 'Proclamação da República'), ((12, 25), 'Natal')]
+LOTE = 10000
+
+
+def _inserir_em_lotes(modelo, linhas):
+    from interno.extensoes import db
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= LOTE: db.session.bulk_insert_mappings(modelo, lote); lote.clear()
+    if lote: db.session.bulk_insert_mappings(modelo, lote)
+
+
+def _registros(funcionarios, inicio, fim, feriados, aleatorio):
+    """Duas batidas por dia esperado de trabalho (manhã/tarde), com alguns minutos de variação."""
+    from interno.jornada import CalendarioJornada
+    calendario_jornada = CalendarioJornada(inicio, fim); dias = [inicio + timedelta(days=n) for n in range((fim - inicio).days + 1)]
+    for funcionario in funcionarios:
+        for dia in dias:
+            esperado = calendario_jornada.esperado(funcionario, dia)
+            if dia in feriados or not esperado: continue
+            entrada = datetime.combine(dia, datetime.min.time()) + timedelta(hours=9 if funcionario.horario_especial_09 else 8, minutes=aleatorio.randint(-10, 10))
+            if esperado <= timedelta(hours=5):
+                yield {'funcionario_id': funcionario.id, 'timestamp_entrada': entrada, 'timestamp_saida': entrada + esperado + timedelta(minutes=aleatorio.randint(-5, 15))}
+                continue
+            almoco = entrada + timedelta(hours=4); volta = almoco + timedelta(hours=1, minutes=aleatorio.randint(-5, 5))
+            yield {'funcionario_id': funcionario.id, 'timestamp_entrada': entrada, 'timestamp_saida': almoco}
+            yield {'funcionario_id': funcionario.id, 'timestamp_entrada': volta, 'timestamp_saida': volta + (esperado - timedelta(hours=4)) + timedelta(minutes=aleatorio.randint(-10, 20))}
+
+
+def gerar_banco(funcionarios=50, anos=1, avisos=200, semente=42, fim=None):
+    """Popula o banco apontado por DATABASE_URL (que deve estar vazio). Retorna um resumo com as contagens."""
+    from interno import create_app
+    from interno.escala import gravar_escala, planejar_escala
+    from interno.extensoes import db
+    from interno.jornada import calcular_saldos_completos
+    from interno.modelos import Aviso, Feriado, Funcionario, RegistroPonto, SaldoDiario
+    app = create_app(); aleatorio = random.Random(semente)
+    fim = fim or date.today() - timedelta(days=1); inicio = date(fim.year - anos, fim.month, min(fim.day, 28)) + timedelta(days=1)
+    from werkzeug.security import generate_password_hash
+    with app.app_context():
+        db.create_all()
+        senha = generate_password_hash(SENHA, method=app.config['PASSWORD_HASH_METHOD']) # Um hash só: o custo do scrypt não interessa aqui
+        pessoas = [{'username': 'admin', 'nome': 'Administrador', 'setor': 'Escritorio', 'role': 'admin', 'grupo_sabado': None, 'horario_especial_09': False, 'data_nascimento': date(1980, 6, 15)}]
+        for i in range(funcionarios):
+            nascimento = date(1970, 1, 1) + timedelta(days=aleatorio.randint(0, 365 * 35))
+            pessoas.append({'username': f'func{i}', 'nome': f'Funcionário {i:05d}', 'setor': 'Escritorio' if i % 3 == 0 else 'Expedicao', 'role': 'user',
+                            'grupo_sabado': 'AB'[i % 2], 'horario_especial_09': i % 10 == 0, 'data_nascimento': nascimento})
+        for pessoa in pessoas: pessoa.update(password_hash=senha, nascimento_mes=pessoa['data_nascimento'].month, nascimento_dia=pessoa['data_nascimento'].day)
+        db.session.bulk_insert_mappings(Funcionario, pessoas)
+
+        feriados = {date(ano, mes, dia): nome for ano in range(inicio.year, fim.year + 2) for (mes, dia), nome in FERIADOS_FIXOS}
+        db.session.bulk_insert_mappings(Feriado, [{'data': d, 'nome': nome} for d, nome in feriados.items()])
+        db.session.bulk_insert_mappings(Aviso, [{'titulo': f'Aviso {i}', 'conteudo': f'Conteúdo do aviso {i}. ' * 5,
+                                                        'data_postagem': datetime.combine(inicio, datetime.min.time()) + timedelta(hours=aleatorio.randint(0, max(1, (fim - inicio).days * 24)))} for i in range(avisos)])
+        db.session.commit()
+
+        lista_funcionarios = Funcionario.query.filter(Funcionario.role == 'user').all()
+        _inserir_em_lotes(RegistroPonto, _registros(lista_funcionarios, inicio, fim, feriados, aleatorio))
+        db.session.commit()
+
+        escalas = 0; passo = app.config['ESCALA_MAX_DIAS_GERACAO'] - 1; dia = inicio
+        while dia <= fim + timedelta(days=60): # Inclui dois meses de escala futura
+            plano, _, erro = planejar_escala(dia, min(dia + timedelta(days=passo), fim + timedelta(days=60)))
+            if erro: raise RuntimeError(erro)
+            gravar_escala(plano); db.session.commit(); escalas += len(plano); dia += timedelta(days=passo + 1)
+
+        calculados = calcular_saldos_completos()
+        _inserir_em_lotes(SaldoDiario, ({'funcionario_id': f_id, 'data': dia, 'trabalhado_segundos': t, 'esperado_segundos': e, 'saldo_segundos': t - e} for (f_id, dia), (t, e) in calculados.items()))
+        db.session.commit()
+        resumo = {'funcionarios': len(pessoas), 'registros_ponto': RegistroPonto.query.count(), 'feriados': len(feriados), 'escalas': escalas, 'avisos': avisos, 'dias_saldo': len(calculados), 'inicio': inicio.isoformat(), 'fim': fim.isoformat()}
+        db.engine.dispose()
+    return resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--funcionarios', type=int, default=50)
+    parser.add_argument('--anos', type=int, default=1, help='Anos de histórico de ponto (até ontem).')
+    parser.add_argument('--avisos', type=int, default=200)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--saida', required=True, help='Arquivo .db a criar (não pode existir).')
+    args = parser.parse_args()
+    if os.path.exists(args.saida): parser.error(f'{args.saida} já existe.')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.abspath(args.saida)
+    inicio = time.perf_counter(); resumo = gerar_banco(args.funcionarios, args.anos, args.avisos, args.semente)
+    print(f'Banco gerado em {args.saida} ({time.perf_counter() - inicio:.1f}s): ' + ', '.join(f'{chave}={valor}' for chave, valor in resumo.items()))
+
+
+if __name__ == '__main__':
+    main()
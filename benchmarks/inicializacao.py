@@ -0,0 +1,145 @@
+"""Tempo de inicialização e memória por worker do gunicorn, com e sem preload_app.
+
+Sobe o gunicorn (gunicorn.conf.py, se existir) contra uma cópia de um banco sintético, espera
+todos os workers responderem, faz algumas requisições logadas em todas as páginas principais (para
+cada worker carregar templates, mapeamentos do ORM e caches) e lê /proc/<pid>/smaps_rollup:
+
+- RSS: memória residente do processo (conta as páginas compartilhadas em todos os workers);
+- PSS: páginas compartilhadas divididas entre quem as usa. A soma do PSS do master e dos workers
+  é a memória real ocupada pelo servidor;
+- USS: páginas só daquele processo (o que se ganha de volta ao matar um worker).
+
+Também mede o tempo de "import app" em processos novos (o que cada worker paga sem preload).
+Só funciona no Linux (gunicorn e /proc).
+
+Uso:
+    python benchmarks/inicializacao.py --workers 4
+    python benchmarks/inicializacao.py --workers 4 --sem-preload --resultado sem_preload.json
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGINAS = ['/', '/calendario', '/limpeza', '/ponto', '/admin/ponto', '/admin/funcionarios', '/admin/escala']
+
+
+def _tempo_import(ambiente, repeticoes):
+    codigo = 'import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)'
+    tempos = [float(subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, env=ambiente, capture_output=True, text=True, check=True).stdout.strip().splitlines()[-1]) for _ in range(repeticoes)]
+    return statistics.median(tempos)
+
+
+def _filhos(pid):
+    filhos = []
+    for nome in os.listdir('/proc'):
+        if not nome.isdigit(): continue
+        try:
+            with open(f'/proc/{nome}/stat') as arquivo: campos = arquivo.read().rsplit(')', 1)[1].split()
+        except OSError: continue
+        if int(campos[1]) == pid: filhos.append(int(nome))
+    return sorted(filhos)
+
+
+def _memoria(pid):
+    """{'rss', 'pss', 'uss'} em KiB, de /proc/<pid>/smaps_rollup."""
+    valores = {}
+    with open(f'/proc/{pid}/smaps_rollup') as arquivo:
+        for linha in arquivo:
+            partes = linha.split()
+            if len(partes) >= 2 and partes[0].endswith(':') and partes[1].isdigit(): valores[partes[0][:-1]] = int(partes[1])
+    return {'rss': valores.get('Rss', 0), 'pss': valores.get('Pss', 0), 'uss': valores.get('Private_Clean', 0) + valores.get('Private_Dirty', 0)}
+
+
+def _cliente(base, usuario, senha):
+    abridor = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+    abridor.open(base + '/login', data=urllib.parse.urlencode({'username': usuario, 'password': senha}).encode(), timeout=30).read()
+    return abridor
+
+
+def _aquecer(base, threads, requisicoes):
+    erros = []; contador = iter(range(requisicoes)); lock = threading.Lock()
+    def trabalhar():
+        try: cliente = _cliente(base, 'admin', 'senha')
+        except (urllib.error.URLError, OSError) as e: erros.append(str(e)); return
+        while True:
+            with lock: n = next(contador, None)
+            if n is None: return
+            try: cliente.open(base + PAGINAS[n % len(PAGINAS)], timeout=30).read()
+            except (urllib.error.URLError, OSError) as e: erros.append(str(e))
+    lista = [threading.Thread(target=trabalhar) for _ in range(threads)]
+    for t in lista: t.start()
+    for t in lista: t.join()
+    return erros
+
+
+def medir(banco, workers, preload, requisicoes, porta):
+    pasta = tempfile.mkdtemp(prefix='inicializacao_'); copia = os.path.join(pasta, 'bench.db'); shutil.copy(banco, copia)
+    ambiente = dict(os.environ, DATABASE_URL='sqlite:///' + copia, GUNICORN_PRELOAD='1' if preload else '0', WEB_CONCURRENCY=str(workers), PYTHONWARNINGS='ignore')
+    comando = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{porta}', '--workers', str(workers), '--log-level', 'warning']
+    if os.path.exists(os.path.join(RAIZ, 'gunicorn.conf.py')): comando[3:3] = ['-c', 'gunicorn.conf.py']
+    elif preload: comando.append('--preload')
+    comando.append('app:app')
+    base = f'http://127.0.0.1:{porta}'; inicio = time.perf_counter()
+    servidor = subprocess.Popen(comando, cwd=RAIZ, env=ambiente)
+    try:
+        while True:
+            if servidor.poll() is not None: raise RuntimeError('gunicorn terminou durante a inicialização.')
+            if time.perf_counter() - inicio > 120: raise RuntimeError('gunicorn não respondeu em 120s.')
+            if len(_filhos(servidor.pid)) >= workers:
+                try:
+                    if urllib.request.urlopen(base + '/login', timeout=5).status == 200: break
+                except (urllib.error.URLError, OSError): pass
+            time.sleep(0.02)
+        inicializacao = time.perf_counter() - inicio
+        erros = _aquecer(base, workers * 2, requisicoes); time.sleep(0.5)
+        master = _memoria(servidor.pid); por_worker = [_memoria(pid) for pid in _filhos(servidor.pid)]
+    finally:
+        servidor.send_signal(signal.SIGTERM); servidor.wait(timeout=30); shutil.rmtree(pasta, ignore_errors=True)
+    media = {chave: statistics.mean(m[chave] for m in por_worker) for chave in ('rss', 'pss', 'uss')}
+    return {'preload': preload, 'workers': len(por_worker), 'inicializacao_s': inicializacao, 'erros': len(erros), 'master': master, 'media_worker': media,
+            'pss_total': master['pss'] + sum(m['pss'] for m in por_worker), 'tempo_import_s': _tempo_import(ambiente, 5)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--sem-preload', action='store_true', help='Cada worker importa o app depois do fork.')
+    parser.add_argument('--requisicoes', type=int, default=400, help='Requisições de aquecimento (divididas entre os workers).')
+    parser.add_argument('--banco', help='Banco gerado por dados_sinteticos.py (é copiado). Sem ele, gera um pequeno.')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--resultado', help='Arquivo JSON onde gravar o resultado.')
+    args = parser.parse_args()
+
+    pasta = None; banco = args.banco
+    if not banco:
+        pasta = tempfile.mkdtemp(prefix='inicializacao_banco_'); banco = os.path.join(pasta, 'bench.db')
+        subprocess.run([sys.executable, os.path.join(RAIZ, 'benchmarks', 'dados_sinteticos.py'), '--funcionarios', '30', '--anos', '1', '--saida', banco], check=True, stdout=subprocess.DEVNULL)
+    try: resultado = medir(banco, args.workers, not args.sem_preload, args.requisicoes, args.porta)
+    finally:
+        if pasta: shutil.rmtree(pasta, ignore_errors=True)
+
+    media = resultado['media_worker']
+    print(f"preload={'sim' if resultado['preload'] else 'não'} | {resultado['workers']} workers | erros nas requisições: {resultado['erros']}")
+    print(f"Import do app: {resultado['tempo_import_s'] * 1000:.0f} ms | até todos os workers responderem: {resultado['inicializacao_s'] * 1000:.0f} ms")
+    print(f"Por worker (média): RSS {media['rss'] / 1024:.1f} MiB | PSS {media['pss'] / 1024:.1f} MiB | USS {media['uss'] / 1024:.1f} MiB")
+    print(f"Master: RSS {resultado['master']['rss'] / 1024:.1f} MiB | PSS total (master + workers): {resultado['pss_total'] / 1024:.1f} MiB")
+    if args.resultado:
+        with open(args.resultado, 'w', encoding='utf-8') as arquivo: json.dump(resultado, arquivo, indent=2)
+    if resultado['erros']: sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
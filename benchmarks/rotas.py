@@ -0,0 +1,224 @@
+"""Benchmark de todas as rotas: latência (p50/p95/p99), nº de consultas SQL e pico de memória por rota.
+
+Gera um banco sintético (benchmarks/dados_sinteticos.py) numa pasta temporária, ou usa uma cópia de
+--banco, e chama cada rota pelo test client do Flask como usuário comum ou administrador. Rotas que
+gravam (batida, CRUD do admin) recebem dados novos a cada repetição, preparados fora da medição.
+
+O resultado é gravado em JSON (--resultado). Com --base, compara com uma execução anterior e sai
+com código 1 se alguma rota regrediu: mais consultas SQL que a base (ex.: um N+1 no /admin/ponto),
+p95 acima de --limite-latencia, ou pico de memória acima de --limite-memoria.
+
+Uso:
+    python benchmarks/rotas.py --funcionarios 50 --anos 2 --resultado base.json
+    python benchmarks/rotas.py --funcionarios 50 --anos 2 --resultado atual.json --base base.json
+    python benchmarks/rotas.py --comparar base.json atual.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import date, datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+warnings.filterwarnings('ignore')
+
+
+def _importar_app():
+    """(app, módulo com os modelos e o db), importados só depois de DATABASE_URL apontar para o banco do benchmark."""
+    from app import app
+    from interno import modelos
+    return app, modelos
+
+
+# --- Cenários ---
+# Cada cenário: (nome, cliente, método, preparar). preparar(modulo, n) roda fora da medição e
+# devolve (url, kwargs do test client); n é o número da repetição, para gerar dados únicos.
+def _fixo(url, **kwargs):
+    return lambda modulo, n: (url, kwargs)
+
+
+def _primeiro_registro(modulo):
+    return modulo.RegistroPonto.query.order_by(modulo.RegistroPonto.id).first()
+
+
+def _novo(modulo, objeto):
+    modulo.db.session.add(objeto); modulo.db.session.commit(); return objeto.id
+
+
+def _data_futura(n):
+    return date.today() + timedelta(days=3650 + n)
+
+
+def cenarios():
+    return [
+        ('GET /login', 'anonimo', 'get', _fixo('/login')),
+        ('POST /login', 'anonimo', 'post', _fixo('/login', data={'username': 'func1', 'password': 'senha'})),
+        ('GET /logout', 'sessao', 'get', _fixo('/logout')),
+        ('GET /sw.js', 'anonimo', 'get', _fixo('/sw.js')),
+        ('GET /offline', 'anonimo', 'get', _fixo('/offline')),
+        ('GET /', 'usuario', 'get', _fixo('/')),
+        ('GET /limpeza', 'usuario', 'get', _fixo('/limpeza')),
+        ('GET /calendario', 'usuario', 'get', _fixo('/calendario')),
+        ('GET /ponto', 'usuario', 'get', _fixo('/ponto')),
+        ('POST /registrar_ponto', 'usuario', 'post', _fixo('/registrar_ponto')),
+        ('POST /ponto/sincronizar', 'usuario', 'post', lambda modulo, n: ('/ponto/sincronizar', {'json': {'batidas': [{'id': f'bench-{time.time_ns()}-{n}', 'capturado_em': (datetime.utcnow() - timedelta(hours=1, seconds=n)).isoformat() + 'Z'}]}})),
+        ('GET /admin', 'admin', 'get', _fixo('/admin')),
+        ('GET /admin/funcionarios', 'admin', 'get', _fixo('/admin/funcionarios')),
+        ('GET /admin/novo_funcionario', 'admin', 'get', _fixo('/admin/novo_funcionario')),
+        ('POST /admin/novo_funcionario', 'admin', 'post', lambda modulo, n: ('/admin/novo_funcionario', {'data': {'username': f'bench{time.time_ns()}', 'password': 'senha', 'nome': f'Bench {n}', 'setor': 'Expedicao', 'data_nascimento': '1990-01-01', 'role': 'user', 'grupo_sabado': 'A', 'horario_especial_09': 'False'}})),
+        ('POST /admin/funcionario/delete', 'admin', 'post', lambda modulo, n: (f"/admin/funcionario/delete/{_novo(modulo, modulo.Funcionario(username=f'apagar{time.time_ns()}', nome='Apagar', setor='Expedicao', data_nascimento=date(1990, 1, 1), password_hash='x'))}", {})),
+        ('GET /admin/metrics', 'admin', 'get', _fixo('/admin/metrics', headers={'Accept': 'text/html'})),
+        ('GET /admin/metrics (Prometheus)', 'admin', 'get', _fixo('/admin/metrics', query_string={'formato': 'texto'})),
+        ('GET /admin/novo_aviso', 'admin', 'get', _fixo('/admin/novo_aviso')),
+        ('POST /admin/novo_aviso', 'admin', 'post', lambda modulo, n: ('/admin/novo_aviso', {'data': {'titulo': f'Bench {n}', 'conteudo': 'Aviso do benchmark.'}})),
+        ('POST /admin/aviso/delete', 'admin', 'post', lambda modulo, n: (f"/admin/aviso/delete/{_novo(modulo, modulo.Aviso(titulo='Apagar', conteudo='x'))}", {})),
+        ('GET /admin/escala', 'admin', 'get', _fixo('/admin/escala')),
+        ('POST /admin/escala', 'admin', 'post', lambda modulo, n: ('/admin/escala', {'data': {'data_escala': _data_futura(n).isoformat(), 'funcionario_escritorio': '2', 'funcionario_expedicao': '3'}})),
+        ('POST /admin/escala/gerar (prévia)', 'admin', 'post', _fixo('/admin/escala/gerar', data={'inicio': _data_futura(1000).isoformat(), 'fim': _data_futura(1090).isoformat(), 'acao': 'previa'})),
+        ('POST /admin/escala/delete', 'admin', 'post', lambda modulo, n: (f"/admin/escala/delete/{_novo(modulo, modulo.EscalaLimpeza(data_escala=_data_futura(2000 + n), funcionario_escritorio_id=2, funcionario_expedicao_id=3))}", {})),
+        ('GET /admin/ponto', 'admin', 'get', _fixo('/admin/ponto')),
+        ('GET /admin/ponto (1 ano)', 'admin', 'get', lambda modulo, n: ('/admin/ponto', {'query_string': {'start_date': (date.today() - timedelta(days=365)).isoformat(), 'end_date': date.today().isoformat()}})),
+        ('GET /admin/ponto/exportar', 'admin', 'get', _fixo('/admin/ponto/exportar', query_string={'tipo': 'resumo', 'formato': 'csv'})),
+        ('GET /admin/ponto/saldos (1 ano, mes)', 'admin', 'get', lambda modulo, n: ('/admin/ponto/saldos', {'query_string': {'formato': 'json', 'start_date': (date.today() - timedelta(days=365)).isoformat(), 'end_date': date.today().isoformat()}})),
+        ('GET /admin/ponto/saldos (semana)', 'admin', 'get', lambda modulo, n: ('/admin/ponto/saldos', {'query_string': {'agrupamento': 'semana', 'start_date': (date.today() - timedelta(days=90)).isoformat(), 'end_date': date.today().isoformat()}})),
+        ('GET /admin/presenca', 'admin', 'get', _fixo('/admin/presenca')),
+        ('GET /admin/presenca/stream (1º evento)', 'admin', 'get', _fixo('/admin/presenca/stream')),
+        ('GET /admin/ponto/espelhos', 'admin', 'get', lambda modulo, n: ('/admin/ponto/espelhos', {'query_string': {'mes': (date.today().replace(day=1) - timedelta(days=1)).strftime('%Y-%m')}})),
+        ('GET /admin/ponto/add', 'admin', 'get', _fixo('/admin/ponto/add')),
+        ('POST /admin/ponto/add', 'admin', 'post', lambda modulo, n: ('/admin/ponto/add', {'data': {'funcionario_id': '2', 'data': (date.today() - timedelta(days=800 + n)).isoformat(), 'entrada': '08:00', 'saida': '12:00'}})),
+        ('GET /admin/ponto/edit', 'admin', 'get', lambda modulo, n: (f'/admin/ponto/edit/{_primeiro_registro(modulo).id}', {})),
+        ('POST /admin/ponto/edit', 'admin', 'post', lambda modulo, n: (f'/admin/ponto/edit/{_primeiro_registro(modulo).id}', {'data': {'funcionario_id': str(_primeiro_registro(modulo).funcionario_id), 'data': _primeiro_registro(modulo).timestamp_entrada.date().isoformat(), 'entrada': '08:00', 'saida': f'12:{n % 60:02d}'}})),
+        ('POST /admin/ponto/delete', 'admin', 'post', lambda modulo, n: (f"/admin/ponto/delete/{_novo(modulo, modulo.RegistroPonto(funcionario_id=2, timestamp_entrada=datetime.utcnow() - timedelta(days=900), timestamp_saida=datetime.utcnow() - timedelta(days=900) + timedelta(hours=1)))}", {})),
+        ('GET /admin/calendario', 'admin', 'get', _fixo('/admin/calendario')),
+        ('POST /admin/calendario', 'admin', 'post', lambda modulo, n: ('/admin/calendario', {'data': {'data_feriado': _data_futura(3000 + n).isoformat(), 'nome_feriado': f'Bench {n}'}})),
+        ('POST /admin/feriado/delete', 'admin', 'post', lambda modulo, n: (f"/admin/feriado/delete/{_novo(modulo, modulo.Feriado(data=_data_futura(4000 + n), nome='Apagar'))}", {})),
+    ]
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))] if ordenados else 0
+
+
+class ContadorConsultas:
+    """Conta os comandos SQL executados (evento before_cursor_execute do engine)."""
+    def __init__(self, engine):
+        self.total = 0
+        from sqlalchemy import event
+        event.listen(engine, 'before_cursor_execute', self._antes)
+
+    def _antes(self, *args, **kwargs): self.total += 1
+
+
+def _logar(cliente, usuario):
+    resposta = cliente.post('/login', data={'username': usuario, 'password': 'senha'})
+    if resposta.status_code != 302: raise RuntimeError(f'Login de {usuario} falhou ({resposta.status_code}).')
+
+
+def _ler_corpo(resposta):
+    """Lê a resposta inteira; de um stream SSE (que só termina depois de minutos), só até o primeiro evento."""
+    if resposta.mimetype != 'text/event-stream': return b''.join(resposta.response) if resposta.is_streamed else resposta.get_data()
+    corpo = b''
+    for pedaco in resposta.iter_encoded():
+        corpo += pedaco
+        if b'event:' in pedaco: break
+    resposta.close() # Fecha o gerador e libera a vaga do semáforo, como o servidor faz quando o cliente desconecta
+    return corpo
+
+
+def executar(app, modulo, repeticoes):
+    app.config['PONTO_JANELA_DUPLICIDADE_SEGUNDOS'] = 0 # Cada repetição da batida alterna entrada/saída
+    with app.app_context(): contador = ContadorConsultas(modulo.db.engine)
+    clientes = {'anonimo': app.test_client(), 'usuario': app.test_client(), 'admin': app.test_client(), 'sessao': app.test_client()}
+    _logar(clientes['usuario'], 'func1'); _logar(clientes['admin'], 'admin')
+    resultados = {}
+    for nome, tipo_cliente, metodo, preparar in cenarios():
+        cliente = clientes[tipo_cliente]; latencias = []; consultas = []; status = set(); pico = 0
+        # Repetição 0 aquece (templates, caches); a última roda sob tracemalloc, que deixa tudo mais lento
+        for n in range(repeticoes + 2):
+            if tipo_cliente == 'sessao': _logar(cliente, 'func2')
+            with app.app_context(): url, kwargs = preparar(modulo, n)
+            medir_memoria = n == repeticoes + 1
+            if medir_memoria: tracemalloc.start()
+            consultas_antes = contador.total; inicio = time.perf_counter()
+            resposta = getattr(cliente, metodo)(url, **kwargs); _ler_corpo(resposta)
+            duracao = time.perf_counter() - inicio
+            if medir_memoria: pico = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+            elif n > 0: latencias.append(duracao); consultas.append(contador.total - consultas_antes)
+            status.add(resposta.status_code)
+            with cliente.session_transaction() as sessao: sessao.pop('_flashes', None)
+            if tipo_cliente == 'anonimo' and metodo == 'post': cliente.get('/logout')
+        resultados[nome] = {'p50_ms': round(_percentil(latencias, 50) * 1000, 2), 'p95_ms': round(_percentil(latencias, 95) * 1000, 2), 'p99_ms': round(_percentil(latencias, 99) * 1000, 2),
+                            'consultas': int(statistics.median(consultas)), 'consultas_max': max(consultas), 'pico_memoria_kb': round(pico / 1024, 1), 'status': sorted(status), 'repeticoes': len(latencias)}
+        erro = any(codigo >= 400 for codigo in status)
+        print(f"{nome:<38} p50={resultados[nome]['p50_ms']:>8.2f}ms p95={resultados[nome]['p95_ms']:>8.2f}ms p99={resultados[nome]['p99_ms']:>8.2f}ms "
+              f"sql={resultados[nome]['consultas']:>3} mem={resultados[nome]['pico_memoria_kb']:>8.1f}KB status={sorted(status)}{'  <-- ERRO' if erro else ''}")
+    return resultados
+
+
+def comparar(base, atual, limite_latencia, limite_memoria, folga_ms, limite_consultas):
+    """Lista as regressões de `atual` em relação a `base` (dicts como os gravados em --resultado)."""
+    regressoes = []
+    if base.get('parametros') != atual.get('parametros'): print(f"Aviso: parâmetros diferentes (base={base.get('parametros')}, atual={atual.get('parametros')}); a comparação pode não ser justa.")
+    for nome, antes in base['rotas'].items():
+        agora = atual['rotas'].get(nome)
+        if agora is None: regressoes.append(f'{nome}: rota não medida na execução atual'); continue
+        if agora['consultas'] > antes['consultas'] + limite_consultas: regressoes.append(f"{nome}: consultas SQL {antes['consultas']} -> {agora['consultas']}")
+        if agora['p95_ms'] > antes['p95_ms'] * (1 + limite_latencia) and agora['p95_ms'] - antes['p95_ms'] > folga_ms: regressoes.append(f"{nome}: p95 {antes['p95_ms']:.2f}ms -> {agora['p95_ms']:.2f}ms")
+        if agora['pico_memoria_kb'] > antes['pico_memoria_kb'] * (1 + limite_memoria) and agora['pico_memoria_kb'] - antes['pico_memoria_kb'] > 256: regressoes.append(f"{nome}: pico de memória {antes['pico_memoria_kb']:.0f}KB -> {agora['pico_memoria_kb']:.0f}KB")
+        if any(codigo >= 400 for codigo in agora['status']) and not any(codigo >= 400 for codigo in antes['status']): regressoes.append(f"{nome}: status {antes['status']} -> {agora['status']}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--funcionarios', type=int, default=50)
+    parser.add_argument('--anos', type=int, default=1)
+    parser.add_argument('--banco', help='Banco já gerado por dados_sinteticos.py (é copiado; o original não é alterado).')
+    parser.add_argument('--repeticoes', type=int, default=20, help='Requisições medidas por rota.')
+    parser.add_argument('--resultado', help='Arquivo JSON onde gravar o resultado.')
+    parser.add_argument('--base', help='Resultado anterior para comparar; sai com código 1 se houver regressão.')
+    parser.add_argument('--comparar', nargs=2, metavar=('BASE', 'ATUAL'), help='Apenas compara dois resultados já gravados.')
+    parser.add_argument('--limite-latencia', type=float, default=0.25, help='Aumento relativo tolerado no p95 (0.25 = 25%%).')
+    parser.add_argument('--folga-ms', type=float, default=2.0, help='Diferença absoluta de p95 abaixo da qual não há regressão (ruído).')
+    parser.add_argument('--limite-memoria', type=float, default=0.5, help='Aumento relativo tolerado no pico de memória.')
+    parser.add_argument('--limite-consultas', type=int, default=0, help='Consultas SQL a mais toleradas por requisição.')
+    args = parser.parse_args()
+    limites = (args.limite_latencia, args.limite_memoria, args.folga_ms, args.limite_consultas)
+
+    if args.comparar:
+        with open(args.comparar[0], encoding='utf-8') as arquivo: base = json.load(arquivo)
+        with open(args.comparar[1], encoding='utf-8') as arquivo: atual = json.load(arquivo)
+    else:
+        pasta = tempfile.mkdtemp(prefix='bench_rotas_'); caminho = os.path.join(pasta, 'bench.db')
+        os.environ['DATABASE_URL'] = 'sqlite:///' + caminho
+        if args.banco: shutil.copyfile(args.banco, caminho); parametros = {'banco': os.path.basename(args.banco)}
+        else:
+            import dados_sinteticos
+            print('Gerando dados:', dados_sinteticos.gerar_banco(args.funcionarios, args.anos)); parametros = {'funcionarios': args.funcionarios, 'anos': args.anos}
+        parametros['repeticoes'] = args.repeticoes
+        atual = {'parametros': parametros, 'data': datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(), 'rotas': executar(*_importar_app(), args.repeticoes)}
+        if args.resultado:
+            with open(args.resultado, 'w', encoding='utf-8') as arquivo: json.dump(atual, arquivo, indent=2, ensure_ascii=False)
+            print(f'Resultado gravado em {args.resultado}.')
+        shutil.rmtree(pasta, ignore_errors=True)
+        if not args.base: return
+        with open(args.base, encoding='utf-8') as arquivo: base = json.load(arquivo)
+
+    regressoes = comparar(base, atual, *limites)
+    for regressao in regressoes: print('REGRESSÃO', regressao)
+    if regressoes: sys.exit(1)
+    print('Nenhuma regressão em relação à base.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""Configuração do gunicorn (Linux): gunicorn -c gunicorn.conf.py
+
+Com preload_app o master importa o app e o aquece (templates, ORM, hashes) uma vez, antes do fork;
+os workers herdam essas páginas de memória em copy-on-write em vez de cada um montar as suas.
+Variáveis de ambiente: GUNICORN_BIND, WEB_CONCURRENCY (nº de workers), GUNICORN_THREADS e GUNICORN_PRELOAD=0 para desligar o preload."""
+import gc
+import multiprocessing
+import os
+
+wsgi_app = 'app:app'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8))) # SQLite tem um escritor por vez: mais workers não ajudam nas batidas
+# Threads por worker (gthread): cada quadro de presença aberto (SSE) ocupa uma enquanto conectado, até PRESENCA_MAX_CONEXOES
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+
+def when_ready(server):
+    # Roda no master depois do preload e antes de criar os workers
+    if not preload_app: return
+    from app import app
+    from interno import aquecer
+    aquecer(app)
+    # Objetos que já existem vão para a geração permanente: o coletor não encosta neles nos workers,
+    # e as páginas que os guardam continuam compartilhadas (sem isso o GC "suja" as páginas e força a cópia)
+    gc.freeze()
+
+def post_fork(server, worker):
+    if not preload_app: return
+    # Conexões do pool nunca podem ser compartilhadas entre processos; close=False não fecha as do master
+    from app import app
+    from interno.extensoes import db
+    with app.app_context():
+        for engine in db.engines.values(): engine.dispose(close=False)
@@ -0,0 +1,49 @@
+import sqlite3
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.orm import configure_mappers
+from . import cache, metricas
+from .comandos import bp as comandos_bp
+from .config import RAIZ, carregar_configuracao
+from .estado import estado
+from .extensoes import db, login_manager
+from .modelos import prefixo_hash
+from .rotas import BLUEPRINTS
+from .util import format_timedelta
+
+def _configurar_sqlite(app, engine):
+    @event.listens_for(engine, 'connect')
+    def _pragmas(dbapi_connection, connection_record):
+        if not isinstance(dbapi_connection, sqlite3.Connection): return
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={app.config['SQLITE_JOURNAL_MODE']}")
+        cursor.execute(f"PRAGMA busy_timeout={int(app.config['SQLITE_BUSY_TIMEOUT_MS'])}")
+        cursor.execute(f"PRAGMA synchronous={app.config['SQLITE_SYNCHRONOUS']}")
+        cursor.execute(f"PRAGMA cache_size={int(app.config['SQLITE_CACHE_SIZE'])}")
+        cursor.close()
+
+def create_app(config=None):
+    """Cria o app: configuração (padrões < ambiente < `config`), extensões, blueprints e comandos de CLI.
+
+    Só registra o que é preciso; caches, hashes e templates são montados no primeiro uso
+    (ou de uma vez por aquecer(), no master do gunicorn com preload_app)."""
+    app = Flask(__name__, root_path=RAIZ)
+    carregar_configuracao(app, config)
+    db.init_app(app); login_manager.init_app(app)
+    with app.app_context(): engines = list(db.engines.values()) # Criadas pelo init_app; nenhuma conexão é aberta aqui
+    for engine in engines: _configurar_sqlite(app, engine)
+    metricas.init_app(app, engines); cache.init_app(app)
+    app.add_template_filter(format_timedelta)
+    for blueprint in BLUEPRINTS: app.register_blueprint(blueprint)
+    app.register_blueprint(comandos_bp)
+    return app
+
+def aquecer(app):
+    """Faz antes do fork o que cada worker faria na primeira requisição, para as páginas ficarem compartilhadas.
+
+    Compila todos os templates, configura os mapeamentos do ORM, calcula os hashes dos estáticos e o
+    prefixo do hash de senha. Não abre conexão com o banco (conexões não podem atravessar o fork)."""
+    with app.app_context():
+        configure_mappers(); estado(app); prefixo_hash(app.config['PASSWORD_HASH_METHOD'])
+        for nome in app.jinja_env.list_templates(): app.jinja_env.get_template(nome)
+        for nome in cache.arquivos_estaticos(): cache.hash_estatico(nome)
@@ -0,0 +1,109 @@
+import hashlib
+import os
+import time
+from datetime import date, datetime, timezone
+from functools import wraps
+from flask import current_app, has_app_context, make_response, request, session, url_for
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from .estado import estado
+from .extensoes import db
+from .modelos import VersaoCache
+
+# --- Cache de Páginas e GET Condicional ---
+def versoes_cache():
+    """{namespace: (versao, modificado_em)}, relido do banco a cada CACHE_VERSOES_TTL_SEGUNDOS."""
+    versoes = estado().versoes; agora = time.monotonic(); lido_em = versoes['lido_em']
+    if lido_em is None or agora - lido_em > current_app.config['CACHE_VERSOES_TTL_SEGUNDOS']:
+        versoes['versoes'] = {v.namespace: (v.versao, v.modificado_em) for v in VersaoCache.query.all()}; versoes['lido_em'] = agora
+    return versoes['versoes']
+
+def invalidar_cache(*namespaces):
+    """Marca os grupos como alterados (na sessão atual, gravado junto com o commit de quem chama).
+
+    Este worker só passa a usar as versões novas depois do commit (_apos_commit); num rollback elas são
+    descartadas, senão ele guardaria páginas com um número de versão que outro worker ainda pode gravar."""
+    agora = datetime.utcnow().replace(microsecond=0)
+    for namespace in namespaces:
+        # Incremento feito no próprio UPDATE: dois workers invalidando juntos nunca geram a mesma versão
+        atualizadas = db.session.execute(db.update(VersaoCache).where(VersaoCache.namespace == namespace).values(versao=VersaoCache.versao + 1, modificado_em=agora)).rowcount
+        if not atualizadas: db.session.add(VersaoCache(namespace=namespace, versao=1, modificado_em=agora)); db.session.flush()
+        versao = db.session.execute(db.select(VersaoCache.versao).where(VersaoCache.namespace == namespace)).scalar()
+        db.session.info.setdefault('versoes_cache', {})[namespace] = (versao, agora)
+
+@event.listens_for(Session, 'after_commit')
+def _apos_commit(session):
+    versoes = session.info.pop('versoes_cache', None)
+    if not versoes or not has_app_context(): return
+    atuais = estado().versoes['versoes']
+    for namespace, (versao, modificado_em) in versoes.items():
+        if versao > atuais.get(namespace, (0,))[0]: atuais[namespace] = (versao, modificado_em) # Nunca volta para uma versão mais antiga
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _apos_rollback(session, transacao_anterior):
+    session.info.pop('versoes_cache', None)
+
+def em_cache(namespaces, chave, calcular):
+    """Busca no cache LRU; a chave inclui a versão dos grupos, então dados alterados nunca são servidos."""
+    versoes = versoes_cache(); chave_completa = (chave, tuple(versoes.get(n, (0, None))[0] for n in namespaces))
+    paginas = estado().paginas; valor = paginas.get(chave_completa)
+    if valor is None: valor = calcular(); paginas.set(chave_completa, valor)
+    return valor
+
+def pagina_condicional(*namespaces, depende_do_dia=False):
+    """Adiciona ETag/Last-Modified e responde 304 quando o navegador já tem a versão atual da página."""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            versoes = versoes_cache(); hoje = date.today()
+            modificacoes = [versoes[n][1] for n in namespaces if n in versoes] or [estado().inicio_processo]
+            if depende_do_dia: modificacoes.append(datetime.combine(hoje, datetime.min.time()))
+            ultima_modificacao = max(modificacoes).replace(tzinfo=timezone.utc)
+            # A página inclui o menu do usuário logado, por isso o ETag também depende dele
+            base = repr((request.full_path, current_user.get_id(), current_user.role, [versoes.get(n, (0,))[0] for n in namespaces], hoje if depende_do_dia else None))
+            etag = hashlib.sha1(base.encode('utf-8')).hexdigest()
+            tem_mensagens = bool(session.get('_flashes'))
+            if not tem_mensagens and (request.if_none_match.contains(etag) if request.if_none_match else (request.if_modified_since is not None and request.if_modified_since >= ultima_modificacao)):
+                resposta = make_response('', 304)
+            else:
+                resposta = make_response(f(*args, **kwargs))
+            resposta.set_etag(etag); resposta.last_modified = ultima_modificacao
+            # Com mensagens (flash) a página é única: não deve ser guardada nem pelo service worker
+            resposta.headers['Cache-Control'] = 'no-store' if tem_mensagens else 'private, no-cache'
+            return resposta
+        return decorated_function
+    return decorator
+
+# --- Arquivos Estáticos Versionados (PWA) ---
+def hash_estatico(filename):
+    """Hash curto do conteúdo do arquivo em static/, recalculado apenas se o arquivo mudar."""
+    caminho = os.path.join(current_app.static_folder, filename); hashes = estado().hashes_estaticos
+    try: mtime = os.path.getmtime(caminho)
+    except OSError: return None
+    em_cache_hash = hashes.get(filename)
+    if em_cache_hash and em_cache_hash[0] == mtime: return em_cache_hash[1]
+    with open(caminho, 'rb') as arquivo: valor = hashlib.sha1(arquivo.read()).hexdigest()[:12]
+    hashes[filename] = (mtime, valor); return valor
+
+def _versionar_estaticos(endpoint, values):
+    if endpoint == 'static' and 'filename' in values and 'v' not in values:
+        versao = hash_estatico(values['filename'])
+        if versao: values['v'] = versao
+
+def _cache_estaticos(resposta):
+    if request.endpoint == 'static' and request.args.get('v') and resposta.status_code == 200:
+        resposta.headers['Cache-Control'] = f"public, max-age={current_app.config['ESTATICOS_MAX_AGE_SEGUNDOS']}, immutable"
+    return resposta
+
+def arquivos_estaticos():
+    """Caminhos (relativos a static/) de todos os arquivos estáticos."""
+    pasta = current_app.static_folder
+    return sorted(os.path.relpath(os.path.join(raiz, nome), pasta).replace(os.sep, '/') for raiz, _, nomes in os.walk(pasta) for nome in nomes)
+
+def arquivos_precache():
+    """URLs guardadas pelo service worker na instalação: estáticos (com hash) e a página offline."""
+    return sorted(url_for('static', filename=nome) for nome in arquivos_estaticos()) + [url_for('ponto.offline')]
+
+def init_app(app):
+    app.url_defaults(_versionar_estaticos); app.after_request(_cache_estaticos)
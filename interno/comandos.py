@@ -0,0 +1,378 @@
+import csv
+import json
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from functools import partial
+import click
+from flask import Blueprint, current_app
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.exc import IntegrityError, OperationalError
+from werkzeug.security import generate_password_hash
+from .cache import invalidar_cache
+from .escala import gravar_escala, planejar_escala
+from .espelhos import gerar_espelhos
+from .extensoes import db
+from .jornada import _calcular_saldos, atualizar_saldos_dias, atualizar_saldos_em_massa, calcular_saldos_completos
+from .modelos import Aviso, Feriado, Funcionario, RegistroPonto, RegistroPontoArquivo, ResumoMensal, SaldoDiario
+from .registros import _filtros, dias_arquivados, gerar_csv, gerar_linhas_export, gravar_xlsx
+from .util import _iniciar_transacao_escrita
+from .validacao import _texto, validar_feriado, validar_funcionario, validar_ponto
+
+# Comandos "flask ..." sem prefixo de grupo (flask init-db, flask import-ponto, ...)
+bp = Blueprint('comandos', __name__, cli_group=None)
+
+@bp.cli.command('init-db')
+def init_db_command():
+    db.create_all(); print('Banco de dados inicializado!')
+
+# Colunas adicionadas depois da criação original das tabelas: (tabela, coluna, tipo SQL, UPDATE de preenchimento)
+MIGRACOES_COLUNAS = [
+    ('funcionario', 'nascimento_mes', 'INTEGER', "UPDATE funcionario SET nascimento_mes = CAST(strftime('%m', data_nascimento) AS INTEGER) WHERE nascimento_mes IS NULL"),
+    ('funcionario', 'nascimento_dia', 'INTEGER', "UPDATE funcionario SET nascimento_dia = CAST(strftime('%d', data_nascimento) AS INTEGER) WHERE nascimento_dia IS NULL"),
+]
+
+def atualizar_esquema():
+    """Atualiza um app.db existente sem apagar dados: tabelas novas, colunas novas e índices. Idempotente."""
+    db.create_all(); alteracoes = []
+    with db.engine.begin() as conn:
+        inspetor = sa_inspect(conn)
+        for tabela, coluna, tipo, preenchimento in MIGRACOES_COLUNAS:
+            if coluna not in {c['name'] for c in inspetor.get_columns(tabela)}:
+                conn.exec_driver_sql(f'ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}'); alteracoes.append(f'coluna {tabela}.{coluna}')
+            if preenchimento: conn.exec_driver_sql(preenchimento)
+        for tabela in db.metadata.sorted_tables:
+            existentes = {i['name'] for i in sa_inspect(conn).get_indexes(tabela.name)}
+            for indice in tabela.indexes:
+                if indice.name not in existentes: indice.create(conn); alteracoes.append(f'índice {indice.name}')
+        conn.exec_driver_sql('ANALYZE')
+    return alteracoes
+
+def consultas_criticas():
+    """Consultas executadas com mais frequência, usadas para conferir o plano de execução."""
+    agora = datetime.utcnow(); hoje = date.today()
+    return {
+        'ultimo registro do funcionario': RegistroPonto.query.filter_by(funcionario_id=1).order_by(RegistroPonto.timestamp_entrada.desc()).limit(1),
+        'registro aberto (batida de ponto)': RegistroPonto.query.filter(RegistroPonto.funcionario_id == 1, RegistroPonto.timestamp_saida == None).order_by(RegistroPonto.timestamp_entrada.desc()).limit(1),
+        'historico do funcionario (30 dias)': RegistroPonto.query.filter(RegistroPonto.funcionario_id == 1, RegistroPonto.timestamp_entrada >= agora - timedelta(days=30)).order_by(RegistroPonto.timestamp_entrada.desc()),
+        'admin ponto por periodo': RegistroPonto.query.filter(RegistroPonto.timestamp_entrada >= agora - timedelta(days=30), RegistroPonto.timestamp_entrada < agora),
+        'aniversariantes do dia': Funcionario.query.filter_by(nascimento_mes=hoje.month, nascimento_dia=hoje.day),
+        'aniversariantes do mes': Funcionario.query.filter_by(nascimento_mes=hoje.month),
+        'feriados do mes': Feriado.query.filter(Feriado.data >= hoje.replace(day=1), Feriado.data < hoje.replace(day=1) + timedelta(days=32)),
+        'feriado do dia': Feriado.query.filter_by(data=hoje),
+        'avisos recentes': Aviso.query.order_by(Aviso.data_postagem.desc()).limit(20),
+        'saldo total do funcionario': db.session.query(db.func.sum(SaldoDiario.saldo_segundos)).filter(SaldoDiario.funcionario_id == 1),
+        'admin ponto no arquivo': RegistroPontoArquivo.query.filter(RegistroPontoArquivo.timestamp_entrada >= agora - timedelta(days=400), RegistroPontoArquivo.timestamp_entrada < agora - timedelta(days=370)),
+        'saldo arquivado do funcionario': db.session.query(db.func.sum(ResumoMensal.saldo_segundos)).filter(ResumoMensal.funcionario_id == 1),
+        'resumo de saldos do periodo': db.session.query(SaldoDiario.funcionario_id, db.func.sum(SaldoDiario.saldo_segundos)).filter(SaldoDiario.data >= hoje.replace(month=1, day=1), SaldoDiario.data <= hoje).group_by(SaldoDiario.funcionario_id),
+    }
+
+def copia_esquema_sem_estatisticas():
+    """Banco em memória com as tabelas e índices do app.db atual, sem dados nem estatísticas do ANALYZE.
+
+    Com poucas linhas o SQLite prefere varrer a tabela; sem estatísticas o plano mostra o que
+    acontece com o volume real, que é o que interessa conferir.
+    """
+    with db.engine.connect() as conn:
+        ddl = [linha[0] for linha in conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' ORDER BY type DESC")]
+    copia = sqlite3.connect(':memory:')
+    for comando in ddl: copia.execute(comando)
+    return copia
+
+def plano_de_execucao(query, conexao):
+    """Retorna as linhas de EXPLAIN QUERY PLAN (SQLite) para uma Query do SQLAlchemy."""
+    compilada = query.statement.compile(dialect=db.engine.dialect)
+    parametros = compilada.construct_params()
+    valores = tuple(str(v) if isinstance(v, (date, datetime)) else v for v in (parametros[nome] for nome in compilada.positiontup))
+    return [linha[-1] for linha in conexao.execute(f'EXPLAIN QUERY PLAN {compilada}', valores)]
+
+def usa_indice(plano):
+    # 'SCAN <tabela>' sem índice = varredura completa; 'SEARCH ... USING ...' ou 'SCAN ... USING INDEX' são aceitos
+    return all(not passo.startswith('SCAN') or 'USING' in passo for passo in plano)
+
+@bp.cli.command('upgrade-db')
+def upgrade_db_command():
+    """Atualiza o esquema de um app.db existente (tabelas, colunas e índices novos) sem perder dados."""
+    try: alteracoes = atualizar_esquema()
+    except Exception as e: print(f'Erro ao atualizar o banco de dados: {e}'); return
+    for alteracao in alteracoes: print(f'+ {alteracao}')
+    print('Banco de dados atualizado!' if alteracoes else 'Banco de dados já está atualizado.')
+
+@bp.cli.command('verificar-indices')
+def verificar_indices_command():
+    """Confere com EXPLAIN QUERY PLAN se as consultas críticas usam índice."""
+    falhas = 0; conexao = copia_esquema_sem_estatisticas()
+    for nome, query in consultas_criticas().items():
+        try: plano = plano_de_execucao(query, conexao)
+        except sqlite3.Error as e: plano = [f'erro: {e}']
+        ok = usa_indice(plano) and not plano[0].startswith('erro'); falhas += 0 if ok else 1
+        print(f"[{'OK' if ok else 'FALHA'}] {nome}: {' | '.join(plano)}")
+    if falhas: raise SystemExit(f'{falhas} consulta(s) sem índice. Execute "flask upgrade-db".')
+
+@bp.cli.command('rebuild-saldos')
+def rebuild_saldos_command():
+    """Reconstrói o banco de horas (SaldoDiario) do zero a partir dos registros de ponto."""
+    calculados = calcular_saldos_completos()
+    try:
+        SaldoDiario.query.delete()
+        db.session.bulk_insert_mappings(SaldoDiario, [{'funcionario_id': f_id, 'data': dia, 'trabalhado_segundos': t, 'esperado_segundos': e, 'saldo_segundos': t - e} for (f_id, dia), (t, e) in calculados.items()])
+        db.session.commit(); print(f'Banco de horas reconstruído: {len(calculados)} dia(s) calculado(s).')
+    except Exception as e: db.session.rollback(); print(f"Erro ao reconstruir banco de horas: {e}")
+
+@bp.cli.command('verificar-saldos')
+@click.option('--corrigir', is_flag=True, help='Corrige os dias divergentes encontrados.')
+def verificar_saldos_command(corrigir):
+    """Compara o SaldoDiario com o cálculo a partir dos registros e lista as divergências."""
+    calculados = calcular_saldos_completos(); existentes = {(s.funcionario_id, s.data): s for s in SaldoDiario.query.all()}; divergentes = set()
+    for par in set(calculados) | set(existentes):
+        # (trabalhado, esperado, saldo): o saldo gravado é o que as somas do banco de horas usam
+        esperado = (*calculados[par], calculados[par][0] - calculados[par][1]) if par in calculados else None
+        saldo = existentes.get(par); atual = (saldo.trabalhado_segundos, saldo.esperado_segundos, saldo.saldo_segundos) if saldo else None
+        if esperado != atual: divergentes.add(par); print(f'Divergência funcionário {par[0]} em {par[1]}: salvo={atual} calculado={esperado}')
+    if not divergentes: print('Banco de horas consistente.'); return
+    print(f'{len(divergentes)} dia(s) divergente(s).')
+    if corrigir: atualizar_saldos_dias(divergentes); db.session.commit(); print('Divergências corrigidas.')
+
+def _arquivar_mes(inicio, fim, funcionarios_por_id):
+    """Arquiva os registros fechados com entrada em [inicio, fim) numa transação de escrita (sem commit).
+
+    Dias que ainda têm registro em aberto ficam inteiros na tabela quente. Retorna (registros, dias, saldos removidos)."""
+    _iniciar_transacao_escrita(); no_periodo = (RegistroPonto.timestamp_entrada >= inicio, RegistroPonto.timestamp_entrada < fim)
+    # Os dias em aberto são poucos (índice parcial ix_registro_ponto_aberto): lidos uma vez e filtrados em Python
+    em_aberto = {(f_id, entrada.date()) for f_id, entrada in db.session.query(RegistroPonto.funcionario_id, RegistroPonto.timestamp_entrada).filter(RegistroPonto.timestamp_saida == None, *no_periodo)}
+    registros = [r for r in db.session.query(RegistroPonto.id, RegistroPonto.funcionario_id, RegistroPonto.timestamp_entrada, RegistroPonto.timestamp_saida).filter(RegistroPonto.timestamp_saida != None, *no_periodo) if (r.funcionario_id, r.timestamp_entrada.date()) not in em_aberto]
+    if not registros: return 0, 0, 0
+    # Ids escolhidos uma vez: o INSERT e o DELETE usam a mesma lista (em blocos, abaixo do limite de parâmetros do SQLite)
+    ids = [r.id for r in registros]; colunas = ['funcionario_id', 'timestamp_entrada', 'timestamp_saida', 'observacao']
+    for n in range(0, len(ids), 500):
+        bloco = ids[n:n + 500]
+        db.session.execute(db.insert(RegistroPontoArquivo).from_select(colunas, db.select(*[getattr(RegistroPonto, c) for c in colunas]).where(RegistroPonto.id.in_(bloco))))
+        db.session.execute(db.delete(RegistroPonto).where(RegistroPonto.id.in_(bloco)))
+
+    # Resumo por funcionário no mês, somado ao que já existir (ex.: dia que estava em aberto num arquivamento anterior)
+    calculados = _calcular_saldos(registros, funcionarios_por_id); por_funcionario = {}
+    for (f_id, _), (trabalhado, esperado) in calculados.items():
+        total = por_funcionario.setdefault(f_id, [0, 0, 0]); total[0] += 1; total[1] += trabalhado; total[2] += esperado
+    existentes = {r.funcionario_id: r for r in ResumoMensal.query.filter(ResumoMensal.ano == inicio.year, ResumoMensal.mes == inicio.month, ResumoMensal.funcionario_id.in_(por_funcionario))}
+    for f_id, (dias, trabalhado, esperado) in por_funcionario.items():
+        resumo = existentes.get(f_id)
+        if not resumo: resumo = ResumoMensal(funcionario_id=f_id, ano=inicio.year, mes=inicio.month, dias=0, trabalhado_segundos=0, esperado_segundos=0, saldo_segundos=0); db.session.add(resumo)
+        resumo.dias += dias; resumo.trabalhado_segundos += trabalhado; resumo.esperado_segundos += esperado; resumo.saldo_segundos += trabalhado - esperado
+    saldos = [s_id for s_id, f_id, dia in db.session.query(SaldoDiario.id, SaldoDiario.funcionario_id, SaldoDiario.data).filter(SaldoDiario.data >= inicio.date(), SaldoDiario.data < fim.date()) if (f_id, dia) in calculados]
+    for n in range(0, len(saldos), 500): db.session.execute(db.delete(SaldoDiario).where(SaldoDiario.id.in_(saldos[n:n + 500])))
+    return len(ids), len(calculados), len(saldos)
+
+@bp.cli.command('archive-ponto')
+@click.option('--before', 'antes', required=True, type=click.DateTime(formats=['%Y-%m']), help='Arquiva os meses anteriores a este (AAAA-MM).')
+def archive_ponto_command(antes):
+    """Move registros de ponto fechados anteriores ao mês informado para registro_ponto_arquivo.
+
+    O banco de horas desses dias sai do SaldoDiario e passa a ser guardado por mês em ResumoMensal,
+    calculado a partir dos próprios registros arquivados. Uma transação curta por mês: as batidas de ponto
+    não esperam pelo arquivamento inteiro. Se parar no meio, basta rodar de novo (os meses prontos já saíram)."""
+    corte = antes.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if corte > datetime.combine(date.today().replace(day=1), datetime.min.time()): print('Erro: só é possível arquivar meses já encerrados.'); return
+    primeiro = db.session.query(db.func.min(RegistroPonto.timestamp_entrada)).filter(RegistroPonto.timestamp_entrada < corte).scalar()
+    # Só as colunas das regras de jornada (linhas, não objetos ORM: não expiram a cada commit)
+    funcionarios_por_id = {f.id: f for f in db.session.query(Funcionario.id, Funcionario.grupo_sabado, Funcionario.horario_especial_09)}; db.session.commit()
+    mes = datetime(primeiro.year, primeiro.month, 1) if primeiro else corte; movidos = dias = removidos = meses = 0
+    while mes < corte:
+        proximo = datetime(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+        try: registros_mes, dias_mes, saldos_mes = _arquivar_mes(mes, proximo, funcionarios_por_id); db.session.commit()
+        except Exception as e: db.session.rollback(); print(f'Erro ao arquivar {mes:%m/%Y}: {e}. Os meses anteriores já foram arquivados; rode o comando de novo.'); break
+        if registros_mes: movidos += registros_mes; dias += dias_mes; removidos += saldos_mes; meses += 1; print(f'{mes:%m/%Y}: {registros_mes} registro(s) em {dias_mes} dia(s).')
+        mes = proximo
+    if not movidos: print(f'Nenhum registro fechado antes de {corte:%m/%Y} para arquivar.'); return
+    print(f'{movidos} registro(s) arquivado(s) em {dias} dia(s); {meses} mês(es) com resumo mensal atualizado, {removidos} saldo(s) diário(s) consolidado(s).')
+    print('Dica: rode "VACUUM" no banco (fora do horário de uso) para devolver o espaço ao disco.')
+
+@bp.cli.command('exportar-ponto')
+@click.option('--tipo', type=click.Choice(['registros', 'resumo']), default='resumo', show_default=True)
+@click.option('--formato', type=click.Choice(['csv', 'xlsx']), default='csv', show_default=True)
+@click.option('--funcionario-id', type=int, default=None, help='Exporta apenas este funcionário.')
+@click.option('--inicio', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='Data inicial (AAAA-MM-DD).')
+@click.option('--fim', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='Data final (AAAA-MM-DD).')
+@click.option('--saida', required=True, type=click.Path(dir_okay=False, writable=True), help='Arquivo de destino.')
+def exportar_ponto_command(tipo, formato, funcionario_id, inicio, fim, saida):
+    """Exporta registros de ponto ou o resumo diário (trabalhado/esperado/saldo) para CSV ou XLSX."""
+    filtros = _filtros(funcionario_id, inicio.date() if inicio else None, fim.date() if fim else None); linhas = gerar_linhas_export(tipo, filtros)
+    if formato == 'xlsx':
+        try: gravar_xlsx(linhas, saida)
+        except ImportError: print('Erro: exportação XLSX requer o pacote openpyxl.'); return
+    else:
+        with open(saida, 'w', encoding='utf-8', newline='') as arquivo:
+            for bloco in gerar_csv(linhas): arquivo.write(bloco)
+    print(f'Exportação "{tipo}" gravada em {saida}.')
+
+@bp.cli.command('gerar-espelhos')
+@click.option('--mes', required=True, type=click.DateTime(formats=['%Y-%m']), help='Mês dos espelhos (AAAA-MM).')
+@click.option('--saida', default=None, type=click.Path(dir_okay=False, writable=True), help='Arquivo .zip de destino (padrão: espelhos_AAAA-MM.zip).')
+@click.option('--processos', type=int, default=None, help='Processos que renderizam os espelhos (padrão: ESPELHOS_PROCESSOS ou nº de CPUs).')
+def gerar_espelhos_command(mes, saida, processos):
+    """Gera o espelho de ponto do mês de todos os funcionários (HTML pronto para imprimir/PDF) e o resumo, em um .zip."""
+    saida = saida or f'espelhos_{mes:%Y-%m}.zip'; inicio = time.perf_counter()
+    total = gerar_espelhos(mes.year, mes.month, saida, processos)
+    print(f'{total} espelho(s) de {mes:%m/%Y} gravado(s) em {saida} em {time.perf_counter() - inicio:.1f} s.')
+
+@bp.cli.command('gerar-escala')
+@click.option('--inicio', required=True, type=click.DateTime(formats=['%Y-%m-%d']), help='Primeiro dia (AAAA-MM-DD).')
+@click.option('--fim', required=True, type=click.DateTime(formats=['%Y-%m-%d']), help='Último dia (AAAA-MM-DD).')
+@click.option('--previa', is_flag=True, help='Apenas mostra o rodízio, sem gravar.')
+def gerar_escala_command(inicio, fim, previa):
+    """Gera a escala de limpeza do intervalo (sem domingos e feriados), em rodízio entre Escritório e Expedição."""
+    plano, conflitos, erro = planejar_escala(inicio.date(), fim.date())
+    if erro: print(f'Erro: {erro}'); return
+    for item in plano: print(f"{item['data_escala']:%d/%m/%Y}  Escritório: {item['nome_escritorio']:<30} Expedição: {item['nome_expedicao']}")
+    for dia in conflitos: print(f'{dia:%d/%m/%Y}  (já cadastrada, mantida)')
+    if previa: print(f'Prévia: {len(plano)} dia(s) a gerar, {len(conflitos)} já existente(s).'); return
+    try:
+        novos_conflitos = gravar_escala(plano)
+        if novos_conflitos: db.session.rollback(); print(f"Erro: datas cadastradas durante a geração: {', '.join(map(str, novos_conflitos))}. Nada foi gravado."); return
+        db.session.commit(); print(f'Escala gerada: {len(plano)} dia(s) cadastrado(s), {len(conflitos)} já existente(s).')
+    except IntegrityError: db.session.rollback(); print('Erro: outra escala foi cadastrada no mesmo período. Nada foi gravado.')
+
+# --- Importação em lote (CSV ou JSON Lines) ---
+def ler_linhas(caminho):
+    """Lê um CSV com cabeçalho (delimitador ; , ou tab) ou um .jsonl. Gera (numero_linha, dados, erro)."""
+    if caminho.lower().endswith(('.jsonl', '.ndjson')):
+        with open(caminho, encoding='utf-8') as arquivo:
+            for numero, linha in enumerate(arquivo, 1):
+                if not linha.strip(): continue
+                try: dados = json.loads(linha)
+                except ValueError as e: yield numero, None, f'JSON inválido: {e}'; continue
+                if isinstance(dados, dict): yield numero, dados, None
+                else: yield numero, None, 'Cada linha deve ser um objeto JSON.'
+        return
+    with open(caminho, encoding='utf-8-sig', newline='') as arquivo:
+        amostra = arquivo.read(8192); arquivo.seek(0)
+        try: dialeto = csv.Sniffer().sniff(amostra, delimiters=';,\t')
+        except csv.Error: dialeto = csv.excel
+        leitor = csv.DictReader(arquivo, dialect=dialeto)
+        for dados in leitor: yield leitor.line_num, dados, None
+
+def _gravar_linha_a_linha(lote, gravar):
+    """Refaz um lote recusado pelo banco com um SAVEPOINT por linha: só as linhas com erro ficam de fora. Não faz commit."""
+    gravadas = 0
+    for numero, mapping in lote:
+        try:
+            with db.session.begin_nested(): gravar([mapping])
+            gravadas += 1
+        except (IntegrityError, OperationalError) as e: print(f'Linha {numero}: {getattr(e, "orig", e)}')
+    return gravadas
+
+def importar_arquivo(caminho, preparar, gravar, tamanho_lote):
+    """Valida cada linha com preparar(dados) -> (mapping, erro) e grava os válidos em lotes com gravar(mappings).
+
+    Cada lote é uma transação: linha inválida é reportada e pulada, sem derrubar o lote. Se o banco recusar
+    o lote (ex.: UNIQUE violado por um cadastro feito durante a importação), ele é refeito linha a linha
+    e só as linhas recusadas são reportadas. gravar() deve poder ser chamado de novo com os mesmos mappings.
+    Retorna (importadas, erros)."""
+    importadas = erros = 0; lote = []
+    def descarregar():
+        nonlocal importadas, erros
+        if not lote: return
+        try: gravar([mapping for _, mapping in lote]); db.session.commit(); importadas += len(lote)
+        except (IntegrityError, OperationalError):
+            db.session.rollback()
+            try: gravadas = _gravar_linha_a_linha(lote, gravar); db.session.commit(); importadas += gravadas; erros += len(lote) - gravadas
+            except Exception as e: db.session.rollback(); erros += len(lote); print(f'Erro ao gravar o lote das linhas {lote[0][0]} a {lote[-1][0]}: {e}')
+        except Exception as e: db.session.rollback(); erros += len(lote); print(f'Erro ao gravar o lote das linhas {lote[0][0]} a {lote[-1][0]}: {e}')
+        lote.clear()
+    for numero, dados, erro in ler_linhas(caminho):
+        if erro is None: mapping, erro = preparar(dados)
+        if erro: erros += 1; print(f'Linha {numero}: {erro}'); continue
+        lote.append((numero, mapping))
+        if len(lote) >= tamanho_lote: descarregar()
+    descarregar()
+    return importadas, erros
+
+def _hash_senha(senha, metodo): return generate_password_hash(senha, method=metodo)
+
+_opcao_lote = click.option('--lote', type=int, default=None, help='Linhas por transação (padrão: IMPORT_LOTE).')
+
+@bp.cli.command('import-funcionarios')
+@click.argument('arquivo', type=click.Path(exists=True, dir_okay=False))
+@_opcao_lote
+@click.option('--processos', type=int, default=None, help='Processos para calcular os hashes de senha (padrão: nº de CPUs).')
+def import_funcionarios_command(arquivo, lote, processos):
+    """Importa funcionários. Colunas: username, password, nome, setor, data_nascimento, role, grupo_sabado, horario_especial_09."""
+    usados = {u for (u,) in db.session.query(Funcionario.username)}
+    def preparar(dados):
+        valores, erro = validar_funcionario(dados)
+        if erro: return None, erro
+        if valores['username'] in usados: return None, f'O nome de usuário "{valores["username"]}" já está em uso.'
+        usados.add(valores['username']); nasc = valores['data_nascimento']
+        # bulk_insert_mappings não passa pelo @validates: mês/dia do aniversário vão explícitos
+        valores.update(nascimento_mes=nasc.month, nascimento_dia=nasc.day); return valores, None
+    from concurrent.futures import ProcessPoolExecutor # Só este comando usa; não pesa na inicialização do app
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        hash_senha = partial(_hash_senha, metodo=current_app.config['PASSWORD_HASH_METHOD'])
+        def gravar(mappings):
+            # O hash (scrypt) é o gargalo da importação: calculado em paralelo, fora do GIL (e uma vez só, se o lote for refeito linha a linha)
+            pendentes = [m for m in mappings if 'password' in m]
+            for mapping, password_hash in zip(pendentes, executor.map(hash_senha, [m.pop('password') for m in pendentes], chunksize=16)): mapping['password_hash'] = password_hash
+            db.session.bulk_insert_mappings(Funcionario, mappings); invalidar_cache('funcionarios')
+        importadas, erros = importar_arquivo(arquivo, preparar, gravar, lote or current_app.config['IMPORT_LOTE'])
+    print(f'{importadas} funcionário(s) importado(s), {erros} linha(s) com erro.')
+
+@bp.cli.command('import-feriados')
+@click.argument('arquivo', type=click.Path(exists=True, dir_okay=False))
+@_opcao_lote
+def import_feriados_command(arquivo, lote):
+    """Importa feriados. Colunas: data (AAAA-MM-DD), nome."""
+    usadas = {d for (d,) in db.session.query(Feriado.data)}
+    def preparar(dados):
+        valores, erro = validar_feriado(dados)
+        if erro: return None, erro
+        if valores['data'] in usadas: return None, f'A data {valores["data"]:%Y-%m-%d} já está cadastrada.'
+        if dias_arquivados(inicio=valores['data'], fim=valores['data']): return None, f'A data {valores["data"]:%Y-%m-%d} já foi arquivada.'
+        usadas.add(valores['data']); return valores, None
+    def gravar(mappings):
+        db.session.bulk_insert_mappings(Feriado, mappings)
+        # Feriado muda a jornada esperada de quem já tem saldo nesses dias
+        atualizar_saldos_dias({(s.funcionario_id, s.data) for s in SaldoDiario.query.filter(SaldoDiario.data.in_([m['data'] for m in mappings]))}); invalidar_cache('feriados')
+    importadas, erros = importar_arquivo(arquivo, preparar, gravar, lote or current_app.config['IMPORT_LOTE'])
+    print(f'{importadas} feriado(s) importado(s), {erros} linha(s) com erro.')
+
+@bp.cli.command('import-ponto')
+@click.argument('arquivo', type=click.Path(exists=True, dir_okay=False))
+@_opcao_lote
+def import_ponto_command(arquivo, lote):
+    """Importa registros de ponto. Colunas: funcionario_id ou username, data (AAAA-MM-DD), entrada e saida (HH:MM), observacao."""
+    ids_por_username = dict(db.session.query(Funcionario.username, Funcionario.id)); ids = set(ids_por_username.values())
+    inicio_mes = date.today().replace(day=1); arquivados = None
+    def preparar(dados):
+        nonlocal arquivados
+        username = _texto(dados, 'username')
+        if username and not _texto(dados, 'funcionario_id'):
+            if username not in ids_por_username: return None, f'Usuário "{username}" não encontrado.'
+            dados = dict(dados, funcionario_id=ids_por_username[username])
+        valores, erro = validar_ponto(dados)
+        if erro: return None, erro
+        if valores['funcionario_id'] not in ids: return None, f'Funcionário {valores["funcionario_id"]} não encontrado.'
+        par = (valores['funcionario_id'], valores['timestamp_entrada'].date())
+        if par[1] < inicio_mes:
+            if arquivados is None: arquivados = dias_arquivados() # Uma consulta só, e só se o arquivo tiver linhas de meses encerrados
+            if par in arquivados: return None, f'O dia {par[1]:%d/%m/%Y} do funcionário {par[0]} já foi arquivado.'
+        return valores, None
+    def gravar(mappings):
+        db.session.bulk_insert_mappings(RegistroPonto, mappings)
+        atualizar_saldos_em_massa({(m['funcionario_id'], m['timestamp_entrada'].date()) for m in mappings})
+    importadas, erros = importar_arquivo(arquivo, preparar, gravar, lote or current_app.config['IMPORT_LOTE'])
+    print(f'{importadas} registro(s) de ponto importado(s), {erros} linha(s) com erro.')
+
+@bp.cli.command('create-admin')
+def create_admin_command():
+    print("--- Criando Conta de Administrador (Dono) ---"); u = input("Usuário: "); p = input("Senha: "); n = input("Nome Completo: "); s = input("Setor: "); nasc_str = input("Nascimento (AAAA-MM-DD): ")
+    g_sab = input("Grupo Sábado (A/B ou deixe em branco): "); h_esp_str = input("Entra às 09:00? (S/N): ").upper()
+    if not u or not p or not n: print("Usuário, senha e nome obrigatórios."); return
+    if Funcionario.query.filter_by(username=u).first(): print(f'Erro: Usuário "{u}" já existe.'); return
+    g_sab = g_sab.upper() if g_sab else None;
+    if g_sab and g_sab not in ['A', 'B']: print("Erro: Grupo Sábado deve ser 'A' ou 'B'."); return
+    if h_esp_str not in ['S', 'N']: print("Erro: Horário especial deve ser 'S' ou 'N'."); return
+    horario_especial_09 = h_esp_str == 'S'
+    try:
+        nasc_obj = datetime.strptime(nasc_str, '%Y-%m-%d').date(); admin = Funcionario(username=u,nome=n,setor=s,data_nascimento=nasc_obj,role='admin', grupo_sabado=g_sab, horario_especial_09=horario_especial_09)
+        admin.set_password(p); db.session.add(admin); db.session.commit(); print(f'Usuário Administrador "{u}" criado com sucesso!')
+    except ValueError: print("Erro: Formato de data inválido. Use AAAA-MM-DD.")
+    except Exception as e: db.session.rollback(); print(f"Erro ao criar admin: {e}")
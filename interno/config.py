@@ -0,0 +1,77 @@
+import os
+from collections.abc import Mapping
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class Config:
+    """Valores padrão. Ordem de precedência em create_app(): esta classe < variáveis de ambiente < config passado."""
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(RAIZ, 'app.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = 'uma-chave-secreta-bem-dificil'
+    ADMIN_PONTO_TAMANHO_PAGINA = 50 # Dias (funcionário/dia) por página em /admin/ponto
+    ADMIN_PONTO_JANELA_PADRAO_DIAS = 30 # Janela padrão quando nenhuma data é informada
+    SALDOS_MAX_DIAS_AGRUPAMENTO_DIA = 366 # Maior intervalo do resumo de saldos agrupado por dia (uma linha por funcionário e dia)
+    EXPORT_LOTE = 1000 # Linhas buscadas do banco por lote na exportação
+    EXPORT_CSV_DELIMITADOR = ';' # Padrão do Excel em pt-BR
+    IMPORT_LOTE = 5000 # Linhas gravadas por transação nos comandos de importação
+    ESPELHOS_PROCESSOS = None # Processos que renderizam os espelhos no `flask gerar-espelhos` (None: nº de CPUs; 1: sem pool). Pelo /admin/ponto é sempre sem pool
+    # --- SQLite: concorrência no pico de batidas de ponto (vários workers gravando ao mesmo tempo) ---
+    SQLITE_JOURNAL_MODE = 'WAL' # Leitores não bloqueiam o escritor
+    SQLITE_BUSY_TIMEOUT_MS = 15000 # Espera pelo lock de escrita em vez de falhar com "database is locked"
+    SQLITE_SYNCHRONOUS = 'NORMAL' # Seguro com WAL e bem mais rápido que FULL
+    SQLITE_CACHE_SIZE = -16000 # Negativo = KiB (16 MB por conexão)
+    DB_POOL_SIZE = 5; DB_MAX_OVERFLOW = 10; DB_POOL_RECYCLE = 3600
+    PONTO_JANELA_DUPLICIDADE_SEGUNDOS = 10 # Segunda batida nesse intervalo é ignorada (toque duplo)
+    # --- Login e sessão ---
+    PASSWORD_HASH_METHOD = 'scrypt:32768:8:1' # Hashes antigos são atualizados no próximo login
+    USUARIO_CACHE_TAMANHO = 1024; USUARIO_CACHE_TTL_SEGUNDOS = 300
+    LOGIN_MAX_TENTATIVAS = 5; LOGIN_JANELA_SEGUNDOS = 300 # Falhas por usuário antes de bloquear temporariamente
+    # Limitador e semáforo de login ficam na memória de cada worker: com N workers, um atacante chega a N x LOGIN_MAX_TENTATIVAS por janela
+    LOGIN_HASH_CONCORRENCIA = 2 # Verificações de senha simultâneas por worker (não deixa o login travar a batida de ponto)
+    LOGIN_HASH_ESPERA_SEGUNDOS = 5
+    # --- Cache de páginas (avisos, calendário, escala) ---
+    PAGINAS_CACHE_TAMANHO = 256 # Fragmentos/resultados guardados (LRU)
+    CACHE_VERSOES_TTL_SEGUNDOS = 2 # De quanto em quanto tempo cada worker relê as versões gravadas no banco
+    AVISOS_LIMITE_PAGINA_INICIAL = 50
+    ESCALA_TAMANHO_PAGINA = 30 # Dias por página em /limpeza e /admin/escala
+    ESCALA_DIAS_ANTERIORES = 7 # Por padrão as páginas da escala começam uma semana antes de hoje
+    ESCALA_MAX_DIAS_GERACAO = 366 # Maior intervalo aceito pelo gerador automático
+    # --- PWA: arquivos estáticos versionados e batidas feitas offline ---
+    ESTATICOS_MAX_AGE_SEGUNDOS = 31536000 # URLs com ?v=<hash> nunca mudam de conteúdo
+    PONTO_OFFLINE_MAX_DIAS = 7 # Batidas offline mais antigas que isso são recusadas
+    PONTO_OFFLINE_TOLERANCIA_FUTURO_SEGUNDOS = 300 # Relógio do celular adiantado
+    PONTO_OFFLINE_MAX_LOTE = 100
+    # --- Quadro de presença (/admin/presenca, atualizado por Server-Sent Events) ---
+    PRESENCA_RECARREGAR_SEGUNDOS = 10 # Releitura dos registros abertos: pega batidas feitas em outros workers e pela CLI
+    PRESENCA_KEEPALIVE_SEGUNDOS = 15 # Comentário SSE enviado sem mudanças, para proxies não fecharem a conexão
+    PRESENCA_CONEXAO_MAX_SEGUNDOS = 300 # Depois disso o stream termina e o navegador reconecta (libera a thread)
+    PRESENCA_MAX_CONEXOES = 10 # Streams abertos ao mesmo tempo por worker (cada um ocupa uma thread)
+    # --- Métricas de requisições e SQL (/admin/metrics) ---
+    METRICAS_ATIVAS = True
+    METRICAS_TOKEN = None # Se definido, o Prometheus coleta com "Authorization: Bearer <token>" sem login
+    METRICAS_LIMITES_HISTOGRAMA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10) # Segundos
+    REQUISICAO_LENTA_SEGUNDOS = 1.0 # Requisições mais demoradas que isso vão para o log
+    CONSULTA_LENTA_SEGUNDOS = 0.2 # Comandos SQL mais demorados que isso vão para o log, com o SQL
+    METRICAS_ULTIMAS_LENTAS = 20 # Quantas requisições/consultas lentas recentes a página HTML mostra
+
+# Variáveis de ambiente com nome próprio (as demais chaves aceitam FLASK_<CHAVE>, ex.: FLASK_DB_POOL_SIZE=10)
+VARIAVEIS_AMBIENTE = {'DATABASE_URL': 'SQLALCHEMY_DATABASE_URI', 'PASSWORD_HASH_METHOD': 'PASSWORD_HASH_METHOD', 'METRICAS_TOKEN': 'METRICAS_TOKEN'}
+
+def opcoes_engine(config):
+    """Pool de conexões a partir de DB_POOL_*; banco em memória fica com o pool padrão (uma conexão só)."""
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    if ':memory:' in uri or uri == 'sqlite://': return {}
+    opcoes = {'pool_size': config['DB_POOL_SIZE'], 'max_overflow': config['DB_MAX_OVERFLOW'], 'pool_recycle': config['DB_POOL_RECYCLE']}
+    if uri.startswith('sqlite'): opcoes['connect_args'] = {'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000}
+    return opcoes
+
+def carregar_configuracao(app, config=None):
+    """Preenche app.config: padrões, ambiente e por último `config` (dict ou objeto com atributos em maiúsculas)."""
+    app.config.from_object(Config)
+    for variavel, chave in VARIAVEIS_AMBIENTE.items():
+        if os.environ.get(variavel): app.config[chave] = os.environ[variavel]
+    if os.environ.get('METRICAS_ATIVAS'): app.config['METRICAS_ATIVAS'] = os.environ['METRICAS_ATIVAS'] != '0'
+    app.config.from_prefixed_env()
+    if isinstance(config, Mapping): app.config.update(config)
+    elif config is not None: app.config.from_object(config)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', opcoes_engine(app.config))
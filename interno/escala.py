@@ -0,0 +1,76 @@
+import heapq
+from datetime import date, datetime, timedelta
+from flask import current_app
+from .cache import invalidar_cache
+from .extensoes import db
+from .modelos import EscalaLimpeza, Feriado, Funcionario
+from .util import _iniciar_transacao_escrita
+
+# --- Escala de Limpeza: geração automática e páginas por janela de datas ---
+SETORES_ESCALA = ('Escritorio', 'Expedicao')
+
+def dias_uteis_escala(inicio, fim):
+    """Dias entre inicio e fim (inclusive) que recebem escala: sem domingos e sem feriados."""
+    feriados = {d for (d,) in db.session.query(Feriado.data).filter(Feriado.data >= inicio, Feriado.data <= fim)}
+    return [dia for dia in (inicio + timedelta(days=n) for n in range((fim - inicio).days + 1)) if dia.weekday() != 6 and dia not in feriados]
+
+def _fila_rodizio(funcionarios, coluna_id):
+    """Heap (escalas_anteriores, ultima_data, nome, id) do setor; o topo é quem limpou menos e há mais tempo."""
+    historico = dict((f_id, (total, ultima)) for f_id, total, ultima in db.session.query(coluna_id, db.func.count(), db.func.max(EscalaLimpeza.data_escala)).filter(coluna_id.in_([f.id for f in funcionarios])).group_by(coluna_id))
+    # Quem entrou agora começa empatado com o menos escalado, senão pegaria todos os próximos dias até "alcançar" os demais
+    piso = min((total for total, _ in historico.values()), default=0)
+    fila = [(max(historico.get(f.id, (0, None))[0], piso), historico.get(f.id, (0, None))[1] or date.min, f.nome, f.id) for f in funcionarios]
+    heapq.heapify(fila); return fila
+
+def planejar_escala(inicio, fim):
+    """Monta o rodízio entre inicio e fim sem gravar nada. Retorna (plano, conflitos, erro).
+
+    plano: lista de dicts prontos para o bulk insert (com os nomes para a prévia);
+    conflitos: datas do intervalo que já têm escala cadastrada (são mantidas, não sobrescritas)."""
+    if fim < inicio: return [], [], 'A data final deve ser igual ou posterior à inicial.'
+    if (fim - inicio).days + 1 > current_app.config['ESCALA_MAX_DIAS_GERACAO']: return [], [], f"Intervalo maior que {current_app.config['ESCALA_MAX_DIAS_GERACAO']} dias."
+    por_setor = {setor: Funcionario.query.filter_by(setor=setor).order_by(Funcionario.nome).all() for setor in SETORES_ESCALA}
+    sem_funcionarios = [setor for setor, funcionarios in por_setor.items() if not funcionarios]
+    if sem_funcionarios: return [], [], f'Nenhum funcionário no setor {", ".join(sem_funcionarios)}.'
+    ocupadas = {d for (d,) in db.session.query(EscalaLimpeza.data_escala).filter(EscalaLimpeza.data_escala >= inicio, EscalaLimpeza.data_escala <= fim)}
+    filas = {'Escritorio': _fila_rodizio(por_setor['Escritorio'], EscalaLimpeza.funcionario_escritorio_id), 'Expedicao': _fila_rodizio(por_setor['Expedicao'], EscalaLimpeza.funcionario_expedicao_id)}
+    plano = []; conflitos = []
+    for dia in dias_uteis_escala(inicio, fim):
+        if dia in ocupadas: conflitos.append(dia); continue
+        escolhidos = {}
+        for setor, fila in filas.items():
+            total, _, nome, f_id = heapq.heappop(fila); escolhidos[setor] = (f_id, nome); heapq.heappush(fila, (total + 1, dia, nome, f_id))
+        plano.append({'data_escala': dia, 'funcionario_escritorio_id': escolhidos['Escritorio'][0], 'funcionario_expedicao_id': escolhidos['Expedicao'][0], 'nome_escritorio': escolhidos['Escritorio'][1], 'nome_expedicao': escolhidos['Expedicao'][1]})
+    return plano, conflitos, None
+
+def gravar_escala(plano):
+    """Grava o plano inteiro numa única transação. Não faz commit.
+
+    Se alguma data foi cadastrada depois da prévia, nada é gravado: retorna as datas em conflito."""
+    if not plano: return []
+    _iniciar_transacao_escrita()
+    datas = [item['data_escala'] for item in plano]
+    conflitos = sorted(d for (d,) in db.session.query(EscalaLimpeza.data_escala).filter(EscalaLimpeza.data_escala.in_(datas)))
+    if conflitos: return conflitos
+    colunas = ('data_escala', 'funcionario_escritorio_id', 'funcionario_expedicao_id')
+    db.session.bulk_insert_mappings(EscalaLimpeza, [{c: item[c] for c in colunas} for item in plano]); invalidar_cache('escala')
+    return []
+
+def janela_escala(args):
+    """Página da escala por janela de datas (keyset na data): ?apos=AAAA-MM-DD avança, ?antes=AAAA-MM-DD volta.
+
+    Retorna (escalas, data_anterior, data_seguinte); as datas são os cursores dos links, ou None se não há mais."""
+    tamanho = current_app.config['ESCALA_TAMANHO_PAGINA']; query = EscalaLimpeza.query.options(db.joinedload(EscalaLimpeza.funcionario_escritorio), db.joinedload(EscalaLimpeza.funcionario_expedicao))
+    try: apos = datetime.strptime(args.get('apos', ''), '%Y-%m-%d').date()
+    except ValueError: apos = None
+    try: antes = datetime.strptime(args.get('antes', ''), '%Y-%m-%d').date()
+    except ValueError: antes = None
+    if antes and not apos:
+        escalas = query.filter(EscalaLimpeza.data_escala < antes).order_by(EscalaLimpeza.data_escala.desc()).limit(tamanho + 1).all()
+        mais_antigas = len(escalas) > tamanho; escalas = escalas[:tamanho][::-1]
+        return escalas, (escalas[0].data_escala if escalas and mais_antigas else None), (escalas[-1].data_escala if escalas else None)
+    filtro = EscalaLimpeza.data_escala > apos if apos else EscalaLimpeza.data_escala >= date.today() - timedelta(days=current_app.config['ESCALA_DIAS_ANTERIORES'])
+    escalas = query.filter(filtro).order_by(EscalaLimpeza.data_escala).limit(tamanho + 1).all()
+    mais_novas = len(escalas) > tamanho; escalas = escalas[:tamanho]
+    tem_anteriores = db.session.query(EscalaLimpeza.id).filter(EscalaLimpeza.data_escala < escalas[0].data_escala).first() is not None if escalas else False
+    return escalas, (escalas[0].data_escala if tem_anteriores else None), (escalas[-1].data_escala if mais_novas else None)
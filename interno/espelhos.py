@@ -0,0 +1,95 @@
+import csv
+import io
+import os
+import unicodedata
+import zipfile
+from datetime import date, datetime, timedelta
+from flask import current_app
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from .extensoes import db
+from .jornada import CalendarioJornada
+from .modelos import Funcionario, ResumoMensal, SaldoDiario
+from .registros import _filtrar_registros, _filtros, fonte_registros
+from .util import NOMES_MESES, format_timedelta
+
+# --- Espelho de ponto mensal (todos os funcionários de uma vez) ---
+DIAS_SEMANA = ['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb', 'Dom']
+
+def _nome_arquivo(funcionario):
+    nome = unicodedata.normalize('NFKD', funcionario.nome).encode('ascii', 'ignore').decode('ascii')
+    return f"{funcionario.id:04d}_{'_'.join(''.join(c if c.isalnum() else ' ' for c in nome).split()).lower() or 'funcionario'}.html"
+
+def _saldos_acumulados(fim):
+    """{funcionario_id: timedelta} do banco de horas até o fim do mês: SaldoDiario + ResumoMensal dos meses arquivados."""
+    totais = {}
+    diarios = db.session.query(SaldoDiario.funcionario_id, db.func.sum(SaldoDiario.saldo_segundos)).filter(SaldoDiario.data <= fim).group_by(SaldoDiario.funcionario_id)
+    mensais = db.session.query(ResumoMensal.funcionario_id, db.func.sum(ResumoMensal.saldo_segundos)).filter(ResumoMensal.ano * 100 + ResumoMensal.mes <= fim.year * 100 + fim.month).group_by(ResumoMensal.funcionario_id)
+    for f_id, segundos in list(diarios) + list(mensais): totais[f_id] = totais.get(f_id, 0) + int(segundos or 0)
+    return {f_id: timedelta(seconds=segundos) for f_id, segundos in totais.items()}
+
+def montar_espelhos(ano, mes):
+    """Contexto do espelho de cada funcionário no mês e do resumo geral, só com tipos simples (vão para outros processos).
+
+    Uma consulta para os funcionários, uma para os feriados (CalendarioJornada), uma para os registros
+    (com o arquivo, se o mês já foi arquivado) e duas agregadas para o saldo acumulado."""
+    inicio = date(ano, mes, 1); fim = date(ano + mes // 12, mes % 12 + 1, 1) - timedelta(days=1); hoje = date.today()
+    funcionarios = Funcionario.query.order_by(Funcionario.nome).all(); calendario_jornada = CalendarioJornada(inicio, fim)
+    filtros = _filtros(start_date=inicio, end_date=fim); fonte = fonte_registros(filtros).c
+    consulta = _filtrar_registros(db.session.query(fonte.funcionario_id, fonte.timestamp_entrada, fonte.timestamp_saida, fonte.observacao), filtros, fonte).order_by(fonte.funcionario_id, fonte.timestamp_entrada)
+    registros_por_dia = {}
+    for f_id, entrada, saida, obs in consulta: registros_por_dia.setdefault((f_id, entrada.date()), []).append((entrada, saida, obs))
+    saldos_acumulados = _saldos_acumulados(fim)
+    titulo = f'{NOMES_MESES[mes]}/{ano}'; gerado_em = datetime.now().strftime('%d/%m/%Y %H:%M'); espelhos = []; resumo = []
+    for funcionario in funcionarios:
+        dias = []; trabalhado_mes = esperado_mes = timedelta(0); dias_trabalhados = dias_sem_registro = 0
+        for dia, esperado in calendario_jornada.esperados(funcionario).items():
+            registros = registros_por_dia.get((funcionario.id, dia), [])
+            trabalhado = sum((saida - entrada for entrada, saida, _ in registros if saida), timedelta(0))
+            # Como no banco de horas: só os dias com registro entram no saldo
+            if registros: dias_trabalhados += 1; trabalhado_mes += trabalhado; esperado_mes += esperado
+            elif esperado and dia <= hoje: dias_sem_registro += 1
+            dias.append({'data_str': dia.strftime('%d/%m'), 'dia_semana': DIAS_SEMANA[dia.weekday()], 'feriado': calendario_jornada.nomes_feriados.get(dia), 'sem_registro': not registros and bool(esperado) and dia <= hoje,
+                         'registros': [(entrada.strftime('%H:%M'), saida.strftime('%H:%M') if saida else '(Aberto)', obs or '') for entrada, saida, obs in registros],
+                         'trabalhado': trabalhado if registros else None, 'esperado': esperado, 'saldo_dia': trabalhado - esperado if registros else None})
+        totais = {'nome': funcionario.nome, 'setor': funcionario.setor, 'dias_trabalhados': dias_trabalhados, 'dias_sem_registro': dias_sem_registro, 'trabalhado': trabalhado_mes, 'esperado': esperado_mes, 'saldo': trabalhado_mes - esperado_mes, 'saldo_acumulado': saldos_acumulados.get(funcionario.id, timedelta(0)), 'arquivo': _nome_arquivo(funcionario)}
+        espelhos.append({'titulo': titulo, 'gerado_em': gerado_em, 'funcionario': {'nome': funcionario.nome, 'setor': funcionario.setor, 'username': funcionario.username}, 'dias': dias, 'totais': totais})
+        resumo.append(totais)
+    return espelhos, {'titulo': titulo, 'gerado_em': gerado_em, 'linhas': resumo}
+
+# Roda nos processos do pool: só Jinja (ambiente próprio, sem app, sem contexto e sem banco)
+_ambiente = None
+
+def _iniciar_renderizacao(pasta_templates):
+    global _ambiente
+    _ambiente = Environment(loader=FileSystemLoader(pasta_templates), autoescape=select_autoescape(['html']))
+    _ambiente.filters['format_timedelta'] = format_timedelta
+
+def _renderizar(tarefa):
+    template, arquivo, contexto = tarefa
+    return arquivo, _ambiente.get_template(template).render(**contexto).encode('utf-8')
+
+def _resumo_csv(resumo):
+    buffer = io.StringIO(); writer = csv.writer(buffer, delimiter=current_app.config['EXPORT_CSV_DELIMITADOR'])
+    writer.writerow(['funcionario', 'setor', 'dias_trabalhados', 'dias_sem_registro', 'trabalhado', 'esperado', 'saldo_mes', 'saldo_acumulado'])
+    for t in resumo['linhas']: writer.writerow([t['nome'], t['setor'], t['dias_trabalhados'], t['dias_sem_registro'], format_timedelta(t['trabalhado']), format_timedelta(t['esperado']), format_timedelta(t['saldo']), format_timedelta(t['saldo_acumulado'])])
+    return ('\ufeff' + buffer.getvalue()).encode('utf-8')
+
+def gerar_espelhos(ano, mes, destino, processos=None):
+    """Grava em `destino` (caminho ou arquivo binário) um .zip com o espelho de cada funcionário e o resumo do mês.
+
+    Os dados saem do banco de uma vez (montar_espelhos); a renderização dos HTMLs é dividida entre
+    processos e cada arquivo vai para o zip assim que fica pronto. Retorna o número de espelhos."""
+    espelhos, resumo = montar_espelhos(ano, mes)
+    tarefas = [('espelho_ponto.html', 'espelhos/' + e['totais']['arquivo'], e) for e in espelhos] + [('espelhos_resumo.html', 'resumo.html', resumo)]
+    pasta_templates = os.path.join(current_app.root_path, current_app.template_folder)
+    processos = min(processos or current_app.config['ESPELHOS_PROCESSOS'] or os.cpu_count() or 1, len(tarefas))
+    with zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_DEFLATED) as arquivo_zip:
+        arquivo_zip.writestr('resumo.csv', _resumo_csv(resumo))
+        if processos == 1:
+            _iniciar_renderizacao(pasta_templates)
+            for nome, conteudo in map(_renderizar, tarefas): arquivo_zip.writestr(nome, conteudo)
+        else:
+            from concurrent.futures import ProcessPoolExecutor # Como no import-funcionarios: só carrega quando usado
+            with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_renderizacao, initargs=(pasta_templates,)) as executor:
+                for nome, conteudo in executor.map(_renderizar, tarefas, chunksize=max(1, len(tarefas) // (processos * 4))): arquivo_zip.writestr(nome, conteudo)
+    return len(espelhos)
@@ -0,0 +1,140 @@
+import bisect
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from flask import current_app
+
+# --- Cache em memória (por processo) ---
+class CacheLRU:
+    """Cache LRU limitado, com TTL opcional e seguro entre threads."""
+    def __init__(self, tamanho_maximo, ttl_segundos=None):
+        self.tamanho_maximo = tamanho_maximo; self.ttl_segundos = ttl_segundos; self._itens = OrderedDict(); self._lock = threading.Lock()
+    def get(self, chave, padrao=None):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None: return padrao
+            valor, expira_em = item
+            if expira_em is not None and expira_em < time.monotonic(): del self._itens[chave]; return padrao
+            self._itens.move_to_end(chave); return valor
+    def set(self, chave, valor):
+        with self._lock:
+            self._itens[chave] = (valor, time.monotonic() + self.ttl_segundos if self.ttl_segundos else None); self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo: self._itens.popitem(last=False)
+    def delete(self, chave):
+        with self._lock: self._itens.pop(chave, None)
+    def clear(self):
+        with self._lock: self._itens.clear()
+    def __len__(self): return len(self._itens)
+
+class LimitadorTentativas:
+    """Conta falhas por chave numa janela deslizante; bloqueia ao atingir o máximo."""
+    def __init__(self, max_tentativas, janela_segundos, max_chaves=10000):
+        self.max_tentativas = max_tentativas; self.janela_segundos = janela_segundos; self.max_chaves = max_chaves; self._falhas = OrderedDict(); self._lock = threading.Lock()
+    def _limpar(self, falhas, agora):
+        while falhas and falhas[0] <= agora - self.janela_segundos: falhas.popleft()
+    def segundos_bloqueado(self, chave):
+        agora = time.monotonic()
+        with self._lock:
+            falhas = self._falhas.get(chave)
+            if not falhas: return 0
+            self._limpar(falhas, agora)
+            return int(falhas[0] + self.janela_segundos - agora) + 1 if len(falhas) >= self.max_tentativas else 0
+    def registrar_falha(self, chave):
+        agora = time.monotonic()
+        with self._lock:
+            falhas = self._falhas.setdefault(chave, deque()); self._limpar(falhas, agora); falhas.append(agora); self._falhas.move_to_end(chave)
+            while len(self._falhas) > self.max_chaves: self._falhas.popitem(last=False)
+    def limpar(self, chave):
+        with self._lock: self._falhas.pop(chave, None)
+
+# --- Métricas (por processo) ---
+class MetricasRequisicoes:
+    """Contadores por endpoint: requisições por status, histograma de latência, nº de consultas e tempo no banco.
+
+    Tudo em memória e por processo (cada worker do gunicorn tem os seus); o custo por requisição é um lock e somas."""
+    def __init__(self, limites, max_lentas):
+        self.limites = tuple(limites); self._lock = threading.Lock(); self._endpoints = {}; self.consultas_lentas = deque(maxlen=max_lentas); self.requisicoes_lentas = deque(maxlen=max_lentas); self.total_consultas_lentas = 0
+    def registrar(self, endpoint, metodo, status, duracao, consultas, tempo_banco, lenta):
+        with self._lock:
+            dados = self._endpoints.get(endpoint)
+            if dados is None: dados = self._endpoints[endpoint] = {'status': {}, 'buckets': [0] * (len(self.limites) + 1), 'soma': 0.0, 'total': 0, 'consultas': 0, 'tempo_banco': 0.0, 'lentas': 0}
+            chave = (metodo, status); dados['status'][chave] = dados['status'].get(chave, 0) + 1
+            dados['buckets'][bisect.bisect_left(self.limites, duracao)] += 1; dados['soma'] += duracao; dados['total'] += 1
+            dados['consultas'] += consultas; dados['tempo_banco'] += tempo_banco; dados['lentas'] += lenta
+    def registrar_consulta_lenta(self, registro):
+        with self._lock: self.consultas_lentas.append(registro); self.total_consultas_lentas += 1
+    def registrar_requisicao_lenta(self, registro):
+        with self._lock: self.requisicoes_lentas.append(registro)
+    def copia(self):
+        with self._lock: return {endpoint: dict(dados, status=dict(dados['status']), buckets=list(dados['buckets'])) for endpoint, dados in self._endpoints.items()}
+    def limpar(self):
+        with self._lock: self._endpoints.clear(); self.consultas_lentas.clear(); self.requisicoes_lentas.clear(); self.total_consultas_lentas = 0
+    def percentil(self, buckets, p):
+        """Estimativa pelo histograma: limite superior do bucket onde cai o percentil (None acima do último limite)."""
+        total = sum(buckets); alvo = total * p / 100; acumulado = 0
+        for limite, quantidade in zip(self.limites + (None,), buckets):
+            acumulado += quantidade
+            if total and acumulado >= alvo: return limite
+        return None
+
+# --- Quadro de presença (por processo) ---
+class IndicePresenca:
+    """Registros de ponto em aberto (quem está trabalhando agora), por funcionário.
+
+    Carregado do banco inteiro de tempos em tempos e atualizado no meio do caminho pelas batidas
+    deste processo. Quem espera por mudanças (streams SSE) dorme em uma Condition até a versão mudar."""
+    def __init__(self):
+        self._condicao = threading.Condition(); self._abertos = {}; self._funcionarios = {}; self.versao = 0; self.carregado_em = None; self._json = None
+    def precisa_carregar(self, intervalo):
+        with self._condicao: return self.carregado_em is None or time.monotonic() - self.carregado_em > intervalo
+    def _alterado(self):
+        self.versao += 1; self._json = None; self._condicao.notify_all()
+    def carregar(self, funcionarios, abertos):
+        """funcionarios: {id: (nome, setor)}; abertos: {funcionario_id: entrada}. Só muda a versão se algo mudou."""
+        with self._condicao:
+            mudou = abertos != self._abertos or funcionarios != self._funcionarios
+            self._funcionarios = funcionarios; self._abertos = abertos; self.carregado_em = time.monotonic()
+            if mudou: self._alterado()
+    def invalidar(self):
+        with self._condicao: self.carregado_em = None; self._condicao.notify_all()
+    def aplicar(self, alteracoes):
+        """Batidas já gravadas (após o commit): [(funcionario_id, 'entrada'|'saida', momento)]."""
+        with self._condicao:
+            if self.carregado_em is None: return # Ainda não carregado: a carga vai ler do banco
+            for funcionario_id, tipo, momento in alteracoes:
+                if funcionario_id not in self._funcionarios: self.carregado_em = None; continue
+                if tipo == 'entrada': self._abertos[funcionario_id] = momento
+                else: self._abertos.pop(funcionario_id, None)
+            self._alterado()
+    def esperar(self, versao, timeout):
+        """Bloqueia até a versão mudar (ou o índice precisar ser recarregado) ou o timeout passar."""
+        with self._condicao: self._condicao.wait_for(lambda: self.versao != versao or self.carregado_em is None, timeout)
+    def foto(self, serializar):
+        """(versao, texto) do estado atual; serializar(abertos, funcionarios) roda uma vez por versão, não por stream."""
+        with self._condicao:
+            if self._json is None: self._json = serializar(dict(self._abertos), self._funcionarios)
+            return self.versao, self._json
+
+# --- Estado de cada app (caches, limitador de login, métricas, presença) ---
+class EstadoApp:
+    """Tudo que o app guarda em memória entre requisições. Um por app e por processo (cada worker tem o seu)."""
+    def __init__(self, config):
+        self.usuarios = CacheLRU(config['USUARIO_CACHE_TAMANHO'], config['USUARIO_CACHE_TTL_SEGUNDOS'])
+        self.limitador_login = LimitadorTentativas(config['LOGIN_MAX_TENTATIVAS'], config['LOGIN_JANELA_SEGUNDOS'])
+        self.semaforo_hash = threading.BoundedSemaphore(config['LOGIN_HASH_CONCORRENCIA'])
+        self.paginas = CacheLRU(config['PAGINAS_CACHE_TAMANHO'])
+        self.versoes = {'lido_em': None, 'versoes': {}}
+        self.inicio_processo = datetime.utcnow().replace(microsecond=0)
+        self.hashes_estaticos = {}
+        self.metricas = MetricasRequisicoes(config['METRICAS_LIMITES_HISTOGRAMA'], config['METRICAS_ULTIMAS_LENTAS'])
+        self.presenca = IndicePresenca(); self.semaforo_presenca = threading.BoundedSemaphore(config['PRESENCA_MAX_CONEXOES'])
+
+_lock_estado = threading.Lock()
+
+def estado(app=None):
+    """EstadoApp do app atual, criado no primeiro uso (e não no create_app: comandos de CLI nem chegam a precisar dele)."""
+    app = app or current_app._get_current_object(); atual = app.extensions.get('interno')
+    if atual is None:
+        with _lock_estado: atual = app.extensions.setdefault('interno', EstadoApp(app.config))
+    return atual
@@ -0,0 +1,8 @@
+from flask_login import LoginManager
+from flask_sqlalchemy import SQLAlchemy
+
+# Criadas sem app: create_app() chama init_app em cada uma
+db = SQLAlchemy()
+
+login_manager = LoginManager(); login_manager.login_view = 'auth.login'
+login_manager.login_message = 'Você precisa estar logado para acessar esta página.'; login_manager.login_message_category = 'danger'
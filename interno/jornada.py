@@ -0,0 +1,226 @@
+from datetime import date, datetime, timedelta, timezone
+from flask import current_app
+from .extensoes import db
+from .modelos import BatidaSincronizada, Feriado, Funcionario, RegistroPonto, ResumoMensal, SaldoDiario
+from .presenca import registrar_batida_presenca
+from .util import _iniciar_transacao_escrita
+
+# --- Lógica Banco de Horas ---
+DATA_REFERENCIA_GRUPO_A = date(2025, 1, 1); SEMANA_REFERENCIA = DATA_REFERENCIA_GRUPO_A.isocalendar()[1]
+
+def _duracao_esperada(funcionario, day_of_week, semana_grupo, eh_feriado):
+    """Regra de jornada de um dia, sem acesso ao banco (feriado já resolvido por quem chama)."""
+    if day_of_week == 6 or eh_feriado: return timedelta(0)
+    horario_inicio = 9 if funcionario.horario_especial_09 else 8
+    if day_of_week == 5:
+        if funcionario.grupo_sabado and funcionario.grupo_sabado == semana_grupo: return timedelta(hours=4)
+        else: return timedelta(0)
+    else:
+        trabalha_sabado_na_semana = (funcionario.grupo_sabado and funcionario.grupo_sabado == semana_grupo)
+        if trabalha_sabado_na_semana: return timedelta(hours=7) if horario_inicio == 9 else timedelta(hours=8)
+        else:
+            if day_of_week <= 3: return timedelta(hours=8) if horario_inicio == 9 else timedelta(hours=9)
+            elif day_of_week == 4: return timedelta(hours=7) if horario_inicio == 9 else timedelta(hours=8)
+            else: return timedelta(0)
+
+def _grupo_da_semana(target_date):
+    target_week = target_date.isocalendar()[1]
+    return 'A' if (target_week - SEMANA_REFERENCIA) % 2 == 0 else 'B'
+
+# --- get_expected_work_duration CORRIGIDO ---
+def get_expected_work_duration(funcionario, target_date):
+    if target_date.weekday() == 6: return timedelta(0)
+    eh_feriado = Feriado.query.filter_by(data=target_date).first() is not None
+    return _duracao_esperada(funcionario, target_date.weekday(), _grupo_da_semana(target_date), eh_feriado)
+
+class CalendarioJornada:
+    """Jornada esperada para um intervalo de datas, com os feriados carregados em uma única query.
+
+    Os atributos por dia (dia da semana, grupo de sábado da semana ISO, feriado) são calculados
+    uma vez para o intervalo todo; cada funcionário só aplica as regras sobre esses vetores.
+    """
+    def __init__(self, data_inicio, data_fim):
+        if data_fim < data_inicio: data_inicio, data_fim = data_fim, data_inicio
+        self.data_inicio = data_inicio; self.data_fim = data_fim
+        total_dias = (data_fim - data_inicio).days + 1
+        self.dias = [data_inicio + timedelta(days=i) for i in range(total_dias)]
+        self.nomes_feriados = feriados = {f.data: f.nome for f in Feriado.query.filter(Feriado.data >= data_inicio, Feriado.data <= data_fim).all()}
+        self.dias_semana = [d.weekday() for d in self.dias]
+        self.grupos_semana = [_grupo_da_semana(d) for d in self.dias]
+        self.feriados = [d in feriados for d in self.dias]
+        self._por_perfil = {}
+
+    def _vetor(self, funcionario):
+        # As regras só dependem de (grupo_sabado, horario_especial_09): funcionários com o mesmo perfil compartilham o vetor
+        perfil = (funcionario.grupo_sabado, bool(funcionario.horario_especial_09))
+        if perfil not in self._por_perfil:
+            self._por_perfil[perfil] = [_duracao_esperada(funcionario, dow, grupo, fer) for dow, grupo, fer in zip(self.dias_semana, self.grupos_semana, self.feriados)]
+        return self._por_perfil[perfil]
+
+    def esperado(self, funcionario, dia):
+        indice = (dia - self.data_inicio).days
+        if indice < 0 or indice >= len(self.dias): return get_expected_work_duration(funcionario, dia)
+        return self._vetor(funcionario)[indice]
+
+    def esperados(self, funcionario):
+        return dict(zip(self.dias, self._vetor(funcionario)))
+
+def calcular_jornadas_esperadas(funcionarios, data_inicio, data_fim):
+    """Retorna {funcionario_id: {data: timedelta}} para todos os dias do intervalo (inclusivo)."""
+    if not isinstance(funcionarios, (list, tuple)): funcionarios = [funcionarios]
+    cal = CalendarioJornada(data_inicio, data_fim)
+    return {f.id: cal.esperados(f) for f in funcionarios}
+
+# --- Banco de Horas Materializado (SaldoDiario) ---
+def _calcular_saldos(registros, funcionarios_por_id):
+    """Agrupa registros por (funcionario_id, dia) e retorna {(id, dia): (trabalhado_s, esperado_s)}."""
+    trabalhado_por_dia = {}
+    for r in registros:
+        chave = (r.funcionario_id, r.timestamp_entrada.date())
+        segundos = int((r.timestamp_saida - r.timestamp_entrada).total_seconds()) if r.timestamp_saida else 0
+        trabalhado_por_dia[chave] = trabalhado_por_dia.get(chave, 0) + segundos
+    if not trabalhado_por_dia: return {}
+    dias = [dia for _, dia in trabalhado_por_dia]; calendario_jornada = CalendarioJornada(min(dias), max(dias)); resultado = {}
+    for (func_id, dia), trabalhado in trabalhado_por_dia.items():
+        funcionario = funcionarios_por_id.get(func_id)
+        esperado = int(calendario_jornada.esperado(funcionario, dia).total_seconds()) if funcionario else 0
+        resultado[(func_id, dia)] = (trabalhado, esperado)
+    return resultado
+
+def pares_arquivados(pares):
+    """Dos pares (funcionario_id, dia), os que já estão no arquivo (somados no ResumoMensal)."""
+    # O mês corrente nunca é arquivado (archive-ponto só aceita meses encerrados): a batida do dia a dia não consulta nada
+    antigos = {par for par in pares if par[1] < date.today().replace(day=1)}
+    if not antigos: return set()
+    from .registros import dias_arquivados # registros.py importa este módulo
+    return dias_arquivados({f_id for f_id, _ in antigos}, min(dia for _, dia in antigos), max(dia for _, dia in antigos)) & antigos
+
+def _recusar_pares_arquivados(pares):
+    # Um registro novo num dia arquivado contaria o dia duas vezes (SaldoDiario e ResumoMensal)
+    arquivados = pares_arquivados(pares)
+    if arquivados: f_id, dia = min(arquivados, key=lambda par: par[1]); raise ValueError(f'O dia {dia:%d/%m/%Y} do funcionário {f_id} já foi arquivado e não pode ser alterado.')
+
+def atualizar_saldos_dias(pares):
+    """Recalcula o SaldoDiario dos pares (funcionario_id, dia) informados, na sessão atual (sem commit).
+
+    Levanta ValueError se algum dos dias já foi arquivado (quem chama faz o rollback)."""
+    pares = {(f_id, dia) for f_id, dia in pares if f_id and dia}
+    if not pares: return
+    _recusar_pares_arquivados(pares)
+    ids = {f_id for f_id, _ in pares}; dias = [dia for _, dia in pares]
+    inicio = datetime.combine(min(dias), datetime.min.time()); fim = datetime.combine(max(dias), datetime.min.time()) + timedelta(days=1)
+    registros = [r for r in RegistroPonto.query.filter(RegistroPonto.funcionario_id.in_(ids), RegistroPonto.timestamp_entrada >= inicio, RegistroPonto.timestamp_entrada < fim).all() if (r.funcionario_id, r.timestamp_entrada.date()) in pares]
+    funcionarios_por_id = {f.id: f for f in Funcionario.query.filter(Funcionario.id.in_(ids)).all()}
+    calculados = _calcular_saldos(registros, funcionarios_por_id)
+    existentes = {(s.funcionario_id, s.data): s for s in SaldoDiario.query.filter(SaldoDiario.funcionario_id.in_(ids), SaldoDiario.data >= min(dias), SaldoDiario.data <= max(dias)).all()}
+    for par in pares:
+        saldo = existentes.get(par)
+        if par not in calculados:
+            if saldo: db.session.delete(saldo)
+            continue
+        trabalhado, esperado = calculados[par]
+        if not saldo: saldo = SaldoDiario(funcionario_id=par[0], data=par[1]); db.session.add(saldo)
+        saldo.trabalhado_segundos = trabalhado; saldo.esperado_segundos = esperado; saldo.saldo_segundos = trabalhado - esperado
+
+def atualizar_saldos_em_massa(pares):
+    """Como atualizar_saldos_dias, mas com bulk insert/update e leitura só das colunas: para importações grandes."""
+    pares = {(f_id, dia) for f_id, dia in pares if f_id and dia}
+    if not pares: return
+    _recusar_pares_arquivados(pares)
+    ids = {f_id for f_id, _ in pares}; dias = [dia for _, dia in pares]
+    inicio = datetime.combine(min(dias), datetime.min.time()); fim = datetime.combine(max(dias), datetime.min.time()) + timedelta(days=1)
+    consulta = db.session.query(RegistroPonto.funcionario_id, RegistroPonto.timestamp_entrada, RegistroPonto.timestamp_saida).filter(RegistroPonto.funcionario_id.in_(ids), RegistroPonto.timestamp_entrada >= inicio, RegistroPonto.timestamp_entrada < fim)
+    registros = [r for r in consulta if (r.funcionario_id, r.timestamp_entrada.date()) in pares]
+    calculados = _calcular_saldos(registros, {f.id: f for f in Funcionario.query.filter(Funcionario.id.in_(ids)).all()})
+    existentes = {(f_id, dia): s_id for s_id, f_id, dia in db.session.query(SaldoDiario.id, SaldoDiario.funcionario_id, SaldoDiario.data).filter(SaldoDiario.funcionario_id.in_(ids), SaldoDiario.data >= min(dias), SaldoDiario.data <= max(dias)) if (f_id, dia) in pares}
+    novos = []; alterados = []
+    for (f_id, dia), (trabalhado, esperado) in calculados.items():
+        valores = {'trabalhado_segundos': trabalhado, 'esperado_segundos': esperado, 'saldo_segundos': trabalhado - esperado}
+        if (f_id, dia) in existentes: alterados.append(dict(valores, id=existentes[(f_id, dia)]))
+        else: novos.append(dict(valores, funcionario_id=f_id, data=dia))
+    removidos = [s_id for par, s_id in existentes.items() if par not in calculados]
+    if novos: db.session.bulk_insert_mappings(SaldoDiario, novos)
+    if alterados: db.session.bulk_update_mappings(SaldoDiario, alterados)
+    if removidos: SaldoDiario.query.filter(SaldoDiario.id.in_(removidos)).delete(synchronize_session=False)
+
+def atualizar_saldos_data(dia):
+    """Recalcula o esperado de todos os funcionários com saldo no dia (ex.: feriado criado/removido).
+
+    Levanta ValueError se o dia tem registros arquivados: o esperado deles está somado no ResumoMensal."""
+    from .registros import dias_arquivados
+    if dia < date.today().replace(day=1) and dias_arquivados(inicio=dia, fim=dia): raise ValueError(f'O dia {dia:%d/%m/%Y} já foi arquivado: feriados desse dia não podem mais ser alterados.')
+    atualizar_saldos_dias({(s.funcionario_id, s.data) for s in SaldoDiario.query.filter_by(data=dia).all()})
+
+def saldo_banco_horas(funcionario_id):
+    """Saldo acumulado de todo o histórico do funcionário: SaldoDiario + ResumoMensal dos meses arquivados."""
+    total = db.session.query(db.func.coalesce(db.func.sum(SaldoDiario.saldo_segundos), 0)).filter(SaldoDiario.funcionario_id == funcionario_id).scalar()
+    arquivado = db.session.query(db.func.coalesce(db.func.sum(ResumoMensal.saldo_segundos), 0)).filter(ResumoMensal.funcionario_id == funcionario_id).scalar()
+    return timedelta(seconds=int(total) + int(arquivado))
+
+def calcular_saldos_completos():
+    """Recalcula todo o banco de horas a partir dos RegistroPonto (usado pelos comandos de CLI)."""
+    funcionarios_por_id = {f.id: f for f in Funcionario.query.all()}
+    registros = RegistroPonto.query.order_by(RegistroPonto.funcionario_id, RegistroPonto.timestamp_entrada).yield_per(1000)
+    return _calcular_saldos(registros, funcionarios_por_id)
+
+# --- Batida de Ponto (entrada/saída) ---
+def registrar_batida(funcionario_id, momento):
+    """Alterna entrada/saída de forma atômica e idempotente. Não faz commit.
+
+    Retorna 'entrada', 'saida', 'duplicado' (batida repetida dentro de PONTO_JANELA_DUPLICIDADE_SEGUNDOS) ou
+    'rejeitado' (horário não posterior à entrada em aberto, ex.: relógio atrasado): nunca abre um segundo registro.
+    """
+    _iniciar_transacao_escrita()
+    ultimo = RegistroPonto.query.filter_by(funcionario_id=funcionario_id).order_by(RegistroPonto.timestamp_entrada.desc()).first()
+    if ultimo:
+        ultimo_evento = max(ultimo.timestamp_entrada, ultimo.timestamp_saida or ultimo.timestamp_entrada)
+        if abs((momento - ultimo_evento).total_seconds()) < current_app.config['PONTO_JANELA_DUPLICIDADE_SEGUNDOS']: return 'duplicado'
+    registro_aberto = RegistroPonto.query.filter(RegistroPonto.funcionario_id == funcionario_id, RegistroPonto.timestamp_saida == None).order_by(RegistroPonto.timestamp_entrada.desc()).with_for_update().first()
+    if registro_aberto and momento <= registro_aberto.timestamp_entrada: return 'rejeitado'
+    if registro_aberto:
+        registro_aberto.timestamp_saida = momento; tipo = 'saida'; dia_registro = registro_aberto.timestamp_entrada.date()
+    else:
+        db.session.add(RegistroPonto(funcionario_id=funcionario_id, timestamp_entrada=momento)); tipo = 'entrada'; dia_registro = momento.date()
+    atualizar_saldos_dias({(funcionario_id, dia_registro)}); registrar_batida_presenca(funcionario_id, tipo, momento)
+    return tipo
+
+# --- Sincronização de Batidas Offline ---
+def _parse_momento_cliente(valor):
+    """ISO 8601 enviado pelo navegador (ex.: '2025-01-02T11:00:05.123Z') -> datetime UTC sem fuso, como no banco."""
+    momento = datetime.fromisoformat(str(valor).replace('Z', '+00:00'))
+    if momento.tzinfo: momento = momento.astimezone(timezone.utc).replace(tzinfo=None)
+    return momento.replace(microsecond=0)
+
+def sincronizar_batidas(funcionario_id, batidas):
+    """Aplica batidas capturadas offline em ordem cronológica. Não faz commit.
+
+    Retorna uma lista de {'id', 'status', 'motivo'}; status 'outro_usuario' indica que a batida
+    deve continuar na fila do aparelho até o dono dela fazer login. Batida reenviada volta como
+    'ja_recebida', com o status da primeira vez em 'status_original'. Batida sem dono é recusada.
+    """
+    agora = datetime.utcnow(); resultados = []; validas = []
+    limite_passado = agora - timedelta(days=current_app.config['PONTO_OFFLINE_MAX_DIAS']); limite_futuro = agora + timedelta(seconds=current_app.config['PONTO_OFFLINE_TOLERANCIA_FUTURO_SEGUNDOS'])
+    ids = [str(b.get('id', ''))[:64] for b in batidas if isinstance(b, dict)]
+    ja_recebidas = {b.id_cliente: b.resultado for b in BatidaSincronizada.query.filter(BatidaSincronizada.id_cliente.in_(ids)).all()} if ids else {}
+    for batida in batidas:
+        if not isinstance(batida, dict) or not batida.get('id'): resultados.append({'id': None, 'status': 'rejeitado', 'motivo': 'Batida sem identificador.'}); continue
+        id_cliente = str(batida['id'])[:64]
+        if id_cliente in ja_recebidas: resultados.append({'id': id_cliente, 'status': 'ja_recebida', 'status_original': ja_recebidas[id_cliente], 'motivo': 'Batida já recebida antes.'}); continue
+        # Sem dono não dá para saber de quem é a batida: nunca credita a quem estiver sincronizando
+        if batida.get('funcionario_id') in (None, ''): resultados.append({'id': id_cliente, 'status': 'rejeitado', 'motivo': 'Batida sem funcionário identificado.'}); continue
+        if str(batida['funcionario_id']) != str(funcionario_id): resultados.append({'id': id_cliente, 'status': 'outro_usuario', 'motivo': 'Batida de outro usuário.'}); continue
+        try: momento = _parse_momento_cliente(batida.get('capturado_em'))
+        except (TypeError, ValueError): resultados.append({'id': id_cliente, 'status': 'rejeitado', 'motivo': 'Horário inválido.'}); continue
+        if momento < limite_passado or momento > limite_futuro: resultados.append({'id': id_cliente, 'status': 'rejeitado', 'motivo': 'Horário fora do intervalo aceito.'}); continue
+        validas.append((momento, id_cliente)); ja_recebidas[id_cliente] = 'pendente'
+    for momento, id_cliente in sorted(validas):
+        _iniciar_transacao_escrita()
+        ultimo = RegistroPonto.query.filter_by(funcionario_id=funcionario_id).order_by(RegistroPonto.timestamp_entrada.desc()).first()
+        ultimo_evento = max(ultimo.timestamp_entrada, ultimo.timestamp_saida or ultimo.timestamp_entrada) if ultimo else None
+        if ultimo_evento and momento < ultimo_evento: status = 'rejeitado'; motivo = 'Anterior ao último registro de ponto.'
+        elif pares_arquivados({(funcionario_id, momento.date())}): status = 'rejeitado'; motivo = 'Dia já arquivado.'
+        else:
+            status = registrar_batida(funcionario_id, momento); motivo = 'Não é posterior à entrada em aberto.' if status == 'rejeitado' else None
+        db.session.add(BatidaSincronizada(id_cliente=id_cliente, funcionario_id=funcionario_id, capturado_em=momento, resultado=status))
+        resultados.append({'id': id_cliente, 'status': status, 'motivo': motivo})
+    return resultados
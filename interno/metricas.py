@@ -0,0 +1,66 @@
+import time
+from datetime import datetime
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from .estado import estado
+
+# --- Instrumentação: tempo de cada comando SQL e de cada requisição ---
+def _inicio_consulta(conn, cursor, statement, parameters, context, executemany):
+    # Guardado no contexto do próprio comando (e não numa pilha da conexão): comando que falha não deixa sobra
+    if context is not None: context._metricas_inicio = time.perf_counter()
+
+def _instrumentar_engine(app, engine):
+    event.listen(engine, 'before_cursor_execute', _inicio_consulta)
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _fim_consulta(conn, cursor, statement, parameters, context, executemany):
+        inicio = getattr(context, '_metricas_inicio', None)
+        if inicio is None: return
+        duracao = time.perf_counter() - inicio
+        if has_request_context() and 'metricas_inicio' in g: g.metricas_consultas += 1; g.metricas_tempo_banco += duracao
+        if duracao >= app.config['CONSULTA_LENTA_SEGUNDOS']:
+            # Só o SQL, sem os parâmetros: podem conter hash de senha ou dados pessoais
+            endpoint = request.endpoint if has_request_context() else None
+            estado(app).metricas.registrar_consulta_lenta({'quando': datetime.now(), 'duracao': duracao, 'endpoint': endpoint, 'sql': statement})
+            app.logger.warning('Consulta lenta (%.0f ms, endpoint=%s): %s', duracao * 1000, endpoint, statement)
+
+def _iniciar_metricas():
+    if current_app.config['METRICAS_ATIVAS']: g.metricas_inicio = time.perf_counter(); g.metricas_consultas = 0; g.metricas_tempo_banco = 0.0
+
+def _status_metricas(resposta):
+    g.metricas_status = resposta.status_code; return resposta
+
+def _registrar_metricas(erro=None):
+    # No teardown (e não no after_request) para incluir respostas em streaming e exceções não tratadas
+    if 'metricas_inicio' not in g: return
+    duracao = time.perf_counter() - g.pop('metricas_inicio'); endpoint = request.endpoint or 'sem_rota'; status = 500 if erro else g.get('metricas_status', 500)
+    lenta = duracao >= current_app.config['REQUISICAO_LENTA_SEGUNDOS']; metricas = estado().metricas
+    metricas.registrar(endpoint, request.method, status, duracao, g.metricas_consultas, g.metricas_tempo_banco, lenta)
+    if lenta:
+        metricas.registrar_requisicao_lenta({'quando': datetime.now(), 'duracao': duracao, 'endpoint': endpoint, 'metodo': request.method, 'caminho': request.path, 'status': status, 'consultas': g.metricas_consultas, 'tempo_banco': g.metricas_tempo_banco})
+        current_app.logger.warning('Requisição lenta: %s %s -> %s em %.0f ms (%d consultas, %.0f ms no banco)', request.method, request.path, status, duracao * 1000, g.metricas_consultas, g.metricas_tempo_banco * 1000)
+
+def init_app(app, engines):
+    for engine in engines: _instrumentar_engine(app, engine)
+    app.before_request(_iniciar_metricas); app.after_request(_status_metricas); app.teardown_request(_registrar_metricas)
+
+def _escapar_rotulo(valor): return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def metricas_prometheus():
+    """Métricas no formato de texto do Prometheus (0.0.4)."""
+    def rotulos(**valores): return '{' + ','.join(f'{chave}="{_escapar_rotulo(valor)}"' for chave, valor in valores.items()) + '}'
+    metricas = estado().metricas; dados = metricas.copia(); linhas = []
+    linhas += ['# HELP app_requisicoes_total Requisições atendidas, por endpoint, método e status.', '# TYPE app_requisicoes_total counter']
+    linhas += [f'app_requisicoes_total{rotulos(endpoint=e, metodo=m, status=st)} {n}' for e, d in sorted(dados.items()) for (m, st), n in sorted(d['status'].items())]
+    linhas += ['# HELP app_requisicao_duracao_segundos Duração das requisições.', '# TYPE app_requisicao_duracao_segundos histogram']
+    for e, d in sorted(dados.items()):
+        acumulado = 0
+        for limite, quantidade in zip(metricas.limites + ('+Inf',), d['buckets']): acumulado += quantidade; linhas.append(f'app_requisicao_duracao_segundos_bucket{rotulos(endpoint=e, le=limite)} {acumulado}')
+        linhas += [f"app_requisicao_duracao_segundos_sum{rotulos(endpoint=e)} {d['soma']:.6f}", f"app_requisicao_duracao_segundos_count{rotulos(endpoint=e)} {d['total']}"]
+    linhas += ['# HELP app_consultas_sql_total Comandos SQL executados durante as requisições.', '# TYPE app_consultas_sql_total counter']
+    linhas += [f"app_consultas_sql_total{rotulos(endpoint=e)} {d['consultas']}" for e, d in sorted(dados.items())]
+    linhas += ['# HELP app_tempo_banco_segundos_total Tempo gasto em comandos SQL durante as requisições.', '# TYPE app_tempo_banco_segundos_total counter']
+    linhas += [f"app_tempo_banco_segundos_total{rotulos(endpoint=e)} {d['tempo_banco']:.6f}" for e, d in sorted(dados.items())]
+    linhas += ['# HELP app_requisicoes_lentas_total Requisições acima de REQUISICAO_LENTA_SEGUNDOS.', '# TYPE app_requisicoes_lentas_total counter']
+    linhas += [f"app_requisicoes_lentas_total{rotulos(endpoint=e)} {d['lentas']}" for e, d in sorted(dados.items())]
+    linhas += ['# HELP app_consultas_lentas_total Comandos SQL acima de CONSULTA_LENTA_SEGUNDOS.', '# TYPE app_consultas_lentas_total counter', f'app_consultas_lentas_total {metricas.total_consultas_lentas}']
+    return '\n'.join(linhas) + '\n'
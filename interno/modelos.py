@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+from flask import current_app
+from flask_login import UserMixin
+from sqlalchemy.orm import validates
+from werkzeug.security import generate_password_hash, check_password_hash
+from .estado import estado
+from .extensoes import db, login_manager
+
+class Funcionario(db.Model, UserMixin):
+    __table_args__ = (db.Index('ix_funcionario_nascimento_mes_dia', 'nascimento_mes', 'nascimento_dia'),)
+    id=db.Column(db.Integer, primary_key=True); nome=db.Column(db.String(100), nullable=False); setor=db.Column(db.String(50), nullable=False); data_nascimento=db.Column(db.Date, nullable=False); nascimento_mes=db.Column(db.Integer, nullable=True); nascimento_dia=db.Column(db.Integer, nullable=True); username=db.Column(db.String(80), unique=True, nullable=False); password_hash=db.Column(db.String(256), nullable=False); role=db.Column(db.String(20), nullable=False, default='user'); grupo_sabado=db.Column(db.String(1), nullable=True); horario_especial_09=db.Column(db.Boolean, nullable=False, default=False); registros_ponto=db.relationship('RegistroPonto', backref='funcionario', lazy='dynamic'); escalas_escritorio=db.relationship('EscalaLimpeza', foreign_keys='EscalaLimpeza.funcionario_escritorio_id', backref='func_escritorio', lazy=True); escalas_expedicao=db.relationship('EscalaLimpeza', foreign_keys='EscalaLimpeza.funcionario_expedicao_id', backref='func_expedicao', lazy=True)
+    def set_password(self, password): self.password_hash = generate_password_hash(password, method=current_app.config['PASSWORD_HASH_METHOD'])
+    def precisa_atualizar_hash(self): return self.password_hash.split('$', 1)[0] != prefixo_hash(current_app.config['PASSWORD_HASH_METHOD'])
+    def check_password(self, password): return check_password_hash(self.password_hash, password)
+    @validates('data_nascimento')
+    def _atualiza_mes_dia_nascimento(self, key, valor):
+        # Mês/dia salvos em colunas próprias para as buscas de aniversário usarem índice
+        self.nascimento_mes = valor.month if valor else None; self.nascimento_dia = valor.day if valor else None
+        return valor
+    # --- __repr__ CORRIGIDO ---
+    def __repr__(self):
+        return f'<Funcionario {self.nome} ({self.role})>'
+
+class UsuarioSessao(UserMixin):
+    """Cópia leve do Funcionario logado, guardada no cache para não consultar o banco a cada requisição."""
+    def __init__(self, funcionario):
+        self.id = funcionario.id; self.nome = funcionario.nome; self.username = funcionario.username; self.role = funcionario.role; self.setor = funcionario.setor; self.grupo_sabado = funcionario.grupo_sabado; self.horario_especial_09 = funcionario.horario_especial_09
+    def __repr__(self):
+        return f'<UsuarioSessao {self.nome} ({self.role})>'
+
+@lru_cache(maxsize=8)
+def prefixo_hash(metodo):
+    # Prefixo exato que o werkzeug grava para o método (ex.: 'scrypt:32768:8:1'), calculado uma vez por processo
+    return generate_password_hash('', method=metodo).split('$', 1)[0]
+
+@login_manager.user_loader
+def load_user(user_id):
+    # A chave inclui a versão compartilhada de 'funcionarios' (invalidar_cache('funcionarios') em todo cadastro,
+    # alteração ou exclusão): em qualquer worker, um usuário excluído ou rebaixado sai do cache em até CACHE_VERSOES_TTL_SEGUNDOS
+    from .cache import versoes_cache # cache.py importa os modelos
+    user_id = int(user_id); chave = (user_id, versoes_cache().get('funcionarios', (0,))[0])
+    usuarios = estado().usuarios; usuario = usuarios.get(chave)
+    if usuario is None:
+        funcionario = db.session.get(Funcionario, user_id)
+        if funcionario is None: return None
+        usuario = UsuarioSessao(funcionario); usuarios.set(chave, usuario)
+    return usuario
+
+class Aviso(db.Model):
+    id=db.Column(db.Integer, primary_key=True); titulo=db.Column(db.String(200), nullable=False); conteudo=db.Column(db.Text, nullable=False); data_postagem=db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    # --- __repr__ CORRIGIDO ---
+    def __repr__(self):
+        return f'<Aviso {self.titulo}>'
+
+class Feriado(db.Model):
+    id=db.Column(db.Integer, primary_key=True); data=db.Column(db.Date, nullable=False, unique=True); nome=db.Column(db.String(100), nullable=False)
+    # --- __repr__ CORRIGIDO ---
+    def __repr__(self):
+        return f'<Feriado {self.nome} em {self.data}>'
+
+class EscalaLimpeza(db.Model):
+    id=db.Column(db.Integer, primary_key=True); data_escala=db.Column(db.Date, nullable=False, unique=True); funcionario_escritorio_id=db.Column(db.Integer, db.ForeignKey('funcionario.id'), nullable=False); funcionario_expedicao_id=db.Column(db.Integer, db.ForeignKey('funcionario.id'), nullable=False); funcionario_escritorio=db.relationship('Funcionario', foreign_keys=[funcionario_escritorio_id]); funcionario_expedicao=db.relationship('Funcionario', foreign_keys=[funcionario_expedicao_id])
+    # --- __repr__ CORRIGIDO ---
+    def __repr__(self):
+        return f'<Escala {self.data_escala}>'
+
+class RegistroPonto(db.Model):
+    __table_args__ = (
+        db.Index('ix_registro_ponto_funcionario_entrada', 'funcionario_id', 'timestamp_entrada'),
+        db.Index('ix_registro_ponto_entrada', 'timestamp_entrada'),
+        # Índice parcial: só os registros em aberto (busca feita a cada batida de ponto)
+        db.Index('ix_registro_ponto_aberto', 'funcionario_id', 'timestamp_entrada', sqlite_where=db.text('timestamp_saida IS NULL')),
+    )
+    id=db.Column(db.Integer, primary_key=True); funcionario_id=db.Column(db.Integer, db.ForeignKey('funcionario.id'), nullable=False); timestamp_entrada=db.Column(db.DateTime, nullable=False, default=datetime.utcnow); timestamp_saida=db.Column(db.DateTime, nullable=True); observacao=db.Column(db.String(200), nullable=True)
+    # --- __repr__ CORRIGIDO (Onde estava o erro!) ---
+    def __repr__(self):
+        saida_str = self.timestamp_saida.strftime('%H:%M') if self.timestamp_saida else 'Aberto'
+        entrada_local = self.timestamp_entrada # Idealmente converter fuso
+        return f'<Ponto {self.funcionario.nome} {entrada_local.strftime("%d/%m %H:%M")} - {saida_str}>'
+
+class VersaoCache(db.Model):
+    """Versão de cada grupo de dados em cache; incrementada quando o grupo muda (compartilhada entre workers)."""
+    namespace=db.Column(db.String(50), primary_key=True); versao=db.Column(db.Integer, nullable=False, default=0); modificado_em=db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    def __repr__(self):
+        return f'<VersaoCache {self.namespace} v{self.versao}>'
+
+class BatidaSincronizada(db.Model):
+    """Batida enviada pelo service worker após ficar na fila offline; o id do cliente evita duplicar no reenvio."""
+    id_cliente=db.Column(db.String(64), primary_key=True); funcionario_id=db.Column(db.Integer, db.ForeignKey('funcionario.id'), nullable=False); capturado_em=db.Column(db.DateTime, nullable=False); recebido_em=db.Column(db.DateTime, nullable=False, default=datetime.utcnow); resultado=db.Column(db.String(20), nullable=False)
+    def __repr__(self):
+        return f'<BatidaSincronizada {self.id_cliente} {self.resultado}>'
+
+class SaldoDiario(db.Model):
+    """Banco de horas materializado: um resumo por funcionário e dia com registros de ponto."""
+    __table_args__ = (
+        db.UniqueConstraint('funcionario_id', 'data', name='uq_saldo_diario_funcionario_data'),
+        # Cobre o resumo por período (/admin/ponto/saldos): o GROUP BY lê só o índice, sem ir à tabela
+        db.Index('ix_saldo_diario_data', 'data', 'funcionario_id', 'trabalhado_segundos', 'esperado_segundos', 'saldo_segundos'),
+    )
+    id=db.Column(db.Integer, primary_key=True); funcionario_id=db.Column(db.Integer, db.ForeignKey('funcionario.id'), nullable=False, index=True); data=db.Column(db.Date, nullable=False); trabalhado_segundos=db.Column(db.Integer, nullable=False, default=0); esperado_segundos=db.Column(db.Integer, nullable=False, default=0); saldo_segundos=db.Column(db.Integer, nullable=False, default=0)
+    @property
+    def trabalhado(self): return timedelta(seconds=self.trabalhado_segundos)
+    @property
+    def esperado(self): return timedelta(seconds=self.esperado_segundos)
+    @property
+    def saldo_dia(self): return timedelta(seconds=self.saldo_segundos)
+    def __repr__(self):
+        return f'<SaldoDiario {self.funcionario_id} {self.data} {self.saldo_segundos}s>'
+
+class RegistroPontoArquivo(db.Model):
+    """Registros de ponto fechados e antigos, movidos pelo comando archive-ponto. Somente leitura."""
+    __tablename__ = 'registro_ponto_arquivo'
+    __table_args__ = (
+        db.Index('ix_registro_ponto_arquivo_funcionario_entrada', 'funcionario_id', 'timestamp_entrada'),
+        db.Index('ix_registro_ponto_arquivo_entrada', 'timestamp_entrada'),
+    )
+    id=db.Column(db.Integer, primary_key=True); funcionario_id=db.Column(db.Integer, db.ForeignKey('funcionario.id'), nullable=False); timestamp_entrada=db.Column(db.DateTime, nullable=False); timestamp_saida=db.Column(db.DateTime, nullable=False); observacao=db.Column(db.String(200), nullable=True)
+    def __repr__(self):
+        return f'<RegistroPontoArquivo {self.funcionario_id} {self.timestamp_entrada}>'
+
+class ResumoMensal(db.Model):
+    """Banco de horas dos dias arquivados: um resumo por funcionário e mês, no lugar dos SaldoDiario desses dias."""
+    __table_args__ = (db.UniqueConstraint('funcionario_id', 'ano', 'mes', name='uq_resumo_mensal_funcionario_mes'),)
+    id=db.Column(db.Integer, primary_key=True); funcionario_id=db.Column(db.Integer, db.ForeignKey('funcionario.id'), nullable=False, index=True); ano=db.Column(db.Integer, nullable=False); mes=db.Column(db.Integer, nullable=False); dias=db.Column(db.Integer, nullable=False, default=0); trabalhado_segundos=db.Column(db.Integer, nullable=False, default=0); esperado_segundos=db.Column(db.Integer, nullable=False, default=0); saldo_segundos=db.Column(db.Integer, nullable=False, default=0)
+    def __repr__(self):
+        return f'<ResumoMensal {self.funcionario_id} {self.ano}-{self.mes:02d} {self.saldo_segundos}s>'
+
@@ -0,0 +1,64 @@
+import json
+import time
+from datetime import date, datetime
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from .estado import estado
+from .extensoes import db
+from .modelos import Funcionario, RegistroPonto
+
+# --- Quadro de presença: índice em memória dos registros abertos ---
+def _carregar(indice):
+    # Duas consultas pequenas: os funcionários e os registros abertos (índice parcial ix_registro_ponto_aberto)
+    funcionarios = {f_id: (nome, setor) for f_id, nome, setor in db.session.query(Funcionario.id, Funcionario.nome, Funcionario.setor)}
+    abertos = {}
+    for f_id, entrada in db.session.query(RegistroPonto.funcionario_id, RegistroPonto.timestamp_entrada).filter(RegistroPonto.timestamp_saida == None):
+        if entrada > abertos.get(f_id, datetime.min): abertos[f_id] = entrada
+    indice.carregar(funcionarios, abertos)
+
+def _serializar(abertos, funcionarios):
+    hoje = date.today()
+    trabalhando = [{'id': f_id, 'nome': funcionarios[f_id][0], 'setor': funcionarios[f_id][1], 'desde': entrada.strftime('%H:%M') if entrada.date() == hoje else entrada.strftime('%d/%m %H:%M'), 'esquecido': entrada.date() != hoje}
+                   for f_id, entrada in sorted(abertos.items(), key=lambda item: funcionarios.get(item[0], ('',))[0]) if f_id in funcionarios]
+    return json.dumps({'trabalhando': trabalhando, 'total': len(trabalhando), 'funcionarios': len(funcionarios)}, ensure_ascii=False)
+
+def presenca_atual():
+    """(versao, json) de quem está trabalhando agora; relê o banco só se o índice estiver velho (ou nunca carregado)."""
+    indice = estado().presenca
+    if indice.precisa_carregar(current_app.config['PRESENCA_RECARREGAR_SEGUNDOS']): _carregar(indice)
+    return indice.foto(_serializar)
+
+def registrar_batida_presenca(funcionario_id, tipo, momento):
+    """Anota a batida na sessão; o índice só é atualizado depois do commit (em rollback, é descartada)."""
+    if tipo in ('entrada', 'saida'): db.session.info.setdefault('presenca', []).append((funcionario_id, tipo, momento))
+
+def invalidar_presenca():
+    """Para alterações que não são batidas (CRUD do admin): o índice é relido do banco depois do commit."""
+    db.session.info['presenca_recarregar'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _apos_commit(session):
+    batidas = session.info.pop('presenca', None); recarregar = session.info.pop('presenca_recarregar', False)
+    if not (batidas or recarregar) or not has_app_context(): return
+    indice = estado().presenca
+    if batidas: indice.aplicar(batidas)
+    if recarregar: indice.invalidar()
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _apos_rollback(session, transacao_anterior):
+    session.info.pop('presenca', None); session.info.pop('presenca_recarregar', None)
+
+def eventos_presenca(app):
+    """Gerador do stream SSE (roda fora do contexto da requisição: não segura conexão do banco entre os eventos).
+
+    Envia o quadro na conexão e a cada mudança; sem mudanças, só um comentário de keepalive. Termina depois de
+    PRESENCA_CONEXAO_MAX_SEGUNDOS (o EventSource reconecta sozinho)."""
+    config = app.config; indice = estado(app).presenca
+    fim = time.monotonic() + config['PRESENCA_CONEXAO_MAX_SEGUNDOS']; ultima_versao = None; ultimo_envio = 0
+    yield 'retry: 3000\n\n'
+    while time.monotonic() < fim:
+        with app.app_context(): versao, dados = presenca_atual() # Ao sair do contexto a sessão é devolvida ao pool
+        if versao != ultima_versao: ultima_versao = versao; ultimo_envio = time.monotonic(); yield f'event: presenca\ndata: {dados}\n\n'
+        elif time.monotonic() - ultimo_envio >= config['PRESENCA_KEEPALIVE_SEGUNDOS']: ultimo_envio = time.monotonic(); yield ': keepalive\n\n'
+        indice.esperar(versao, min(config['PRESENCA_KEEPALIVE_SEGUNDOS'], config['PRESENCA_RECARREGAR_SEGUNDOS'], max(fim - time.monotonic(), 0)))
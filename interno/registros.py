@@ -0,0 +1,115 @@
+import csv
+import io
+import itertools
+from datetime import date, datetime, timedelta
+from flask import current_app, flash
+from .extensoes import db
+from .jornada import CalendarioJornada
+from .modelos import Funcionario, RegistroPonto, RegistroPontoArquivo
+from .util import format_timedelta
+
+# --- Filtros do relatório de ponto (tela, exportação e CLI) ---
+def _filtros_ponto(args, janela_padrao=True):
+    """Lê funcionario_id/start_date/end_date da query string. Sem datas, aplica a janela padrão."""
+    filtros = {'funcionario_id': args.get('funcionario_id', type=int), 'start_date': None, 'end_date': None, 'start_date_str': args.get('start_date'), 'end_date_str': args.get('end_date')}
+    if filtros['start_date_str']:
+        try: filtros['start_date'] = datetime.strptime(filtros['start_date_str'], '%Y-%m-%d').date()
+        except ValueError: flash('Formato inválido para data inicial.', 'danger'); filtros['start_date_str'] = None
+    if filtros['end_date_str']:
+        try: filtros['end_date'] = datetime.strptime(filtros['end_date_str'], '%Y-%m-%d').date()
+        except ValueError: flash('Formato inválido para data final.', 'danger'); filtros['end_date_str'] = None
+    if janela_padrao and not filtros['start_date'] and not filtros['end_date']:
+        filtros['start_date'] = date.today() - timedelta(days=current_app.config['ADMIN_PONTO_JANELA_PADRAO_DIAS'])
+        filtros['start_date_str'] = filtros['start_date'].strftime('%Y-%m-%d')
+    return filtros
+
+def _filtros(funcionario_id=None, start_date=None, end_date=None):
+    """Monta o mesmo dicionário de _filtros_ponto a partir de valores já convertidos (uso na CLI)."""
+    return {'funcionario_id': funcionario_id, 'start_date': start_date, 'end_date': end_date, 'start_date_str': start_date.strftime('%Y-%m-%d') if start_date else None, 'end_date_str': end_date.strftime('%Y-%m-%d') if end_date else None}
+
+def _filtrar_registros(query, filtros, tabela=RegistroPonto):
+    if filtros['funcionario_id']: query = query.filter(tabela.funcionario_id == filtros['funcionario_id'])
+    if filtros['start_date']: query = query.filter(tabela.timestamp_entrada >= datetime.combine(filtros['start_date'], datetime.min.time()))
+    if filtros['end_date']: query = query.filter(tabela.timestamp_entrada < datetime.combine(filtros['end_date'] + timedelta(days=1), datetime.min.time()))
+    return query
+
+def ultimo_dia_arquivado():
+    """Dia do registro arquivado mais recente, ou None se nada foi arquivado."""
+    ultimo = db.session.query(db.func.max(RegistroPontoArquivo.timestamp_entrada)).scalar()
+    return ultimo.date() if ultimo else None
+
+def dias_arquivados(funcionario_ids=None, inicio=None, fim=None):
+    """{(funcionario_id, dia)} com registros no arquivo, com filtros opcionais. O banco de horas desses dias
+    está no ResumoMensal: eles não podem mais receber registros nem mudar de feriado."""
+    limite = ultimo_dia_arquivado()
+    if not limite or (inicio and inicio > limite): return set()
+    dia = db.func.date(RegistroPontoArquivo.timestamp_entrada); consulta = db.session.query(RegistroPontoArquivo.funcionario_id, dia).distinct()
+    if funcionario_ids is not None: consulta = consulta.filter(RegistroPontoArquivo.funcionario_id.in_(funcionario_ids))
+    if inicio: consulta = consulta.filter(RegistroPontoArquivo.timestamp_entrada >= datetime.combine(inicio, datetime.min.time()))
+    if fim: consulta = consulta.filter(RegistroPontoArquivo.timestamp_entrada < datetime.combine(fim + timedelta(days=1), datetime.min.time()))
+    return {(f_id, datetime.strptime(dia_str, '%Y-%m-%d').date()) for f_id, dia_str in consulta}
+
+def fonte_registros(filtros):
+    """Subquery com os registros de ponto do período (colunas de RegistroPonto + 'arquivado').
+
+    Inclui o arquivo (UNION ALL) só quando o período pedido começa antes do último dia arquivado;
+    nos demais casos é apenas a tabela quente, e o SQLite achata a subquery (usa os mesmos índices)."""
+    def colunas(modelo, arquivado): return [modelo.id, modelo.funcionario_id, modelo.timestamp_entrada, modelo.timestamp_saida, modelo.observacao, db.literal_column(arquivado).label('arquivado')]
+    consulta = db.select(*colunas(RegistroPonto, '0')); limite = ultimo_dia_arquivado()
+    if limite and (not filtros['start_date'] or filtros['start_date'] <= limite): consulta = db.union_all(consulta, db.select(*colunas(RegistroPontoArquivo, '1')))
+    return consulta.subquery('registros')
+
+def _parse_cursor(valor):
+    """Cursor de paginação no formato '<funcionario_id>:<AAAA-MM-DD>' (último dia exibido)."""
+    try: func_id, dia_str = valor.split(':', 1); return int(func_id), datetime.strptime(dia_str, '%Y-%m-%d').date()
+    except (AttributeError, ValueError): return None
+
+# --- Exportação (CSV/XLSX) para a folha de pagamento ---
+CABECALHO_EXPORT = {
+    'registros': ['funcionario_id', 'funcionario', 'data', 'entrada', 'saida', 'duracao', 'observacao'],
+    'resumo': ['funcionario_id', 'funcionario', 'data', 'trabalhado', 'esperado', 'saldo_dia'],
+}
+
+def _consulta_export(filtros):
+    """Colunas simples (sem objetos ORM), ordenadas por funcionário e entrada, lidas em lotes. Inclui o arquivo se preciso."""
+    fonte = fonte_registros(filtros).c
+    query = db.session.query(fonte.funcionario_id, Funcionario.nome, fonte.timestamp_entrada, fonte.timestamp_saida, fonte.observacao).join(Funcionario, fonte.funcionario_id == Funcionario.id)
+    return _filtrar_registros(query, filtros, fonte).order_by(fonte.funcionario_id, fonte.timestamp_entrada).yield_per(current_app.config['EXPORT_LOTE'])
+
+def _linhas_export_registros(filtros):
+    for func_id, nome, entrada, saida, obs in _consulta_export(filtros):
+        duracao = format_timedelta(saida - entrada) if saida else ''
+        yield [func_id, nome, entrada.strftime('%Y-%m-%d'), entrada.strftime('%H:%M:%S'), saida.strftime('%H:%M:%S') if saida else '', duracao, obs or '']
+
+def _linhas_export_resumo(filtros):
+    # Intervalo da jornada: usa os filtros ou, se abertos, o primeiro/último registro existente
+    inicio = filtros['start_date']; fim = filtros['end_date'] or date.today()
+    if not inicio:
+        fonte = fonte_registros(filtros).c; primeiro = _filtrar_registros(db.session.query(db.func.min(fonte.timestamp_entrada)), filtros, fonte).scalar()
+        if not primeiro: return
+        inicio = primeiro.date()
+    calendario_jornada = CalendarioJornada(inicio, max(inicio, fim)); funcionarios_por_id = {f.id: f for f in Funcionario.query.all()}
+    chave_dia = lambda linha: (linha[0], linha[1], linha[2].date())
+    for (func_id, nome, dia), linhas_dia in itertools.groupby(_consulta_export(filtros), key=chave_dia):
+        trabalhado = sum(((saida - entrada) for _, _, entrada, saida, _ in linhas_dia if saida), timedelta(0))
+        esperado = calendario_jornada.esperado(funcionarios_por_id[func_id], dia)
+        yield [func_id, nome, dia.strftime('%Y-%m-%d'), format_timedelta(trabalhado), format_timedelta(esperado), format_timedelta(trabalhado - esperado)]
+
+def gerar_linhas_export(tipo, filtros):
+    """Gerador com o cabeçalho e as linhas do tipo pedido ('registros' ou 'resumo')."""
+    yield CABECALHO_EXPORT[tipo]
+    yield from (_linhas_export_registros(filtros) if tipo == 'registros' else _linhas_export_resumo(filtros))
+
+def gerar_csv(linhas, linhas_por_bloco=500):
+    """Converte as linhas em blocos de texto CSV, sem montar o arquivo inteiro em memória."""
+    buffer = io.StringIO(); writer = csv.writer(buffer, delimiter=current_app.config['EXPORT_CSV_DELIMITADOR'])
+    yield '\ufeff' # BOM para o Excel reconhecer UTF-8
+    for bloco in iter(lambda: list(itertools.islice(linhas, linhas_por_bloco)), []):
+        writer.writerows(bloco); yield buffer.getvalue(); buffer.seek(0); buffer.truncate(0)
+
+def gravar_xlsx(linhas, destino):
+    """Grava as linhas em XLSX no modo write_only do openpyxl (dependência opcional)."""
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True); ws = wb.create_sheet('Ponto')
+    for linha in linhas: ws.append(linha)
+    wb.save(destino)
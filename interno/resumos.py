@@ -0,0 +1,90 @@
+from datetime import date, datetime, timedelta
+from .extensoes import db
+from .jornada import CalendarioJornada
+from .modelos import Funcionario, RegistroPontoArquivo, ResumoMensal, SaldoDiario
+from .registros import ultimo_dia_arquivado
+
+# --- Resumo de saldos por funcionário e período (agregado no SQL, sem objetos ORM) ---
+AGRUPAMENTOS = ('dia', 'semana', 'mes')
+
+def intervalo_agrupamento(inicio, fim, agrupamento):
+    """Estende o intervalo para períodos completos: segunda a domingo na semana, dia 1 ao último dia no mês."""
+    if fim < inicio: inicio, fim = fim, inicio
+    if agrupamento == 'semana': inicio -= timedelta(days=inicio.weekday()); fim += timedelta(days=6 - fim.weekday())
+    elif agrupamento == 'mes': inicio = inicio.replace(day=1); fim = date(fim.year + fim.month // 12, fim.month % 12 + 1, 1) - timedelta(days=1)
+    return inicio, fim
+
+def _periodo_sql(coluna, agrupamento):
+    # Mesmo rótulo de _periodo. A data fica gravada como 'AAAA-MM-DD': o mês é um substr (mais barato que strftime);
+    # a semana é a segunda-feira ('weekday 0' avança até o domingo, -6 dias volta à segunda)
+    if agrupamento == 'mes': return db.func.substr(coluna, 1, 7)
+    if agrupamento == 'semana': return db.func.date(coluna, 'weekday 0', '-6 days')
+    return db.type_coerce(coluna, db.String) # O próprio texto, sem converter para date
+
+def _periodo(dia, agrupamento):
+    if agrupamento == 'mes': return dia.strftime('%Y-%m')
+    if agrupamento == 'semana': return (dia - timedelta(days=dia.weekday())).strftime('%Y-%m-%d')
+    return dia.strftime('%Y-%m-%d')
+
+def rotulo_periodo(periodo, agrupamento):
+    if agrupamento == 'mes': return f'{periodo[5:7]}/{periodo[:4]}'
+    dia = datetime.strptime(periodo, '%Y-%m-%d')
+    return f"Semana de {dia:%d/%m/%Y}" if agrupamento == 'semana' else dia.strftime('%d/%m/%Y')
+
+def consulta_saldos(inicio, fim, agrupamento, funcionario_id=None, setor=None):
+    """GROUP BY por (funcionário, período) sobre o banco de horas materializado; devolve só as linhas agregadas.
+
+    SaldoDiario já tem trabalhado/esperado/saldo de cada dia com registro e é agregado direto no índice
+    ix_saldo_diario_data. No agrupamento mensal os meses arquivados entram pelo ResumoMensal (UNION ALL)."""
+    periodo = _periodo_sql(SaldoDiario.data, agrupamento).label('periodo')
+    fonte = db.select(SaldoDiario.funcionario_id, periodo, db.func.count().label('dias'), db.func.sum(SaldoDiario.trabalhado_segundos).label('trabalhado'), db.func.sum(SaldoDiario.esperado_segundos).label('esperado'), db.func.sum(SaldoDiario.saldo_segundos).label('saldo')).where(SaldoDiario.data >= inicio, SaldoDiario.data <= fim)
+    if funcionario_id: fonte = fonte.where(SaldoDiario.funcionario_id == funcionario_id)
+    fonte = fonte.group_by(SaldoDiario.funcionario_id, periodo)
+    if agrupamento == 'mes':
+        mes = ResumoMensal.ano * 100 + ResumoMensal.mes
+        arquivados = db.select(ResumoMensal.funcionario_id, db.func.printf('%04d-%02d', ResumoMensal.ano, ResumoMensal.mes).label('periodo'), ResumoMensal.dias, ResumoMensal.trabalhado_segundos, ResumoMensal.esperado_segundos, ResumoMensal.saldo_segundos).where(mes >= inicio.year * 100 + inicio.month, mes <= fim.year * 100 + fim.month)
+        if funcionario_id: arquivados = arquivados.where(ResumoMensal.funcionario_id == funcionario_id)
+        fonte = db.union_all(fonte, arquivados)
+    # Por fora só junta nome/setor e soma as (poucas) linhas das duas fontes
+    fonte = fonte.subquery('saldos').c
+    consulta = db.session.query(fonte.funcionario_id, Funcionario.nome, Funcionario.setor, fonte.periodo, db.func.sum(fonte.dias), db.func.sum(fonte.trabalhado), db.func.sum(fonte.esperado), db.func.sum(fonte.saldo)).join(Funcionario, fonte.funcionario_id == Funcionario.id)
+    if setor: consulta = consulta.filter(Funcionario.setor == setor)
+    return consulta.group_by(fonte.funcionario_id, Funcionario.nome, Funcionario.setor, fonte.periodo)
+
+def _saldos_arquivados(inicio, fim, agrupamento, funcionario_id=None, setor=None):
+    """Dias arquivados no agrupamento por dia/semana (o ResumoMensal é só por mês): trabalhado somado no SQL
+    por funcionário e dia a partir do arquivo, esperado pelo CalendarioJornada. Linhas como as de consulta_saldos."""
+    dia = db.func.date(RegistroPontoArquivo.timestamp_entrada)
+    segundos = db.func.sum(db.cast(db.func.strftime('%s', RegistroPontoArquivo.timestamp_saida), db.Integer) - db.cast(db.func.strftime('%s', RegistroPontoArquivo.timestamp_entrada), db.Integer))
+    consulta = db.session.query(RegistroPontoArquivo.funcionario_id, dia, segundos).filter(RegistroPontoArquivo.timestamp_entrada >= datetime.combine(inicio, datetime.min.time()), RegistroPontoArquivo.timestamp_entrada < datetime.combine(fim + timedelta(days=1), datetime.min.time()))
+    if funcionario_id: consulta = consulta.filter(RegistroPontoArquivo.funcionario_id == funcionario_id)
+    consulta = consulta.group_by(RegistroPontoArquivo.funcionario_id, dia)
+    # Só as colunas usadas pelas regras de jornada (linhas do SQLAlchemy, não objetos ORM)
+    funcionarios = {f.id: f for f in db.session.query(Funcionario.id, Funcionario.nome, Funcionario.setor, Funcionario.grupo_sabado, Funcionario.horario_especial_09) if not setor or f.setor == setor}
+    calendario_jornada = CalendarioJornada(inicio, fim); totais = {}
+    for f_id, dia_str, trabalhado in consulta:
+        funcionario = funcionarios.get(f_id)
+        if not funcionario: continue
+        dia_registro = datetime.strptime(dia_str, '%Y-%m-%d').date(); esperado = int(calendario_jornada.esperado(funcionario, dia_registro).total_seconds())
+        total = totais.setdefault((f_id, _periodo(dia_registro, agrupamento)), [funcionario.nome, funcionario.setor, 0, 0, 0, 0])
+        total[2] += 1; total[3] += trabalhado or 0; total[4] += esperado; total[5] += (trabalhado or 0) - esperado
+    return [(f_id, nome, setor_f, periodo, dias, trabalhado, esperado, saldo) for (f_id, periodo), (nome, setor_f, dias, trabalhado, esperado, saldo) in totais.items()]
+
+def resumo_saldos(inicio, fim, agrupamento='mes', funcionario_id=None, setor=None):
+    """Trabalhado x esperado por funcionário e período, com totais, em segundos (pronto para JSON).
+
+    O intervalo é estendido para períodos completos (intervalo_agrupamento). Como no banco de horas,
+    só os dias com registro de ponto entram na conta."""
+    inicio, fim = intervalo_agrupamento(inicio, fim, agrupamento)
+    linhas = consulta_saldos(inicio, fim, agrupamento, funcionario_id, setor).all()
+    limite = ultimo_dia_arquivado()
+    if agrupamento != 'mes' and limite and inicio <= limite: linhas += _saldos_arquivados(inicio, min(fim, limite), agrupamento, funcionario_id, setor)
+    funcionarios = {}; campos = ('dias', 'trabalhado', 'esperado', 'saldo'); total_geral = dict.fromkeys(campos, 0)
+    for f_id, nome, setor_f, periodo, *valores in linhas:
+        funcionario = funcionarios.setdefault(f_id, {'id': f_id, 'nome': nome, 'setor': setor_f, 'periodos': {}, 'total': dict.fromkeys(campos, 0)})
+        atual = funcionario['periodos'].setdefault(periodo, dict.fromkeys(campos, 0))
+        for campo, valor in zip(campos, valores): valor = int(valor or 0); atual[campo] += valor; funcionario['total'][campo] += valor; total_geral[campo] += valor
+    resultado = []
+    for funcionario in sorted(funcionarios.values(), key=lambda f: (f['nome'], f['id'])):
+        funcionario['periodos'] = [dict(valores, periodo=periodo) for periodo, valores in sorted(funcionario['periodos'].items())]; resultado.append(funcionario)
+    return {'inicio': inicio.isoformat(), 'fim': fim.isoformat(), 'agrupamento': agrupamento, 'funcionarios': resultado, 'total': total_geral}
@@ -0,0 +1,3 @@
+from . import admin, auth, avisos, calendario, ponto
+
+BLUEPRINTS = (auth.bp, avisos.bp, ponto.bp, calendario.bp, admin.bp)
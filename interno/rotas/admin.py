@@ -0,0 +1,97 @@
+import hmac
+import os
+from flask import Blueprint, current_app, flash, make_response, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+from sqlalchemy import or_
+from ..cache import invalidar_cache
+from ..estado import estado
+from ..extensoes import db, login_manager
+from ..metricas import metricas_prometheus
+from ..modelos import EscalaLimpeza, Funcionario, ResumoMensal, SaldoDiario
+from ..presenca import invalidar_presenca
+from ..util import admin_required
+from ..validacao import validar_funcionario
+
+bp = Blueprint('admin', __name__)
+
+@bp.route('/admin')
+@login_required
+@admin_required
+def admin_redirect():
+    return redirect(url_for('admin.admin_panel'))
+
+@bp.route('/admin/funcionarios')
+@login_required
+@admin_required
+def admin_panel():
+    funcionarios = Funcionario.query.all()
+    return render_template('admin_funcionarios.html', funcionarios=funcionarios)
+
+@bp.route('/admin/novo_funcionario', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def novo_funcionario():
+    if request.method == 'POST':
+        username = request.form.get('username', '')
+
+        # --- Validação de Username (ANTES DO TRY) ---
+        user_exists = Funcionario.query.filter_by(username=username).first()
+        if user_exists:
+            flash(f'O nome de usuário "{username}" já está em uso.', 'danger')
+            # Retorna para o formulário mantendo os dados digitados
+            return render_template('form_funcionario.html', form_data=request.form)
+
+        # --- Validação dos demais campos (mesmas regras da importação em lote) ---
+        valores, erro = validar_funcionario(request.form)
+        if erro:
+            flash(erro, 'danger')
+            return render_template('form_funcionario.html', form_data=request.form)
+
+        # --- Criação do Funcionário (DENTRO DO TRY) ---
+        try:
+            password = valores.pop('password')
+            novo_func = Funcionario(**valores)
+            novo_func.set_password(password)
+            db.session.add(novo_func); invalidar_cache('funcionarios'); db.session.commit()
+            flash(f'Funcionário {novo_func.nome} ({novo_func.username}) cadastrado com sucesso!', 'success')
+            return redirect(url_for('admin.admin_panel')) # Redireciona para a lista após sucesso
+        except Exception as e:
+             db.session.rollback()
+             flash(f'Erro inesperado ao salvar funcionário: {e}', 'danger')
+             # Retorna para o formulário mantendo os dados
+             return render_template('form_funcionario.html', form_data=request.form)
+
+    # Se for GET, apenas mostra o formulário
+    return render_template('form_funcionario.html', form_data={})
+
+@bp.route('/admin/funcionario/delete/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def delete_funcionario(id):
+    if id == current_user.id: flash('Você não pode deletar sua própria conta!', 'danger'); return redirect(url_for('admin.admin_panel'))
+    f = Funcionario.query.get_or_404(id); nome_f = f.nome; e = EscalaLimpeza.query.filter(or_(EscalaLimpeza.funcionario_escritorio_id == id, EscalaLimpeza.funcionario_expedicao_id == id)).count()
+    if e > 0: flash(f'Não é possível excluir {nome_f}, pois ele está associado a {e} escala(s) de limpeza.', 'danger')
+    else:
+        try: SaldoDiario.query.filter_by(funcionario_id=id).delete(); ResumoMensal.query.filter_by(funcionario_id=id).delete(); db.session.delete(f); invalidar_cache('funcionarios'); invalidar_presenca(); db.session.commit(); flash(f'Funcionário {nome_f} deletado com sucesso.', 'success')
+        except Exception as ex: db.session.rollback(); flash(f'Erro ao deletar funcionário: {ex}', 'danger')
+    return redirect(url_for('admin.admin_panel'))
+
+# --- Métricas (Prometheus e página HTML) ---
+@bp.route('/admin/metrics')
+def admin_metricas():
+    token = current_app.config['METRICAS_TOKEN']; autorizacao = request.headers.get('Authorization', '')
+    por_token = bool(token) and hmac.compare_digest(autorizacao.encode('utf-8'), f'Bearer {token}'.encode('utf-8'))
+    if not por_token:
+        if not current_user.is_authenticated: return login_manager.unauthorized()
+        if current_user.role != 'admin': flash('Você não tem permissão para acessar esta página.', 'danger'); return redirect(url_for('avisos.index'))
+    formato = request.args.get('formato') or ('html' if not por_token and request.accept_mimetypes.best_match(['text/plain', 'text/html']) == 'text/html' else 'texto')
+    if formato != 'html':
+        resposta = make_response(metricas_prometheus()); resposta.mimetype = 'text/plain'; resposta.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'; resposta.headers['Cache-Control'] = 'no-store'
+        return resposta
+    linhas = []; metricas = estado().metricas
+    for endpoint, d in sorted(metricas.copia().items(), key=lambda item: -item[1]['soma']):
+        erros = sum(n for (_, status), n in d['status'].items() if status >= 500)
+        linhas.append({'endpoint': endpoint, 'total': d['total'], 'erros': erros, 'media_ms': d['soma'] / d['total'] * 1000, 'p50': metricas.percentil(d['buckets'], 50), 'p95': metricas.percentil(d['buckets'], 95),
+                       'consultas_media': d['consultas'] / d['total'], 'banco_media_ms': d['tempo_banco'] / d['total'] * 1000, 'lentas': d['lentas']})
+    return render_template('admin_metricas.html', linhas=linhas, requisicoes_lentas=list(metricas.requisicoes_lentas)[::-1], consultas_lentas=list(metricas.consultas_lentas)[::-1],
+                           ativas=current_app.config['METRICAS_ATIVAS'], limite_requisicao=current_app.config['REQUISICAO_LENTA_SEGUNDOS'], limite_consulta=current_app.config['CONSULTA_LENTA_SEGUNDOS'], pid=os.getpid())
@@ -0,0 +1,34 @@
+from flask import Blueprint, current_app, flash, redirect, render_template, request, url_for
+from flask_login import current_user, login_required, login_user, logout_user
+from ..estado import estado
+from ..extensoes import db
+from ..modelos import Funcionario
+
+bp = Blueprint('auth', __name__)
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if current_user.is_authenticated: return redirect(url_for('avisos.index'))
+    if request.method == 'POST':
+        username = request.form['username']; password = request.form['password']; chave_limite = username.strip().lower()
+        limitador = estado().limitador_login; semaforo_hash = estado().semaforo_hash
+        segundos = limitador.segundos_bloqueado(chave_limite)
+        if segundos: flash(f'Muitas tentativas de login. Tente novamente em {(segundos + 59) // 60} minuto(s).', 'danger'); return redirect(url_for('auth.login'))
+        user = Funcionario.query.filter_by(username=username).first()
+        if user:
+            # Limita quantas verificações de senha (caras de CPU) rodam ao mesmo tempo neste worker
+            if not semaforo_hash.acquire(timeout=current_app.config['LOGIN_HASH_ESPERA_SEGUNDOS']): flash('Servidor ocupado. Tente novamente em alguns segundos.', 'danger'); return redirect(url_for('auth.login'))
+            try: senha_ok = user.check_password(password)
+            finally: semaforo_hash.release()
+        if not user or not senha_ok: limitador.registrar_falha(chave_limite); flash('Usuário ou senha inválidos.', 'danger'); return redirect(url_for('auth.login'))
+        limitador.limpar(chave_limite)
+        if user.precisa_atualizar_hash():
+            try: user.set_password(password); db.session.commit()
+            except Exception: db.session.rollback()
+        login_user(user, remember=True); return redirect(url_for('avisos.index'))
+    return render_template('login.html')
+
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user(); flash('Você foi desconectado com sucesso.', 'success'); return redirect(url_for('auth.login'))
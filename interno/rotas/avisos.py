@@ -0,0 +1,33 @@
+from datetime import date
+from flask import Blueprint, current_app, flash, redirect, render_template, request, url_for
+from flask_login import login_required
+from ..cache import em_cache, invalidar_cache, pagina_condicional
+from ..extensoes import db
+from ..modelos import Aviso, Funcionario
+from ..util import admin_required
+
+bp = Blueprint('avisos', __name__)
+
+@bp.route('/')
+@login_required
+@pagina_condicional('avisos', 'funcionarios', depende_do_dia=True)
+def index():
+    hoje = date.today()
+    avisos = em_cache(['avisos'], ('avisos',), lambda: [{'titulo': a.titulo, 'conteudo': a.conteudo, 'data_postagem': a.data_postagem} for a in Aviso.query.order_by(Aviso.data_postagem.desc()).limit(current_app.config['AVISOS_LIMITE_PAGINA_INICIAL']).all()])
+    aniversariantes_hoje = em_cache(['funcionarios'], ('aniversariantes', hoje), lambda: [{'nome': f.nome} for f in Funcionario.query.filter_by(nascimento_mes=hoje.month, nascimento_dia=hoje.day).all()])
+    return render_template('index.html', avisos=avisos, aniversariantes_hoje=aniversariantes_hoje)
+
+@bp.route('/admin/novo_aviso', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def novo_aviso():
+    if request.method == 'POST': titulo = request.form['titulo']; conteudo = request.form['conteudo']; novo_avs = Aviso(titulo=titulo, conteudo=conteudo); db.session.add(novo_avs); invalidar_cache('avisos'); db.session.commit(); flash('Aviso postado com sucesso!', 'success'); return redirect(url_for('avisos.novo_aviso'))
+    avisos = Aviso.query.order_by(Aviso.data_postagem.desc()).all(); return render_template('form_aviso.html', avisos=avisos)
+
+@bp.route('/admin/aviso/delete/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def delete_aviso(id):
+    try: aviso = Aviso.query.get_or_404(id); titulo = aviso.titulo; db.session.delete(aviso); invalidar_cache('avisos'); db.session.commit(); flash(f'Aviso "{titulo}" deletado com sucesso.', 'success')
+    except Exception as e: db.session.rollback(); flash(f'Erro ao deletar aviso: {e}', 'danger')
+    return redirect(url_for('avisos.novo_aviso'))
@@ -0,0 +1,109 @@
+import calendar
+from datetime import date, datetime
+from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask_login import login_required
+from markupsafe import Markup
+from sqlalchemy.exc import IntegrityError
+from ..cache import em_cache, invalidar_cache, pagina_condicional
+from ..escala import gravar_escala, janela_escala, planejar_escala
+from ..extensoes import db
+from ..jornada import atualizar_saldos_data
+from ..modelos import EscalaLimpeza, Feriado, Funcionario
+from ..util import NOMES_MESES, admin_required
+from ..validacao import validar_feriado
+
+bp = Blueprint('calendario', __name__)
+
+def _tabela_calendario(ano, mes, hoje):
+    ano_proximo, mes_proximo = (ano, mes + 1) if mes < 12 else (ano + 1, 1)
+    cal = calendar.monthcalendar(ano, mes); primeiro_dia = date(ano, mes, 1); feriados_bd = Feriado.query.filter(Feriado.data >= primeiro_dia, Feriado.data < date(ano_proximo, mes_proximo, 1)).all(); feriados_mes = {f.data.day: f.nome for f in feriados_bd}; aniversariantes_bd = Funcionario.query.filter_by(nascimento_mes=mes).all(); aniversarios_mes = {}; [aniversarios_mes.setdefault(f.data_nascimento.day, []).append(f.nome) for f in aniversariantes_bd]
+    return Markup(render_template('_calendario_tabela.html', calendar_matrix=cal, ano=ano, mes=mes, hoje=hoje, feriados=feriados_mes, aniversarios=aniversarios_mes))
+
+@bp.route('/calendario')
+@login_required
+@pagina_condicional('feriados', 'funcionarios', depende_do_dia=True)
+def calendario():
+    hoje = date.today(); ano = int(request.args.get('ano', hoje.year)); mes = int(request.args.get('mes', hoje.month))
+    mes_anterior, ano_anterior = (mes - 1, ano) if mes > 1 else (12, ano - 1); mes_proximo, ano_proximo = (mes + 1, ano) if mes < 12 else (1, ano + 1)
+    links_nav = {'anterior': url_for('calendario.calendario', ano=ano_anterior, mes=mes_anterior),'proximo': url_for('calendario.calendario', ano=ano_proximo, mes=mes_proximo),'hoje': url_for('calendario.calendario')}
+    tabela = em_cache(['feriados', 'funcionarios'], ('calendario', ano, mes, hoje), lambda: _tabela_calendario(ano, mes, hoje))
+    return render_template('calendario.html', tabela_calendario=tabela,nome_mes=NOMES_MESES[mes],ano=ano,nav=links_nav)
+
+@bp.route('/limpeza')
+@login_required
+@pagina_condicional('escala', 'funcionarios', depende_do_dia=True)
+def ver_escala():
+    def calcular():
+        escalas, anterior, seguinte = janela_escala(request.args)
+        return {'escalas': [{'data_escala': e.data_escala, 'funcionario_escritorio': {'nome': e.funcionario_escritorio.nome}, 'funcionario_expedicao': {'nome': e.funcionario_expedicao.nome}} for e in escalas], 'anterior': anterior, 'seguinte': seguinte}
+    pagina = em_cache(['escala', 'funcionarios'], ('escala', date.today(), request.args.get('apos'), request.args.get('antes')), calcular)
+    return render_template('ver_escala.html', escalas=pagina['escalas'],
+                           pagina_anterior=url_for('calendario.ver_escala', antes=pagina['anterior'].isoformat()) if pagina['anterior'] else None,
+                           proxima_pagina=url_for('calendario.ver_escala', apos=pagina['seguinte'].isoformat()) if pagina['seguinte'] else None)
+
+# --- Feriados e escala de limpeza (admin) ---
+@bp.route('/admin/calendario', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_calendario():
+    if request.method == 'POST':
+        valores, erro = validar_feriado(request.form)
+        if erro: flash(erro, 'danger'); return redirect(url_for('calendario.admin_calendario'))
+        try: n_fer = Feriado(**valores); db.session.add(n_fer); db.session.flush(); atualizar_saldos_data(n_fer.data); invalidar_cache('feriados'); db.session.commit(); flash(f'Feriado "{n_fer.nome}" salvo com sucesso!', 'success')
+        except ValueError as e: db.session.rollback(); flash(f'Erro ao salvar feriado: {e}', 'danger')
+        except Exception as e: db.session.rollback(); flash(f'Erro ao salvar feriado: A data {valores["data"]:%Y-%m-%d} já está cadastrada.', 'danger')
+        return redirect(url_for('calendario.admin_calendario'))
+    feriados = Feriado.query.order_by(Feriado.data.asc()).all(); return render_template('admin_calendario.html', feriados=feriados)
+
+@bp.route('/admin/feriado/delete/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def delete_feriado(id):
+    try: fer = Feriado.query.get_or_404(id); nome_f = fer.nome; data_f = fer.data; db.session.delete(fer); db.session.flush(); atualizar_saldos_data(data_f); invalidar_cache('feriados'); db.session.commit(); flash(f'Feriado "{nome_f}" deletado com sucesso.', 'success')
+    except Exception as e: db.session.rollback(); flash(f'Erro ao deletar feriado: {e}', 'danger')
+    return redirect(url_for('calendario.admin_calendario'))
+
+@bp.route('/admin/escala', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_escala():
+    if request.method == 'POST':
+        d_str = request.form['data_escala']; id_esc = request.form['funcionario_escritorio']; id_exp = request.form['funcionario_expedicao']
+        try: d_obj = datetime.strptime(d_str, '%Y-%m-%d').date(); n_esc = EscalaLimpeza(data_escala=d_obj, funcionario_escritorio_id=id_esc, funcionario_expedicao_id=id_exp); db.session.add(n_esc); invalidar_cache('escala'); db.session.commit(); flash('Escala de limpeza salva com sucesso!', 'success')
+        except ValueError: flash('Formato de data inválido. Use AAAA-MM-DD.', 'danger')
+        except IntegrityError: db.session.rollback(); flash(f'Erro ao salvar escala: A data {d_str} já está cadastrada.', 'danger')
+        except Exception as e: db.session.rollback(); flash(f'Erro ao salvar escala: {e}', 'danger')
+        return redirect(url_for('calendario.admin_escala'))
+    return _render_admin_escala(request.args)
+
+def _render_admin_escala(args, **contexto):
+    f_esc = Funcionario.query.filter_by(setor='Escritorio').all(); f_exp = Funcionario.query.filter_by(setor='Expedicao').all(); e_cad, anterior, seguinte = janela_escala(args)
+    return render_template('admin_escala.html', funcs_escritorio=f_esc, funcs_expedicao=f_exp, escalas=e_cad,
+                           pagina_anterior=url_for('calendario.admin_escala', antes=anterior.isoformat()) if anterior else None,
+                           proxima_pagina=url_for('calendario.admin_escala', apos=seguinte.isoformat()) if seguinte else None, **contexto)
+
+@bp.route('/admin/escala/gerar', methods=['POST'])
+@login_required
+@admin_required
+def gerar_escala():
+    """Gera o rodízio de um intervalo: 'previa' mostra o plano sem gravar, 'confirmar' grava tudo de uma vez."""
+    try: inicio = datetime.strptime(request.form.get('inicio', ''), '%Y-%m-%d').date(); fim = datetime.strptime(request.form.get('fim', ''), '%Y-%m-%d').date()
+    except ValueError: flash('Formato de data inválido. Use AAAA-MM-DD.', 'danger'); return redirect(url_for('calendario.admin_escala'))
+    plano, conflitos, erro = planejar_escala(inicio, fim)
+    if erro: flash(erro, 'danger'); return redirect(url_for('calendario.admin_escala'))
+    if request.form.get('acao') != 'confirmar':
+        return _render_admin_escala({}, previa=plano, conflitos=conflitos, previa_inicio=inicio, previa_fim=fim)
+    try:
+        novos_conflitos = gravar_escala(plano)
+        if novos_conflitos: db.session.rollback(); flash(f"Nada foi gravado: as datas {', '.join(d.strftime('%d/%m/%Y') for d in novos_conflitos)} foram cadastradas depois da prévia. Gere a prévia novamente.", 'danger')
+        else: db.session.commit(); flash(f'Escala gerada: {len(plano)} dia(s) cadastrado(s)' + (f', {len(conflitos)} dia(s) já existente(s) mantido(s).' if conflitos else '.'), 'success')
+    except IntegrityError: db.session.rollback(); flash('Nada foi gravado: outra escala foi cadastrada no mesmo período. Gere a prévia novamente.', 'danger')
+    return redirect(url_for('calendario.admin_escala'))
+
+@bp.route('/admin/escala/delete/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def delete_escala(id):
+    try: esc = EscalaLimpeza.query.get_or_404(id); data_esc = esc.data_escala.strftime('%d/%m/%Y'); db.session.delete(esc); invalidar_cache('escala'); db.session.commit(); flash(f'Escala do dia {data_esc} deletada com sucesso.', 'success')
+    except Exception as e: db.session.rollback(); flash(f'Erro ao deletar escala: {e}', 'danger')
+    return redirect(url_for('calendario.admin_escala'))
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from flask import Blueprint, current_app, flash, jsonify, make_response, redirect, render_template, request, send_file, stream_template, stream_with_context, url_for
+from flask_login import current_user, login_required
+from sqlalchemy import and_, or_
+from ..cache import arquivos_precache
+from ..espelhos import gerar_espelhos
+from ..estado import estado
+from ..extensoes import db
+from ..jornada import CalendarioJornada, atualizar_saldos_dias, registrar_batida, saldo_banco_horas, sincronizar_batidas
+from ..modelos import Funcionario, RegistroPonto
+from ..presenca import eventos_presenca, invalidar_presenca, presenca_atual
+from ..registros import CABECALHO_EXPORT, _filtrar_registros, _filtros_ponto, _parse_cursor, fonte_registros, gerar_csv, gerar_linhas_export, gravar_xlsx
+from ..resumos import AGRUPAMENTOS, resumo_saldos, rotulo_periodo
+from ..util import admin_required
+from ..validacao import validar_ponto
+
+bp = Blueprint('ponto', __name__)
+
+@bp.route('/ponto')
+@login_required
+def ponto_usuario():
+    registros_usuario = RegistroPonto.query.filter_by(funcionario_id=current_user.id)
+    ultimo_registro = registros_usuario.order_by(RegistroPonto.timestamp_entrada.desc()).first(); status_atual = "Fora do expediente"; botao_texto = "Registrar Entrada"; botao_classe = "entrada"
+    if ultimo_registro and not ultimo_registro.timestamp_saida: entrada_local_str = ultimo_registro.timestamp_entrada.strftime('%H:%M'); status_atual = f"Trabalhando desde {entrada_local_str}"; botao_texto = "Registrar Saída"; botao_classe = "saida"
+    data_limite = datetime.utcnow() - timedelta(days=30); registros_bd = registros_usuario.filter(RegistroPonto.timestamp_entrada >= data_limite).order_by(RegistroPonto.timestamp_entrada.desc()).all()
+    historico_calculado = []; saldo_total = saldo_banco_horas(current_user.id); registros_por_dia = {}
+    for r in registros_bd: data_registro = r.timestamp_entrada.date(); registros_por_dia.setdefault(data_registro, []).append(r)
+    datas_ordenadas = sorted(registros_por_dia.keys(), reverse=True)
+    calendario_jornada = CalendarioJornada(datas_ordenadas[-1], datas_ordenadas[0]) if datas_ordenadas else None
+    for dia in datas_ordenadas:
+        registros_do_dia = registros_por_dia[dia]; tempo_trabalhado_dia = timedelta(0); entradas_saidas_formatadas = []
+        for r in sorted(registros_do_dia, key=lambda x: x.timestamp_entrada):
+            entrada_str = r.timestamp_entrada.strftime('%H:%M:%S'); saida_str = r.timestamp_saida.strftime('%H:%M:%S') if r.timestamp_saida else "(Aberto)"; entradas_saidas_formatadas.append(f"{entrada_str} - {saida_str}")
+            if r.timestamp_saida: tempo_trabalhado_dia += (r.timestamp_saida - r.timestamp_entrada)
+        horas_esperadas_dia = calendario_jornada.esperado(current_user, dia); saldo_dia = tempo_trabalhado_dia - horas_esperadas_dia; historico_calculado.append({'data': dia.strftime('%d/%m/%Y'),'registros': "<br>".join(entradas_saidas_formatadas),'trabalhado': tempo_trabalhado_dia,'esperado': horas_esperadas_dia,'saldo_dia': saldo_dia})
+    return render_template('ponto_usuario.html', status_atual=status_atual, botao_texto=botao_texto, botao_classe=botao_classe, historico=historico_calculado, saldo_total=saldo_total)
+
+@bp.route('/registrar_ponto', methods=['POST'])
+@login_required
+def registrar_ponto():
+    agora = datetime.utcnow(); agora_local_str = agora.strftime("%H:%M:%S")
+    try: tipo = registrar_batida(current_user.id, agora); db.session.commit()
+    except Exception as e: db.session.rollback(); flash(f'Erro ao registrar ponto: {e}', 'danger'); return redirect(url_for('ponto.ponto_usuario'))
+    if tipo == 'saida': flash(f'Saída registrada às {agora_local_str}.', 'success')
+    elif tipo == 'entrada': flash(f'Entrada registrada às {agora_local_str}.', 'success')
+    elif tipo == 'rejeitado': flash('Batida recusada: o horário não é posterior à sua entrada em aberto. Procure o administrador.', 'danger')
+    else: flash('Ponto já registrado há poucos segundos; a batida repetida foi ignorada.', 'success')
+    return redirect(url_for('ponto.ponto_usuario'))
+
+@bp.route('/ponto/sincronizar', methods=['POST'])
+@login_required
+def sincronizar_ponto():
+    dados = request.get_json(silent=True) or {}; batidas = dados.get('batidas')
+    if not isinstance(batidas, list) or len(batidas) > current_app.config['PONTO_OFFLINE_MAX_LOTE']: return jsonify({'erro': 'Lote de batidas inválido.'}), 400
+    try: resultados = sincronizar_batidas(current_user.id, batidas); db.session.commit()
+    except Exception as e: db.session.rollback(); return jsonify({'erro': f'Erro ao sincronizar: {e}'}), 500
+    return jsonify({'resultados': resultados})
+
+# --- PWA: service worker e página offline ---
+@bp.route('/sw.js')
+def service_worker():
+    # O conteúdo do sw.js é preenchido com a lista de arquivos e uma versão derivada deles:
+    # qualquer arquivo estático alterado gera um service worker novo, que troca o cache antigo.
+    with open(os.path.join(current_app.root_path, 'sw.js'), encoding='utf-8') as arquivo: codigo = arquivo.read()
+    arquivos = arquivos_precache(); versao = hashlib.sha1((codigo + '|'.join(arquivos)).encode('utf-8')).hexdigest()[:12]
+    codigo = codigo.replace('__VERSAO_CACHE__', versao).replace('__ARQUIVOS_PRECACHE__', json.dumps(arquivos))
+    resposta = make_response(codigo); resposta.mimetype = 'application/javascript'; resposta.headers['Cache-Control'] = 'no-cache'
+    return resposta
+
+@bp.route('/offline')
+def offline():
+    return render_template('offline.html')
+
+# --- ROTAS ADMIN PONTO (COM CRUD e CÁLCULO DE SALDO) ---
+def _linhas_admin_ponto(chaves, registros_por_dia, funcionarios_por_id, calendario_jornada):
+    """Gera as linhas do relatório uma a uma, para o template ser enviado em streaming."""
+    for func_id, nome, dia in chaves:
+        registros = registros_por_dia.get((func_id, dia), []); trabalhado = timedelta(0)
+        for r in registros:
+            if r.timestamp_saida: trabalhado += (r.timestamp_saida - r.timestamp_entrada)
+        esperado = calendario_jornada.esperado(funcionarios_por_id[func_id], dia)
+        yield {'nome_funcionario': nome, 'data_str': dia.strftime('%d/%m/%Y'), 'registros': registros, 'trabalhado': trabalhado, 'esperado': esperado, 'saldo_dia': trabalhado - esperado}
+
+@bp.route('/admin/ponto')
+@login_required
+@admin_required
+def admin_ponto():
+    funcionarios = Funcionario.query.order_by(Funcionario.nome).all(); funcionarios_por_id = {f.id: f for f in funcionarios}
+    filtros = _filtros_ponto(request.args); tamanho_pagina = current_app.config['ADMIN_PONTO_TAMANHO_PAGINA']
+
+    # Chaves (funcionário, dia) da página, ordenadas por nome e dia decrescente (keyset: sem OFFSET)
+    fonte = fonte_registros(filtros).c; dia_col = db.func.date(fonte.timestamp_entrada)
+    query = _filtrar_registros(db.session.query(fonte.funcionario_id, Funcionario.nome, dia_col).join(Funcionario, fonte.funcionario_id == Funcionario.id), filtros, fonte)
+    cursor = _parse_cursor(request.args.get('apos'))
+    if cursor and cursor[0] in funcionarios_por_id:
+        c_id, c_dia = cursor; c_nome = funcionarios_por_id[c_id].nome
+        query = query.filter(or_(Funcionario.nome > c_nome, and_(Funcionario.nome == c_nome, fonte.funcionario_id > c_id), and_(Funcionario.nome == c_nome, fonte.funcionario_id == c_id, dia_col < c_dia.strftime('%Y-%m-%d'))))
+    linhas_chave = query.group_by(fonte.funcionario_id, Funcionario.nome, dia_col).order_by(Funcionario.nome, fonte.funcionario_id, dia_col.desc()).limit(tamanho_pagina + 1).all()
+    chaves = [(f_id, nome, datetime.strptime(dia_str, '%Y-%m-%d').date()) for f_id, nome, dia_str in linhas_chave[:tamanho_pagina]]
+
+    url_filtros = {'funcionario_id': filtros['funcionario_id'], 'start_date': filtros['start_date_str'], 'end_date': filtros['end_date_str']}
+    proxima_pagina = None
+    if len(linhas_chave) > tamanho_pagina:
+        ultimo = chaves[-1]; proxima_pagina = url_for('ponto.admin_ponto', apos=f"{ultimo[0]}:{ultimo[2].strftime('%Y-%m-%d')}", **url_filtros)
+
+    # Registros somente dos dias da página, em uma única query (arquivados vêm marcados e sem ações)
+    registros_por_dia = {}; calendario_jornada = None
+    if chaves:
+        dias = [dia for _, _, dia in chaves]; pares = {(f_id, dia) for f_id, _, dia in chaves}
+        registros = db.session.query(fonte.id, fonte.funcionario_id, fonte.timestamp_entrada, fonte.timestamp_saida, fonte.arquivado).filter(fonte.funcionario_id.in_({f_id for f_id, _ in pares}), fonte.timestamp_entrada >= datetime.combine(min(dias), datetime.min.time()), fonte.timestamp_entrada < datetime.combine(max(dias) + timedelta(days=1), datetime.min.time())).order_by(fonte.timestamp_entrada).all()
+        for r in registros:
+            par = (r.funcionario_id, r.timestamp_entrada.date())
+            if par in pares: registros_por_dia.setdefault(par, []).append(r)
+        calendario_jornada = CalendarioJornada(min(dias), max(dias))
+
+    return stream_template('admin_ponto.html',
+                           linhas=_linhas_admin_ponto(chaves, registros_por_dia, funcionarios_por_id, calendario_jornada),
+                           funcionarios=funcionarios,
+                           selected_funcionario_id=filtros['funcionario_id'],
+                           start_date=filtros['start_date_str'],
+                           end_date=filtros['end_date_str'],
+                           pagina_continuacao=bool(cursor),
+                           primeira_pagina=url_for('ponto.admin_ponto', **url_filtros),
+                           proxima_pagina=proxima_pagina)
+
+@bp.route('/admin/ponto/exportar')
+@login_required
+@admin_required
+def exportar_ponto():
+    filtros = _filtros_ponto(request.args); tipo = request.args.get('tipo', 'resumo'); formato = request.args.get('formato', 'csv')
+    if tipo not in CABECALHO_EXPORT or formato not in ('csv', 'xlsx'): flash('Tipo ou formato de exportação inválido.', 'danger'); return redirect(url_for('ponto.admin_ponto'))
+    nome_arquivo = f"ponto_{tipo}_{filtros['start_date_str'] or 'inicio'}_{filtros['end_date_str'] or 'hoje'}.{formato}"
+    if formato == 'xlsx':
+        try: import openpyxl # noqa: F401
+        except ImportError: flash('Exportação XLSX indisponível: instale o pacote openpyxl.', 'danger'); return redirect(url_for('ponto.admin_ponto'))
+        arquivo = tempfile.TemporaryFile(); gravar_xlsx(gerar_linhas_export(tipo, filtros), arquivo); arquivo.seek(0)
+        return send_file(arquivo, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', as_attachment=True, download_name=nome_arquivo)
+    return current_app.response_class(stream_with_context(gerar_csv(gerar_linhas_export(tipo, filtros))), mimetype='text/csv', headers={'Content-Disposition': f'attachment; filename="{nome_arquivo}"'})
+
+@bp.route('/admin/ponto/espelhos')
+@login_required
+@admin_required
+def espelhos_ponto():
+    try: mes = datetime.strptime(request.args.get('mes', ''), '%Y-%m')
+    except ValueError: flash('Informe o mês dos espelhos no formato AAAA-MM.', 'danger'); return redirect(url_for('ponto.admin_ponto'))
+    # Renderiza no próprio worker: um pool de processos criado por fork dentro de um worker com threads (gthread) pode herdar locks presos. O pool fica para o `flask gerar-espelhos`
+    arquivo = tempfile.TemporaryFile(); gerar_espelhos(mes.year, mes.month, arquivo, processos=1); arquivo.seek(0)
+    return send_file(arquivo, mimetype='application/zip', as_attachment=True, download_name=f'espelhos_{mes:%Y-%m}.zip')
+
+@bp.route('/admin/ponto/saldos')
+@login_required
+@admin_required
+def admin_saldos():
+    """Trabalhado x esperado por funcionário e dia/semana/mês; ?formato=json devolve os mesmos dados (em segundos)."""
+    filtros = _filtros_ponto(request.args, janela_padrao=False); agrupamento = request.args.get('agrupamento', 'mes'); setor = request.args.get('setor') or None; como_json = request.args.get('formato') == 'json'
+    fim = filtros['end_date'] or date.today(); inicio = filtros['start_date'] or fim.replace(month=1, day=1); erro = None
+    if agrupamento not in AGRUPAMENTOS: erro = 'Agrupamento inválido (use dia, semana ou mes).'
+    elif agrupamento == 'dia' and abs((fim - inicio).days) >= current_app.config['SALDOS_MAX_DIAS_AGRUPAMENTO_DIA']: erro = f"Agrupado por dia, o período pode ter no máximo {current_app.config['SALDOS_MAX_DIAS_AGRUPAMENTO_DIA']} dias."
+    if erro and como_json: return jsonify({'erro': erro}), 400
+    resumo = None
+    if erro: flash(erro, 'danger')
+    else: resumo = resumo_saldos(inicio, fim, agrupamento, filtros['funcionario_id'], setor)
+    if como_json: return jsonify(resumo)
+    funcionarios = db.session.query(Funcionario.id, Funcionario.nome).order_by(Funcionario.nome).all(); setores = [s for (s,) in db.session.query(Funcionario.setor).distinct().order_by(Funcionario.setor)]
+    return render_template('admin_saldos.html', resumo=resumo, funcionarios=funcionarios, setores=setores, agrupamentos=AGRUPAMENTOS, agrupamento=agrupamento, selected_funcionario_id=filtros['funcionario_id'], setor=setor,
+                           start_date=inicio.strftime('%Y-%m-%d'), end_date=fim.strftime('%Y-%m-%d'), rotulo_periodo=rotulo_periodo, horas=lambda segundos: timedelta(seconds=segundos))
+
+# --- Quadro de presença (quem está trabalhando agora) ---
+@bp.route('/admin/presenca')
+@login_required
+@admin_required
+def admin_presenca():
+    _, dados = presenca_atual()
+    return render_template('admin_presenca.html', presenca=json.loads(dados))
+
+@bp.route('/admin/presenca/stream')
+@login_required
+@admin_required
+def presenca_stream():
+    # Cada stream ocupa uma thread do worker enquanto estiver aberto: o semáforo garante threads livres para as batidas
+    semaforo = estado().semaforo_presenca
+    if not semaforo.acquire(blocking=False): return current_app.response_class('Muitos quadros de presença abertos neste servidor.', status=503, mimetype='text/plain', headers={'Retry-After': '30'})
+    resposta = current_app.response_class(eventos_presenca(current_app._get_current_object()), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    resposta.call_on_close(semaforo.release) # Chamado pelo servidor mesmo se o cliente desconectar antes do primeiro evento
+    return resposta
+
+@bp.route('/admin/ponto/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def add_ponto_manual():
+    if request.method == 'POST':
+        valores, erro = validar_ponto(request.form)
+        if erro: flash(erro, 'danger'); funcs = Funcionario.query.order_by(Funcionario.nome).all(); return render_template('form_ponto.html', funcionarios=funcs, registro=None, form_data=request.form)
+        try: n_reg = RegistroPonto(**valores); db.session.add(n_reg); atualizar_saldos_dias({(n_reg.funcionario_id, n_reg.timestamp_entrada.date())}); invalidar_presenca(); db.session.commit(); flash('Registro adicionado com sucesso.', 'success'); return redirect(url_for('ponto.admin_ponto'))
+        except Exception as e: db.session.rollback(); flash(f'Erro ao adicionar: {e}', 'danger')
+    funcs = Funcionario.query.order_by(Funcionario.nome).all(); return render_template('form_ponto.html', funcionarios=funcs, registro=None, form_data={})
+
+@bp.route('/admin/ponto/edit/<int:id>', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def edit_ponto_manual(id):
+    reg = RegistroPonto.query.get_or_404(id); funcs = Funcionario.query.order_by(Funcionario.nome).all()
+    if request.method == 'POST':
+        valores, erro = validar_ponto(request.form)
+        if erro: flash(erro, 'danger'); return render_template('form_ponto.html', funcionarios=funcs, registro=reg, form_data=request.form)
+        try:
+            par_anterior = (reg.funcionario_id, reg.timestamp_entrada.date())
+            for campo, valor in valores.items(): setattr(reg, campo, valor)
+            atualizar_saldos_dias({par_anterior, (reg.funcionario_id, reg.timestamp_entrada.date())}); invalidar_presenca(); db.session.commit(); flash('Registro atualizado.', 'success'); return redirect(url_for('ponto.admin_ponto'))
+        except Exception as e: db.session.rollback(); flash(f'Erro ao atualizar: {e}', 'danger')
+    form_data = {'funcionario_id': reg.funcionario_id, 'data': reg.timestamp_entrada.strftime('%Y-%m-%d'), 'entrada': reg.timestamp_entrada.strftime('%H:%M'), 'saida': reg.timestamp_saida.strftime('%H:%M') if reg.timestamp_saida else '', 'observacao': reg.observacao or ''}
+    return render_template('form_ponto.html', funcionarios=funcs, registro=reg, form_data=form_data)
+
+@bp.route('/admin/ponto/delete/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def delete_ponto_manual(id):
+    try: reg = RegistroPonto.query.get_or_404(id); par = (reg.funcionario_id, reg.timestamp_entrada.date()); db.session.delete(reg); atualizar_saldos_dias({par}); invalidar_presenca(); db.session.commit(); flash('Registro deletado.', 'success')
+    except Exception as e: db.session.rollback(); flash(f'Erro ao deletar: {e}', 'danger')
+    return redirect(url_for('ponto.admin_ponto'))
@@ -0,0 +1,31 @@
+from datetime import timedelta
+from functools import wraps
+from flask import flash, redirect, url_for
+from flask_login import current_user
+from .extensoes import db
+
+NOMES_MESES = ["", "Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
+
+# --- Filtro Jinja2 Customizado ---
+def format_timedelta(value):
+    if not isinstance(value, timedelta): return value
+    total_seconds = int(value.total_seconds()); sign = '-' if total_seconds < 0 else ''; total_seconds = abs(total_seconds)
+    hours, remainder = divmod(total_seconds, 3600); minutes, seconds = divmod(remainder, 60)
+    return f'{sign}{hours:02}:{minutes:02}:{seconds:02}'
+
+# --- Decorator @admin_required CORRIGIDO ---
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated or current_user.role != 'admin':
+            flash('Você não tem permissão para acessar esta página.', 'danger')
+            return redirect(url_for('avisos.index'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+# --- Transações de escrita ---
+def _iniciar_transacao_escrita():
+    # No SQLite, BEGIN IMMEDIATE pega o lock de escrita já na leitura: duas batidas simultâneas
+    # do mesmo funcionário são serializadas e a segunda enxerga o registro criado pela primeira.
+    if db.session.get_bind().dialect.name == 'sqlite' and not db.session.connection().connection.dbapi_connection.in_transaction:
+        db.session.execute(db.text('BEGIN IMMEDIATE'))
@@ -0,0 +1,51 @@
+from datetime import datetime
+from functools import lru_cache
+
+# --- Helper Function para parse de datetime CORRIGIDO ---
+# strptime é lento e as importações repetem as mesmas datas/horas milhares de vezes
+@lru_cache(maxsize=4096)
+def _parse_data(date_str): return datetime.strptime(date_str, '%Y-%m-%d').date()
+@lru_cache(maxsize=2048)
+def _parse_hora(time_str): return datetime.strptime(time_str, '%H:%M').time()
+
+def parse_datetime_local(date_str, time_str):
+    if not date_str or not time_str: return None
+    try: return datetime.combine(_parse_data(date_str), _parse_hora(time_str))
+    except ValueError: return None
+
+# --- Validação dos formulários (também usada pelos comandos de importação) ---
+def _texto(dados, campo):
+    valor = dados.get(campo); return str(valor).strip() if valor is not None else ''
+
+def validar_funcionario(dados):
+    """Valida os campos do cadastro de funcionário. Retorna (valores, erro); username repetido é checado por quem chama."""
+    valores = {campo: _texto(dados, campo) for campo in ('username', 'password', 'nome', 'setor', 'role')}
+    if not valores['username'] or not valores['password'] or not valores['nome'] or not valores['setor']: return None, 'Usuário, senha, nome e setor são obrigatórios.'
+    valores['role'] = valores['role'] or 'user'
+    if valores['role'] not in ('user', 'admin'): return None, "Perfil deve ser 'user' ou 'admin'."
+    try: valores['data_nascimento'] = datetime.strptime(_texto(dados, 'data_nascimento'), '%Y-%m-%d').date()
+    except ValueError: return None, 'Formato de data inválido. Use AAAA-MM-DD.'
+    grupo_sabado = _texto(dados, 'grupo_sabado').upper() or None
+    if grupo_sabado and grupo_sabado not in ('A', 'B'): return None, "Grupo Sábado deve ser 'A' ou 'B'."
+    valores['grupo_sabado'] = grupo_sabado; valores['horario_especial_09'] = _texto(dados, 'horario_especial_09') in ('True', 'true', '1', 'S', 's')
+    return valores, None
+
+def validar_feriado(dados):
+    """Valida data/nome de um feriado. Retorna (valores, erro)."""
+    nome = _texto(dados, 'nome_feriado') or _texto(dados, 'nome')
+    try: data_feriado = datetime.strptime(_texto(dados, 'data_feriado') or _texto(dados, 'data'), '%Y-%m-%d').date()
+    except ValueError: return None, 'Formato de data inválido. Use AAAA-MM-DD.'
+    if not nome: return None, 'Nome do feriado obrigatório.'
+    return {'data': data_feriado, 'nome': nome}, None
+
+def validar_ponto(dados):
+    """Valida um registro de ponto manual (data + horas de entrada/saída). Retorna (valores, erro)."""
+    try: f_id = int(_texto(dados, 'funcionario_id'))
+    except ValueError: f_id = None
+    d_str = _texto(dados, 'data'); e_str = _texto(dados, 'entrada'); s_str = _texto(dados, 'saida'); obs = _texto(dados, 'observacao') or None
+    if not f_id or not d_str or not e_str: return None, 'Funcionário, Data e Hora Entrada obrigatórios.'
+    e_dt = parse_datetime_local(d_str, e_str); s_dt = parse_datetime_local(d_str, s_str)
+    if e_dt is None: return None, 'Formato inválido Entrada.'
+    if s_str and s_dt is None: return None, 'Formato inválido Saída.'
+    if s_dt and e_dt >= s_dt: return None, 'Saída deve ser posterior à Entrada.'
+    return {'funcionario_id': f_id, 'timestamp_entrada': e_dt, 'timestamp_saida': s_dt, 'observacao': obs}, None
@@ -1,4 +1,218 @@
-// Service Worker Básico para instalação de PWA
+// Service Worker do App Interno ASP
+// - Guarda os arquivos estáticos (com hash na URL) e a página offline na instalação.
+// - Páginas de leitura (avisos, calendário, escala): stale-while-revalidate.
+// - Batidas de ponto feitas sem rede ficam numa fila no IndexedDB e são reenviadas
+//   para /ponto/sincronizar com o horário original em que foram capturadas.
+// VERSAO_CACHE e ARQUIVOS_PRECACHE são preenchidos pelo Flask (rota /sw.js).
+
+const VERSAO_CACHE = '__VERSAO_CACHE__';
+const ARQUIVOS_PRECACHE = __ARQUIVOS_PRECACHE__;
+const CACHE_ESTATICO = 'asp-estatico-' + VERSAO_CACHE;
+const CACHE_PAGINAS = 'asp-paginas-' + VERSAO_CACHE;
+const PAGINAS_LEITURA = ['/', '/calendario', '/limpeza'];
+const URL_OFFLINE = '/offline';
+const TAG_SYNC = 'enviar-batidas';
+
+// --- IndexedDB: fila de batidas e configuração ---
+function abrirBanco() {
+    return new Promise(function(resolve, reject) {
+        const req = indexedDB.open('asp-ponto', 1);
+        req.onupgradeneeded = function() {
+            req.result.createObjectStore('fila', { keyPath: 'id' });
+            req.result.createObjectStore('config');
+        };
+        req.onsuccess = function() { resolve(req.result); };
+        req.onerror = function() { reject(req.error); };
+    });
+}
+
+function operacao(store, modo, fn) {
+    return abrirBanco().then(function(banco) {
+        return new Promise(function(resolve, reject) {
+            const tx = banco.transaction(store, modo);
+            const req = fn(tx.objectStore(store));
+            tx.oncomplete = function() { resolve(req ? req.result : undefined); };
+            tx.onerror = function() { reject(tx.error); };
+        });
+    });
+}
+
+function usuarioAtual() {
+    return operacao('config', 'readonly', function(s) { return s.get('usuario'); });
+}
+
+// Dono da batida: o funcionário da página que enviou o formulário (campo oculto) ou, em páginas
+// antigas sem o campo, o último usuário informado pelas páginas. Sem dono, a batida não entra na
+// fila (o servidor a creditaria a quem sincronizasse primeiro); devolve null.
+function enfileirarBatida(request) {
+    const capturado_em = new Date().toISOString();
+    return request.formData().then(function(form) { return form.get('funcionario_id'); }).catch(function() { return null; }).then(function(doFormulario) {
+        return doFormulario ? doFormulario : usuarioAtual();
+    }).then(function(usuario) {
+        if (usuario === undefined || usuario === null || usuario === '') return null;
+        const batida = {
+            id: (self.crypto && crypto.randomUUID) ? crypto.randomUUID() : Date.now() + '-' + Math.random().toString(16).slice(2),
+            capturado_em: capturado_em,
+            funcionario_id: usuario
+        };
+        return operacao('fila', 'readwrite', function(s) { return s.put(batida); }).then(function() { return batida; });
+    });
+}
+
+let envioEmAndamento = null;
+function enviarBatidas() {
+    if (envioEmAndamento) return envioEmAndamento;
+    envioEmAndamento = operacao('fila', 'readonly', function(s) { return s.getAll(); }).then(function(batidas) {
+        if (!batidas || !batidas.length) return;
+        return fetch('/ponto/sincronizar', {
+            method: 'POST',
+            credentials: 'same-origin',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ batidas: batidas.slice(0, 100) })
+        }).then(function(resposta) {
+            const tipo = resposta.headers.get('Content-Type') || '';
+            if (!resposta.ok || tipo.indexOf('application/json') === -1) throw new Error('Sincronização indisponível');
+            return resposta.json();
+        }).then(function(dados) {
+            // Tudo que o servidor respondeu sai da fila, exceto batidas de outro usuário do aparelho
+            const concluidas = dados.resultados.filter(function(r) { return r.id && r.status !== 'outro_usuario'; });
+            return operacao('fila', 'readwrite', function(s) {
+                concluidas.forEach(function(r) { s.delete(r.id); });
+            }).then(function() { return avisarPaginas({ tipo: 'batidas-sincronizadas', resultados: dados.resultados }); });
+        });
+    }).catch(function() { /* Continua na fila para a próxima tentativa */ }).then(function() { envioEmAndamento = null; });
+    return envioEmAndamento;
+}
+
+function avisarPaginas(mensagem) {
+    return self.clients.matchAll({ type: 'window' }).then(function(janelas) {
+        janelas.forEach(function(janela) { janela.postMessage(mensagem); });
+    });
+}
+
+function respostaBatidaOffline(batida) {
+    if (!batida) return respostaBatidaSemDono();
+    const hora = new Date(batida.capturado_em).toLocaleTimeString('pt-BR');
+    const html = '<!DOCTYPE html><html lang="pt-br"><head><meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0">' +
+        '<title>Ponto guardado</title></head><body style="font-family: sans-serif; text-align: center; padding: 40px 20px;">' +
+        '<h1>Sem conexão</h1><p>Sua batida de ponto das <strong>' + hora + '</strong> foi guardada neste aparelho ' +
+        'e será enviada automaticamente quando a internet voltar, com o horário original.</p>' +
+        '<p><a href="/ponto">Voltar</a></p></body></html>';
+    return new Response(html, { status: 200, headers: { 'Content-Type': 'text/html; charset=utf-8' } });
+}
+
+function respostaBatidaSemDono() {
+    const html = '<!DOCTYPE html><html lang="pt-br"><head><meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0">' +
+        '<title>Ponto não registrado</title></head><body style="font-family: sans-serif; text-align: center; padding: 40px 20px;">' +
+        '<h1>Sem conexão</h1><p>Não foi possível identificar o usuário deste aparelho, então a batida <strong>não</strong> foi guardada. ' +
+        'Quando a internet voltar, faça login e registre o ponto de novo, ou avise o administrador.</p>' +
+        '<p><a href="/ponto">Voltar</a></p></body></html>';
+    return new Response(html, { status: 200, headers: { 'Content-Type': 'text/html; charset=utf-8' } });
+}
+
+// --- Ciclo de vida ---
+self.addEventListener('install', function(event) {
+    event.waitUntil(caches.open(CACHE_ESTATICO).then(function(cache) {
+        return cache.addAll(ARQUIVOS_PRECACHE);
+    }).then(function() { return self.skipWaiting(); }));
+});
+
+self.addEventListener('activate', function(event) {
+    event.waitUntil(caches.keys().then(function(nomes) {
+        return Promise.all(nomes.filter(function(nome) {
+            return nome.indexOf('asp-') === 0 && nome !== CACHE_ESTATICO && nome !== CACHE_PAGINAS;
+        }).map(function(nome) { return caches.delete(nome); }));
+    }).then(function() { return self.clients.claim(); }).then(enviarBatidas));
+});
+
+self.addEventListener('sync', function(event) {
+    if (event.tag === TAG_SYNC) event.waitUntil(enviarBatidas());
+});
+
+self.addEventListener('message', function(event) {
+    const dados = event.data || {};
+    if (dados.tipo === 'usuario') {
+        // Outro usuário no mesmo aparelho: as páginas guardadas têm o menu/nome do anterior
+        event.waitUntil(usuarioAtual().then(function(anterior) {
+            const limpar = anterior !== dados.id ? caches.delete(CACHE_PAGINAS) : Promise.resolve();
+            return limpar.then(function() {
+                return operacao('config', 'readwrite', function(s) { return s.put(dados.id, 'usuario'); });
+            });
+        }).then(enviarBatidas));
+    } else if (dados.tipo === 'enviar-batidas') {
+        event.waitUntil(enviarBatidas());
+    }
+});
+
+// --- Requisições ---
+function podeGuardar(resposta) {
+    return resposta && resposta.ok && !resposta.redirected && resposta.type === 'basic' &&
+        (resposta.headers.get('Cache-Control') || '').indexOf('no-store') === -1;
+}
+
+function staleWhileRevalidate(event) {
+    return caches.open(CACHE_PAGINAS).then(function(cache) {
+        return cache.match(event.request).then(function(guardada) {
+            const daRede = fetch(event.request).then(function(resposta) {
+                if (podeGuardar(resposta)) cache.put(event.request, resposta.clone());
+                return resposta;
+            });
+            if (guardada) {
+                event.waitUntil(daRede.catch(function() {}));
+                return guardada;
+            }
+            return daRede.catch(function() { return caches.match(URL_OFFLINE); });
+        });
+    });
+}
+
 self.addEventListener('fetch', function(event) {
-    // Apenas para registrar o PWA, não faz cache offline
-});
\ No newline at end of file
+    const request = event.request;
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+
+    if (request.method === 'POST' && url.pathname === '/registrar_ponto') {
+        const copia = request.clone(); // O corpo do original vai para a rede; a cópia guarda o dono da batida
+        event.respondWith(fetch(request.clone()).then(function(resposta) {
+            enviarBatidas();
+            return resposta;
+        }).catch(function() {
+            return enfileirarBatida(copia).then(function(batida) {
+                if (batida && self.registration.sync) self.registration.sync.register(TAG_SYNC).catch(function() {});
+                return respostaBatidaOffline(batida);
+            });
+        }));
+        return;
+    }
+    if (request.method !== 'GET') return;
+
+    if (url.pathname.indexOf('/static/') === 0) {
+        // Cache-first: a URL tem o hash do conteúdo
+        event.respondWith(caches.match(request).then(function(guardada) {
+            return guardada || fetch(request).then(function(resposta) {
+                if (podeGuardar(resposta) && url.searchParams.has('v')) {
+                    const copia = resposta.clone();
+                    caches.open(CACHE_ESTATICO).then(function(cache) { cache.put(request, copia); });
+                }
+                return resposta;
+            });
+        }));
+        return;
+    }
+    if (request.mode === 'navigate' && PAGINAS_LEITURA.indexOf(url.pathname) !== -1) {
+        event.respondWith(staleWhileRevalidate(event));
+        return;
+    }
+    if (request.mode === 'navigate') {
+        // Demais páginas (ponto, admin): sempre da rede; sem conexão, última cópia ou página offline
+        event.respondWith(fetch(request).then(function(resposta) {
+            if (podeGuardar(resposta) && url.pathname === '/ponto') {
+                const copia = resposta.clone();
+                caches.open(CACHE_PAGINAS).then(function(cache) { cache.put(request, copia); });
+            }
+            return resposta;
+        }).catch(function() {
+            return caches.match(request).then(function(guardada) { return guardada || caches.match(URL_OFFLINE); });
+        }));
+    }
+});
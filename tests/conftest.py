@@ -0,0 +1,29 @@
+import os
+import sys
+import warnings
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+warnings.filterwarnings('ignore', category=DeprecationWarning)
+
+from interno import create_app
+from interno.extensoes import db
+
+# Hash barato: os testes não medem a segurança da senha
+CONFIG_TESTES = {'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SECRET_KEY': 'testes', 'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1', 'METRICAS_ATIVAS': False}
+
+@pytest.fixture
+def app():
+    """App com banco em memória vazio (tabelas criadas), dentro de um app context."""
+    app = create_app(CONFIG_TESTES)
+    with app.app_context():
+        db.create_all(); yield app
+        db.session.remove(); db.drop_all()
+
+@pytest.fixture
+def app_arquivo(tmp_path):
+    """Como `app`, mas com o banco em arquivo e sem criar as tabelas: para testar upgrade-db e a CLI."""
+    app = create_app(dict(CONFIG_TESTES, SQLALCHEMY_DATABASE_URI='sqlite:///' + str(tmp_path / 'teste.db')))
+    with app.app_context():
+        yield app
+        db.session.remove(); db.engine.dispose()
@@ -0,0 +1,69 @@
+from datetime import date, datetime, timedelta
+import pytest
+from interno.extensoes import db
+from interno.jornada import atualizar_saldos_dias, saldo_banco_horas
+from interno.modelos import Feriado, Funcionario, RegistroPonto, RegistroPontoArquivo, ResumoMensal, SaldoDiario
+
+def _registro(f_id, dia, entrada, saida=None):
+    inicio = datetime.combine(dia, datetime.min.time())
+    return RegistroPonto(funcionario_id=f_id, timestamp_entrada=inicio + timedelta(hours=entrada), timestamp_saida=inicio + timedelta(hours=saida) if saida else None)
+
+@pytest.fixture
+def arquivado(app):
+    """Admin + dois funcionários com registros em jan e fev/2025, arquivados até fev/2025 (o dia 10/02 do func2 fica em aberto)."""
+    admin = Funcionario(username='admin', nome='Admin', setor='Escritório', data_nascimento=date(1980, 1, 1), role='admin'); admin.set_password('senha')
+    funcs = [Funcionario(username=f'func{n}', nome=f'Func {n}', setor='Expedição', data_nascimento=date(1990, 2, 28), password_hash='x', grupo_sabado=g) for n, g in ((1, 'A'), (2, None))]
+    db.session.add_all([admin] + funcs); db.session.flush()
+    for f in funcs:
+        for dia in (date(2025, 1, 6), date(2025, 1, 31), date(2025, 2, 3), date(2025, 2, 10)): db.session.add_all([_registro(f.id, dia, 8, 12), _registro(f.id, dia, 13, 18)])
+    db.session.add(_registro(funcs[1].id, date(2025, 2, 10), 19)) # Saída esquecida: o dia fica na tabela quente
+    db.session.add(_registro(funcs[0].id, date(2025, 3, 3), 8, 17)); db.session.flush()
+    atualizar_saldos_dias({(r.funcionario_id, r.timestamp_entrada.date()) for r in RegistroPonto.query}); db.session.commit()
+    saldos = {f.id: saldo_banco_horas(f.id) for f in funcs}
+    resultado = app.test_cli_runner().invoke(args=['archive-ponto', '--before', '2025-03'])
+    assert resultado.exit_code == 0, resultado.output
+    return {'funcs': funcs, 'saldos': saldos, 'saida': resultado.output}
+
+def test_arquiva_mes_a_mes_sem_mudar_o_saldo(arquivado):
+    func1, func2 = arquivado['funcs']
+    assert '01/2025: 8 registro(s) em 4 dia(s).' in arquivado['saida'] and '02/2025: 6 registro(s) em 3 dia(s).' in arquivado['saida']
+    assert RegistroPontoArquivo.query.count() == 14 and RegistroPonto.query.count() == 4 # 3 do dia em aberto + março
+    assert {(r.funcionario_id, r.timestamp_entrada.date()) for r in RegistroPonto.query} == {(func2.id, date(2025, 2, 10)), (func1.id, date(2025, 3, 3))}
+    assert {(s.funcionario_id, s.data) for s in SaldoDiario.query} == {(func2.id, date(2025, 2, 10)), (func1.id, date(2025, 3, 3))}
+    assert {(r.funcionario_id, r.mes): r.dias for r in ResumoMensal.query} == {(func1.id, 1): 2, (func2.id, 1): 2, (func1.id, 2): 2, (func2.id, 2): 1}
+    assert {f.id: saldo_banco_horas(f.id) for f in arquivado['funcs']} == arquivado['saldos']
+
+def test_arquivar_de_novo_soma_o_dia_que_estava_em_aberto(app, arquivado):
+    func2 = arquivado['funcs'][1]; aberto = RegistroPonto.query.filter_by(timestamp_saida=None).one()
+    aberto.timestamp_saida = aberto.timestamp_entrada + timedelta(hours=1); atualizar_saldos_dias({(func2.id, date(2025, 2, 10))}); db.session.commit()
+    saldo = saldo_banco_horas(func2.id); resultado = app.test_cli_runner().invoke(args=['archive-ponto', '--before', '2025-03'])
+    assert '02/2025: 3 registro(s) em 1 dia(s).' in resultado.output
+    assert ResumoMensal.query.filter_by(funcionario_id=func2.id, mes=2).one().dias == 2 and saldo_banco_horas(func2.id) == saldo
+
+@pytest.fixture
+def admin(app, arquivado):
+    cliente = app.test_client(); cliente.post('/login', data={'username': 'admin', 'password': 'senha'}); return cliente
+
+def test_registro_manual_em_dia_arquivado_e_recusado(admin, arquivado):
+    func1, func2 = arquivado['funcs']
+    resposta = admin.post('/admin/ponto/add', data={'funcionario_id': str(func1.id), 'data': '2025-02-03', 'entrada': '19:00', 'saida': '20:00'}, follow_redirects=True)
+    assert 'já foi arquivado' in resposta.get_data(as_text=True)
+    assert RegistroPonto.query.count() == 4 and not SaldoDiario.query.filter_by(data=date(2025, 2, 3)).count()
+    # Dia sem nada no arquivo (mesmo num mês arquivado) continua aceitando correções, assim como o dia que ficou em aberto
+    admin.post('/admin/ponto/add', data={'funcionario_id': str(func1.id), 'data': '2025-02-04', 'entrada': '08:00', 'saida': '12:00'})
+    aberto = RegistroPonto.query.filter_by(timestamp_saida=None).one()
+    admin.post(f'/admin/ponto/edit/{aberto.id}', data={'funcionario_id': str(func2.id), 'data': '2025-02-10', 'entrada': '19:00', 'saida': '20:00'})
+    assert RegistroPonto.query.count() == 5 and RegistroPonto.query.filter_by(timestamp_saida=None).count() == 0
+    assert {f.id: saldo_banco_horas(f.id) for f in (func1, func2)} == {func1.id: arquivado['saldos'][func1.id] - timedelta(hours=5), func2.id: arquivado['saldos'][func2.id] + timedelta(hours=1)}
+
+def test_feriado_em_dia_arquivado_e_recusado(admin, arquivado):
+    resposta = admin.post('/admin/calendario', data={'data_feriado': '2025-01-31', 'nome_feriado': 'Tarde'}, follow_redirects=True)
+    assert 'já foi arquivado' in resposta.get_data(as_text=True) and Feriado.query.count() == 0
+    admin.post('/admin/calendario', data={'data_feriado': '2025-02-04', 'nome_feriado': 'Sem registros arquivados'})
+    assert Feriado.query.count() == 1
+
+def test_importacao_em_dia_arquivado_reporta_a_linha(app, arquivado, tmp_path):
+    func1 = arquivado['funcs'][0]; arquivo = tmp_path / 'ponto.csv'
+    arquivo.write_text(f'funcionario_id;data;entrada;saida\n{func1.id};2025-01-06;19:00;20:00\n{func1.id};2025-01-07;08:00;12:00\n', encoding='utf-8')
+    resultado = app.test_cli_runner().invoke(args=['import-ponto', str(arquivo)])
+    assert 'Linha 2: O dia 06/01/2025' in resultado.output and '1 registro(s) de ponto importado(s), 1 linha(s) com erro.' in resultado.output
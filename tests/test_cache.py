@@ -0,0 +1,19 @@
+from interno.cache import invalidar_cache, versoes_cache
+from interno.estado import estado
+from interno.extensoes import db
+from interno.modelos import VersaoCache
+
+def _versao_local(namespace): return estado().versoes['versoes'].get(namespace, (0,))[0]
+
+def test_versao_so_muda_no_worker_depois_do_commit(app):
+    versoes_cache(); invalidar_cache('avisos')
+    assert _versao_local('avisos') == 0 # Ainda não gravada: outro worker não a enxerga
+    db.session.commit()
+    assert _versao_local('avisos') == 1 == db.session.get(VersaoCache, 'avisos').versao
+
+def test_rollback_descarta_a_versao(app):
+    invalidar_cache('avisos'); db.session.commit(); invalidar_cache('avisos', 'feriados'); db.session.rollback()
+    assert (_versao_local('avisos'), _versao_local('feriados')) == (1, 0)
+    # O próximo commit (deste ou de outro worker) grava a versão 2, que passa a valer aqui
+    invalidar_cache('avisos'); db.session.commit()
+    assert _versao_local('avisos') == 2 == db.session.get(VersaoCache, 'avisos').versao
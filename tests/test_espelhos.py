@@ -0,0 +1,23 @@
+import concurrent.futures
+import io
+import zipfile
+from datetime import date, datetime
+import pytest
+from interno.extensoes import db
+from interno.modelos import Funcionario, RegistroPonto
+
+@pytest.fixture
+def admin(app):
+    admin = Funcionario(username='admin', nome='Admin', setor='Escritório', data_nascimento=date(1980, 1, 1), role='admin'); admin.set_password('senha')
+    func = Funcionario(username='func', nome='Func', setor='Expedição', data_nascimento=date(1990, 5, 5), password_hash='x')
+    db.session.add_all([admin, func]); db.session.flush()
+    db.session.add(RegistroPonto(funcionario_id=func.id, timestamp_entrada=datetime(2025, 1, 6, 8), timestamp_saida=datetime(2025, 1, 6, 17))); db.session.commit()
+    cliente = app.test_client(); cliente.post('/login', data={'username': 'admin', 'password': 'senha'}); return cliente
+
+def test_espelhos_pela_tela_nao_criam_pool_de_processos(admin, app, monkeypatch):
+    def sem_pool(*args, **kwargs): raise AssertionError('pool de processos criado dentro do worker web')
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', sem_pool); app.config['ESPELHOS_PROCESSOS'] = 4
+    resposta = admin.get('/admin/ponto/espelhos', query_string={'mes': '2025-01'})
+    assert resposta.status_code == 200 and resposta.mimetype == 'application/zip'
+    nomes = zipfile.ZipFile(io.BytesIO(resposta.get_data())).namelist()
+    assert {'resumo.csv', 'resumo.html'} <= set(nomes) and len([n for n in nomes if n.startswith('espelhos/')]) == 2
@@ -0,0 +1,25 @@
+from datetime import date
+from interno.comandos import importar_arquivo
+from interno.extensoes import db
+from interno.modelos import Feriado
+from interno.validacao import validar_feriado
+
+def test_lote_recusado_pelo_banco_rejeita_so_as_linhas_ruins(app, tmp_path, capsys):
+    # Feriado cadastrado por fora (ex.: pela tela) depois da validação: a linha 4 viola o UNIQUE de feriado.data
+    db.session.add(Feriado(data=date(2025, 12, 25), nome='Natal')); db.session.commit()
+    arquivo = tmp_path / 'feriados.csv'
+    arquivo.write_text('data;nome\n2025-01-01;Ano Novo\n2025-04-21;Tiradentes\n2025-12-25;Natal\n2025-11-15;República\n2025-13-01;Inválido\n2025-11-02;Finados\n', encoding='utf-8')
+    gravar = lambda mappings: db.session.bulk_insert_mappings(Feriado, mappings)
+    importadas, erros = importar_arquivo(str(arquivo), validar_feriado, gravar, tamanho_lote=10)
+    saida = capsys.readouterr().out
+    assert (importadas, erros) == (4, 2)
+    assert 'Linha 4: UNIQUE constraint failed' in saida and 'Linha 6:' in saida and 'Erro ao gravar o lote' not in saida
+    assert sorted(f.data for f in Feriado.query) == [date(2025, 1, 1), date(2025, 4, 21), date(2025, 11, 2), date(2025, 11, 15), date(2025, 12, 25)]
+
+def test_lotes_sem_erro_continuam_em_uma_transacao(app, tmp_path):
+    arquivo = tmp_path / 'feriados.jsonl'
+    arquivo.write_text('\n'.join(f'{{"data": "2030-01-{dia:02d}", "nome": "F{dia}"}}' for dia in range(1, 8)) + '\n', encoding='utf-8')
+    lotes = []
+    def gravar(mappings): lotes.append(len(mappings)); db.session.bulk_insert_mappings(Feriado, mappings)
+    assert importar_arquivo(str(arquivo), validar_feriado, gravar, tamanho_lote=3) == (7, 0)
+    assert lotes == [3, 3, 1]
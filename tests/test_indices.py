@@ -0,0 +1,57 @@
+import pytest
+from interno.comandos import consultas_criticas, copia_esquema_sem_estatisticas, plano_de_execucao
+from interno.extensoes import db
+
+# Tabelas como eram antes das migrações (sem índices nem as colunas do aniversário): um app.db antigo
+ESQUEMA_ORIGINAL = """
+CREATE TABLE funcionario (id INTEGER NOT NULL, nome VARCHAR(100) NOT NULL, setor VARCHAR(50) NOT NULL, data_nascimento DATE NOT NULL, username VARCHAR(80) NOT NULL, password_hash VARCHAR(256) NOT NULL, role VARCHAR(20) NOT NULL, grupo_sabado VARCHAR(1), horario_especial_09 BOOLEAN NOT NULL, PRIMARY KEY (id), UNIQUE (username));
+CREATE TABLE aviso (id INTEGER NOT NULL, titulo VARCHAR(200) NOT NULL, conteudo TEXT NOT NULL, data_postagem DATETIME NOT NULL, PRIMARY KEY (id));
+CREATE TABLE feriado (id INTEGER NOT NULL, data DATE NOT NULL, nome VARCHAR(100) NOT NULL, PRIMARY KEY (id), UNIQUE (data));
+CREATE TABLE escala_limpeza (id INTEGER NOT NULL, data_escala DATE NOT NULL, funcionario_escritorio_id INTEGER NOT NULL, funcionario_expedicao_id INTEGER NOT NULL, PRIMARY KEY (id), UNIQUE (data_escala), FOREIGN KEY(funcionario_escritorio_id) REFERENCES funcionario (id), FOREIGN KEY(funcionario_expedicao_id) REFERENCES funcionario (id));
+CREATE TABLE registro_ponto (id INTEGER NOT NULL, funcionario_id INTEGER NOT NULL, timestamp_entrada DATETIME NOT NULL, timestamp_saida DATETIME, observacao VARCHAR(200), PRIMARY KEY (id), FOREIGN KEY(funcionario_id) REFERENCES funcionario (id));
+"""
+
+# Índice que cada consulta crítica deve usar (mais de um quando o SQLite pode escolher entre eles)
+INDICES_ESPERADOS = {
+    'ultimo registro do funcionario': {'ix_registro_ponto_funcionario_entrada'},
+    'registro aberto (batida de ponto)': {'ix_registro_ponto_funcionario_entrada', 'ix_registro_ponto_aberto'},
+    'historico do funcionario (30 dias)': {'ix_registro_ponto_funcionario_entrada'},
+    'admin ponto por periodo': {'ix_registro_ponto_entrada'},
+    'aniversariantes do dia': {'ix_funcionario_nascimento_mes_dia'},
+    'aniversariantes do mes': {'ix_funcionario_nascimento_mes_dia'},
+    'feriados do mes': {'sqlite_autoindex_feriado_1'},
+    'feriado do dia': {'sqlite_autoindex_feriado_1'},
+    'avisos recentes': {'ix_aviso_data_postagem'},
+    'saldo total do funcionario': {'ix_saldo_diario_funcionario_id', 'sqlite_autoindex_saldo_diario_1'},
+    'admin ponto no arquivo': {'ix_registro_ponto_arquivo_entrada'},
+    'saldo arquivado do funcionario': {'ix_resumo_mensal_funcionario_id', 'sqlite_autoindex_resumo_mensal_1'},
+    'resumo de saldos do periodo': {'ix_saldo_diario_data'},
+}
+
+@pytest.fixture
+def planos(app_arquivo):
+    """{consulta: linhas do EXPLAIN QUERY PLAN} depois de rodar `flask upgrade-db` num banco no formato original."""
+    with db.engine.begin() as conn: conn.connection.executescript(ESQUEMA_ORIGINAL)
+    resultado = app_arquivo.test_cli_runner().invoke(args=['upgrade-db'])
+    assert resultado.exit_code == 0 and 'Banco de dados atualizado!' in resultado.output, resultado.output
+    conexao = copia_esquema_sem_estatisticas()
+    return {nome: plano_de_execucao(query, conexao) for nome, query in consultas_criticas().items()}
+
+def test_toda_consulta_critica_tem_indice_esperado(planos):
+    assert set(planos) == set(INDICES_ESPERADOS)
+
+@pytest.mark.parametrize('nome', sorted(INDICES_ESPERADOS))
+def test_consulta_critica_usa_indice(planos, nome):
+    plano = planos[nome]; acessos = [passo for passo in plano if passo.startswith(('SEARCH', 'SCAN'))]
+    assert acessos, plano
+    for passo in acessos:
+        assert ' USING INDEX ' in passo or ' USING COVERING INDEX ' in passo or ' USING INTEGER PRIMARY KEY ' in passo, plano
+    assert any(f' INDEX {indice}' in passo for passo in acessos for indice in INDICES_ESPERADOS[nome]), plano
+
+def test_upgrade_db_idempotente(planos, app_arquivo):
+    resultado = app_arquivo.test_cli_runner().invoke(args=['upgrade-db'])
+    assert 'Banco de dados já está atualizado.' in resultado.output
+
+def test_comando_verificar_indices(planos, app_arquivo):
+    resultado = app_arquivo.test_cli_runner().invoke(args=['verificar-indices'])
+    assert resultado.exit_code == 0 and '[FALHA]' not in resultado.output, resultado.output
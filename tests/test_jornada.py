@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+import pytest
+from interno.extensoes import db
+from interno.jornada import CalendarioJornada, get_expected_work_duration
+from interno.modelos import Feriado, Funcionario
+
+# Todos os perfis de jornada (grupo de sábado x entrada às 09:00), com aniversários variados (inclusive 29/02)
+PERFIS = [(grupo, especial) for grupo in (None, 'A', 'B') for especial in (False, True)]
+NASCIMENTOS = [date(1990, 2, 28), date(1992, 2, 29), date(1985, 3, 1), date(1970, 12, 31), date(2000, 1, 1), date(1988, 6, 15)]
+# Feriados em dia útil, em sábado (2025-11-15), em domingo (2026-11-15), na virada de ano e em 29/02 (2028)
+FERIADOS = [date(2024, 12, 25), date(2025, 1, 1), date(2025, 4, 21), date(2025, 11, 15), date(2025, 12, 25), date(2026, 1, 1), date(2026, 11, 15), date(2026, 12, 25), date(2027, 1, 1), date(2028, 2, 29)]
+
+@pytest.fixture
+def funcionarios(app):
+    lista = []
+    for n, ((grupo, especial), nascimento) in enumerate(zip(PERFIS, NASCIMENTOS)):
+        lista.append(Funcionario(username=f'func{n}', nome=f'Funcionário {n}', setor='Escritório', data_nascimento=nascimento, password_hash='x', grupo_sabado=grupo, horario_especial_09=especial))
+    db.session.add_all(lista + [Feriado(data=dia, nome=f'Feriado {dia}') for dia in FERIADOS]); db.session.commit()
+    return lista
+
+def _dias(inicio, fim): return [inicio + timedelta(days=n) for n in range((fim - inicio).days + 1)]
+
+def _divergencias(calendario_jornada, funcionarios, dias):
+    return [(f.username, dia, calendario_jornada.esperado(f, dia), get_expected_work_duration(f, dia)) for f in funcionarios for dia in dias if calendario_jornada.esperado(f, dia) != get_expected_work_duration(f, dia)]
+
+def test_intervalo_longo_igual_ao_calculo_dia_a_dia(funcionarios):
+    # Dez/2024 a Jan/2027: viradas de mês e de ano, semana ISO 53 (2026) e feriados em sábado/domingo
+    inicio, fim = date(2024, 12, 1), date(2027, 1, 31); calendario_jornada = CalendarioJornada(inicio, fim)
+    assert _divergencias(calendario_jornada, funcionarios, _dias(inicio, fim)) == []
+    for f in funcionarios: assert calendario_jornada.esperados(f) == {dia: get_expected_work_duration(f, dia) for dia in _dias(inicio, fim)}
+
+@pytest.mark.parametrize('inicio, fim', [
+    (date(2025, 1, 31), date(2025, 2, 1)), # virada de mês
+    (date(2025, 12, 27), date(2026, 1, 5)), # virada de ano no meio da semana ISO 1 de 2026
+    (date(2026, 12, 26), date(2027, 1, 4)), # semana ISO 53 de 2026 e semana 1 de 2027
+    (date(2028, 2, 27), date(2028, 3, 2)), # 29/02 de ano bissexto (feriado) e aniversário em 29/02
+    (date(2025, 3, 1), date(2025, 3, 1)), # intervalo de um dia só (sábado)
+])
+def test_intervalos_nas_viradas(funcionarios, inicio, fim):
+    assert _divergencias(CalendarioJornada(inicio, fim), funcionarios, _dias(inicio, fim)) == []
+
+def test_intervalo_invertido_e_dias_fora_do_intervalo(funcionarios):
+    calendario_jornada = CalendarioJornada(date(2025, 12, 31), date(2025, 12, 1))
+    assert (calendario_jornada.data_inicio, calendario_jornada.data_fim) == (date(2025, 12, 1), date(2025, 12, 31))
+    # Fora do intervalo carregado, cai no cálculo dia a dia (com a consulta do feriado)
+    assert _divergencias(calendario_jornada, funcionarios, [date(2025, 11, 15), date(2025, 11, 30), date(2026, 1, 1), date(2026, 1, 3)]) == []
+
+def test_grupos_de_sabado_alternam_por_semana(funcionarios):
+    grupo_a = next(f for f in funcionarios if f.grupo_sabado == 'A' and not f.horario_especial_09); grupo_b = next(f for f in funcionarios if f.grupo_sabado == 'B' and not f.horario_especial_09)
+    sem_grupo = next(f for f in funcionarios if f.grupo_sabado is None and not f.horario_especial_09); especial_a = next(f for f in funcionarios if f.grupo_sabado == 'A' and f.horario_especial_09)
+    calendario_jornada = CalendarioJornada(date(2025, 1, 6), date(2025, 1, 19))
+    # Semana de 06/01/2025 é do grupo B (a referência 01/01/2025 está na semana do grupo A); a seguinte é do A
+    assert calendario_jornada.esperado(grupo_b, date(2025, 1, 11)) == timedelta(hours=4) and calendario_jornada.esperado(grupo_a, date(2025, 1, 11)) == timedelta(0)
+    assert calendario_jornada.esperado(grupo_a, date(2025, 1, 18)) == timedelta(hours=4) and calendario_jornada.esperado(grupo_b, date(2025, 1, 18)) == timedelta(0)
+    assert calendario_jornada.esperado(grupo_a, date(2025, 1, 13)) == timedelta(hours=8) and calendario_jornada.esperado(grupo_b, date(2025, 1, 13)) == timedelta(hours=9)
+    assert calendario_jornada.esperado(especial_a, date(2025, 1, 13)) == timedelta(hours=7) and calendario_jornada.esperado(sem_grupo, date(2025, 1, 17)) == timedelta(hours=8)
+    assert calendario_jornada.esperado(sem_grupo, date(2025, 1, 11)) == timedelta(0) and calendario_jornada.esperado(grupo_a, date(2025, 1, 19)) == timedelta(0)
+
+def test_feriado_zera_a_jornada(funcionarios):
+    calendario_jornada = CalendarioJornada(date(2025, 11, 1), date(2025, 12, 31))
+    for f in funcionarios: assert calendario_jornada.esperado(f, date(2025, 11, 15)) == calendario_jornada.esperado(f, date(2025, 12, 25)) == timedelta(0)
+    assert calendario_jornada.nomes_feriados == {date(2025, 11, 15): 'Feriado 2025-11-15', date(2025, 12, 25): 'Feriado 2025-12-25'}
@@ -0,0 +1,18 @@
+import copy
+import pytest
+from sqlalchemy.exc import OperationalError
+from interno.estado import estado
+from interno.extensoes import db
+
+def test_comando_com_erro_nao_deixa_sobra_na_conexao(app):
+    app.config['CONSULTA_LENTA_SEGUNDOS'] = 0 # Toda consulta vai para a lista de lentas, com a duração medida
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql('SELECT 1').scalar()
+        # O início de cada comando fica no contexto dele: nada pode sobrar na conexão nem no registro dela no pool
+        antes = copy.deepcopy((conn.info, conn.connection.info))
+        for _ in range(3):
+            with pytest.raises(OperationalError): conn.exec_driver_sql('SELECT * FROM tabela_que_nao_existe')
+        assert (conn.info, conn.connection.info) == antes
+        conn.exec_driver_sql('WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 1000) SELECT count(*) FROM n').scalar()
+    ultima = estado().metricas.consultas_lentas[-1]
+    assert 'RECURSIVE' in ultima['sql'] and 0 <= ultima['duracao'] < 1
@@ -0,0 +1,42 @@
+from datetime import date, datetime, timedelta
+import pytest
+from interno.extensoes import db
+from interno.jornada import registrar_batida
+from interno.modelos import Funcionario, RegistroPonto
+
+@pytest.fixture
+def func(app):
+    f = Funcionario(username='func', nome='Func', setor='Expedição', data_nascimento=date(1990, 5, 5)); f.set_password('senha')
+    db.session.add(f); db.session.commit(); return f
+
+def _abertos(f_id): return RegistroPonto.query.filter_by(funcionario_id=f_id, timestamp_saida=None).count()
+
+def _bater(f_id, momento):
+    tipo = registrar_batida(f_id, momento); db.session.commit(); return tipo
+
+def test_toque_duplo_dentro_da_janela_e_ignorado(app, func):
+    inicio = datetime(2025, 3, 10, 8); janela = app.config['PONTO_JANELA_DUPLICIDADE_SEGUNDOS']
+    assert _bater(func.id, inicio) == 'entrada'
+    assert _bater(func.id, inicio + timedelta(seconds=janela - 1)) == 'duplicado'
+    assert _bater(func.id, inicio + timedelta(hours=4)) == 'saida' and _bater(func.id, inicio + timedelta(hours=4, seconds=1)) == 'duplicado'
+    assert RegistroPonto.query.count() == 1 and _abertos(func.id) == 0
+
+def test_entrada_e_saida_alternam(app, func):
+    inicio = datetime(2025, 3, 10, 8); tipos = [_bater(func.id, inicio + timedelta(hours=h)) for h in (0, 4, 5, 9)]
+    assert tipos == ['entrada', 'saida', 'entrada', 'saida']
+    assert [(r.timestamp_entrada.hour, r.timestamp_saida.hour) for r in RegistroPonto.query.order_by(RegistroPonto.timestamp_entrada)] == [(8, 12), (13, 17)]
+
+@pytest.mark.parametrize('recuo', [timedelta(0), timedelta(minutes=5), timedelta(days=1)])
+def test_relogio_atrasado_nunca_abre_segundo_registro(app, func, recuo):
+    app.config['PONTO_JANELA_DUPLICIDADE_SEGUNDOS'] = 0; entrada = datetime(2025, 3, 10, 8)
+    assert _bater(func.id, entrada) == 'entrada'
+    assert _bater(func.id, entrada - recuo) == 'rejeitado'
+    assert RegistroPonto.query.count() == 1 and _abertos(func.id) == 1
+    assert _bater(func.id, entrada + timedelta(hours=1)) == 'saida' and _abertos(func.id) == 0
+
+def test_rota_registrar_ponto_alterna_sem_duplicar(app, func):
+    cliente = app.test_client(); cliente.post('/login', data={'username': 'func', 'password': 'senha'})
+    cliente.post('/registrar_ponto'); resposta = cliente.post('/registrar_ponto', follow_redirects=True)
+    assert 'batida repetida foi ignorada' in resposta.get_data(as_text=True) and _abertos(func.id) == 1
+    app.config['PONTO_JANELA_DUPLICIDADE_SEGUNDOS'] = 0; cliente.post('/registrar_ponto')
+    assert RegistroPonto.query.count() == 1 and _abertos(func.id) == 0
@@ -0,0 +1,104 @@
+from datetime import date, datetime
+import pytest
+from interno.extensoes import db
+from interno.jornada import get_expected_work_duration
+from interno.modelos import Feriado, Funcionario, RegistroPonto, SaldoDiario
+
+def _recalculado():
+    """Banco de horas calculado direto dos registros, dia a dia: {(funcionario_id, dia): (trabalhado_s, esperado_s, saldo_s)}."""
+    trabalhado = {}
+    for r in RegistroPonto.query:
+        chave = (r.funcionario_id, r.timestamp_entrada.date())
+        trabalhado[chave] = trabalhado.get(chave, 0) + (int((r.timestamp_saida - r.timestamp_entrada).total_seconds()) if r.timestamp_saida else 0)
+    resultado = {}
+    for (f_id, dia), t in trabalhado.items():
+        e = int(get_expected_work_duration(db.session.get(Funcionario, f_id), dia).total_seconds()); resultado[(f_id, dia)] = (t, e, t - e)
+    return resultado
+
+def _salvo():
+    db.session.expire_all()
+    return {(s.funcionario_id, s.data): (s.trabalhado_segundos, s.esperado_segundos, s.saldo_segundos) for s in SaldoDiario.query}
+
+def _confere():
+    salvo = _salvo(); assert salvo == _recalculado(); return salvo
+
+@pytest.fixture
+def funcs(app):
+    admin = Funcionario(username='admin', nome='Admin', setor='Escritório', data_nascimento=date(1980, 1, 1), role='admin')
+    # func1: grupo A do sábado; func2: grupo B e entrada às 09:00
+    func1 = Funcionario(username='func1', nome='Func 1', setor='Expedição', data_nascimento=date(1990, 3, 12), grupo_sabado='A')
+    func2 = Funcionario(username='func2', nome='Func 2', setor='Escritório', data_nascimento=date(1985, 7, 1), grupo_sabado='B', horario_especial_09=True)
+    for f in (admin, func1, func2): f.set_password('senha')
+    db.session.add_all([admin, func1, func2]); db.session.commit(); return func1, func2
+
+@pytest.fixture
+def admin(app, funcs):
+    cliente = app.test_client(); cliente.post('/login', data={'username': 'admin', 'password': 'senha'}); return cliente
+
+def _adicionar(admin, f_id, dia, entrada, saida):
+    resposta = admin.post('/admin/ponto/add', data={'funcionario_id': str(f_id), 'data': dia.isoformat(), 'entrada': entrada, 'saida': saida})
+    assert resposta.status_code == 302; return RegistroPonto.query.order_by(RegistroPonto.id.desc()).first()
+
+def test_batidas_mantem_o_saldo_do_dia(app, funcs):
+    func1, _ = funcs; app.config['PONTO_JANELA_DUPLICIDADE_SEGUNDOS'] = 0
+    cliente = app.test_client(); cliente.post('/login', data={'username': 'func1', 'password': 'senha'})
+    cliente.post('/registrar_ponto')
+    salvo = _confere(); assert list(salvo) == [(func1.id, datetime.utcnow().date())] and salvo[(func1.id, datetime.utcnow().date())][0] == 0 # Entrada em aberto: nada trabalhado ainda
+    cliente.post('/registrar_ponto'); _confere()
+    assert RegistroPonto.query.filter_by(timestamp_saida=None).count() == 0
+
+def test_registro_manual_adicionar_editar_e_apagar(admin, funcs):
+    func1, func2 = funcs; segunda, quarta, sabado = date(2025, 3, 10), date(2025, 3, 12), date(2025, 3, 15)
+    _adicionar(admin, func1.id, segunda, '08:00', '12:00'); _adicionar(admin, func1.id, segunda, '13:00', '18:30')
+    _adicionar(admin, func1.id, quarta, '08:00', '10:00'); _adicionar(admin, func2.id, sabado, '08:00', '12:00')
+    salvo = _confere()
+    assert salvo[(func1.id, segunda)][0] == 9.5 * 3600 and salvo[(func1.id, quarta)] == (7200, 8 * 3600, 7200 - 8 * 3600)
+    registro = _adicionar(admin, func2.id, segunda, '09:00', '17:00'); _confere()
+    # Move o registro para outro funcionário e outro dia: os dois pares (antigo e novo) são recalculados
+    admin.post(f'/admin/ponto/edit/{registro.id}', data={'funcionario_id': str(func1.id), 'data': sabado.isoformat(), 'entrada': '08:00', 'saida': '11:00'})
+    salvo = _confere(); assert (func2.id, segunda) not in salvo and (func1.id, sabado) in salvo
+    # Apagar o único registro do dia remove o saldo do dia
+    admin.post(f'/admin/ponto/delete/{RegistroPonto.query.filter_by(funcionario_id=func1.id, timestamp_entrada=datetime(2025, 3, 12, 8)).one().id}')
+    assert (func1.id, quarta) not in _confere()
+
+def test_feriado_criado_e_removido_recalcula_o_esperado(admin, funcs):
+    func1, func2 = funcs; dia = date(2025, 3, 11)
+    _adicionar(admin, func1.id, dia, '08:00', '12:00'); _adicionar(admin, func2.id, dia, '09:00', '12:00')
+    assert all(esperado > 0 for _, esperado, _ in _confere().values())
+    admin.post('/admin/calendario', data={'data_feriado': dia.isoformat(), 'nome_feriado': 'Feriado municipal'})
+    assert all(esperado == 0 for _, esperado, _ in _confere().values())
+    admin.post(f'/admin/feriado/delete/{Feriado.query.one().id}')
+    assert all(esperado > 0 for _, esperado, _ in _confere().values())
+
+def test_importacao_usa_o_caminho_em_massa(app, funcs, tmp_path):
+    func1, func2 = funcs; arquivo = tmp_path / 'ponto.csv'
+    linhas = [f'{f.id};2025-03-{d:02d};08:00;12:00' for f in funcs for d in range(10, 16)] + [f'{func1.id};2025-03-10;13:00;17:00']
+    arquivo.write_text('funcionario_id;data;entrada;saida\n' + '\n'.join(linhas) + '\n', encoding='utf-8')
+    resultado = app.test_cli_runner().invoke(args=['import-ponto', str(arquivo)])
+    assert '13 registro(s) de ponto importado(s)' in resultado.output, resultado.output
+    assert len(_confere()) == 12
+    # Reimportar o mesmo dia soma ao saldo existente (bulk update)
+    arquivo.write_text(f'funcionario_id;data;entrada;saida\n{func2.id};2025-03-10;13:00;14:00\n', encoding='utf-8')
+    app.test_cli_runner().invoke(args=['import-ponto', str(arquivo)]); assert _confere()[(func2.id, date(2025, 3, 10))][0] == 5 * 3600
+
+def test_verificar_saldos_acha_e_corrige_divergencias(app, admin, funcs):
+    func1, func2 = funcs
+    for f, d in ((func1, 10), (func1, 11), (func2, 10)): _adicionar(admin, f.id, date(2025, 3, d), '08:00', '12:00')
+    cli = app.test_cli_runner(); assert 'Banco de horas consistente.' in cli.invoke(args=['verificar-saldos']).output
+    # Desvios: trabalhado alterado, só o saldo alterado, saldo apagado e saldo de um dia sem registros
+    SaldoDiario.query.filter_by(funcionario_id=func1.id, data=date(2025, 3, 10)).one().trabalhado_segundos = 1
+    SaldoDiario.query.filter_by(funcionario_id=func1.id, data=date(2025, 3, 11)).one().saldo_segundos = 0
+    SaldoDiario.query.filter_by(funcionario_id=func2.id).delete()
+    db.session.add(SaldoDiario(funcionario_id=func1.id, data=date(2025, 3, 20), trabalhado_segundos=3600, esperado_segundos=0, saldo_segundos=3600)); db.session.commit()
+    saida = cli.invoke(args=['verificar-saldos']).output
+    assert '4 dia(s) divergente(s).' in saida and f'Divergência funcionário {func1.id} em 2025-03-10' in saida and f'Divergência funcionário {func1.id} em 2025-03-11' in saida and 'Divergências corrigidas.' not in saida
+    assert _salvo() != _recalculado()
+    assert 'Divergências corrigidas.' in cli.invoke(args=['verificar-saldos', '--corrigir']).output
+    _confere(); assert 'Banco de horas consistente.' in cli.invoke(args=['verificar-saldos']).output
+
+def test_rebuild_saldos_reconstroi_do_zero(app, admin, funcs):
+    func1, func2 = funcs
+    for f, d in ((func1, 10), (func2, 15)): _adicionar(admin, f.id, date(2025, 3, d), '08:00', '12:00')
+    SaldoDiario.query.delete(); db.session.commit(); assert _salvo() == {}
+    assert 'Banco de horas reconstruído: 2 dia(s) calculado(s).' in app.test_cli_runner().invoke(args=['rebuild-saldos']).output
+    _confere()
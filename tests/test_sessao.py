@@ -0,0 +1,31 @@
+from datetime import date
+import pytest
+from conftest import CONFIG_TESTES
+from interno import create_app
+from interno.extensoes import db
+from interno.modelos import Funcionario, RegistroPonto
+
+@pytest.fixture
+def dois_workers(app_arquivo):
+    """Dois apps no mesmo banco, cada um com seu estado em memória (como dois workers do gunicorn)."""
+    db.create_all()
+    for username, role in (('admin', 'admin'), ('func', 'user')):
+        f = Funcionario(username=username, nome=username.title(), setor='Escritório', data_nascimento=date(1990, 1, 1), role=role); f.set_password('senha'); db.session.add(f)
+    db.session.commit()
+    outro = create_app(dict(CONFIG_TESTES, SQLALCHEMY_DATABASE_URI=app_arquivo.config['SQLALCHEMY_DATABASE_URI']))
+    for app in (app_arquivo, outro): app.config['CACHE_VERSOES_TTL_SEGUNDOS'] = 0 # Relê as versões a cada requisição
+    yield app_arquivo, outro
+    with outro.app_context(): db.engine.dispose()
+
+def _logar(app, username):
+    cliente = app.test_client(); resposta = cliente.post('/login', data={'username': username, 'password': 'senha'})
+    assert resposta.status_code == 302 and '/login' not in resposta.location
+    return cliente
+
+def test_funcionario_excluido_perde_a_sessao_nos_outros_workers(dois_workers):
+    worker_a, worker_b = dois_workers; admin = _logar(worker_a, 'admin'); func = _logar(worker_b, 'func')
+    assert func.get('/ponto').status_code == 200 # Usuário agora no cache do worker B
+    func_id = Funcionario.query.filter_by(username='func').one().id
+    assert admin.post(f'/admin/funcionario/delete/{func_id}').status_code == 302 and db.session.get(Funcionario, func_id) is None
+    assert func.get('/ponto').status_code == 302
+    assert func.post('/registrar_ponto').status_code == 302 and RegistroPonto.query.count() == 0
@@ -0,0 +1,76 @@
+from datetime import date, datetime, timedelta
+import pytest
+from interno.extensoes import db
+from interno.modelos import BatidaSincronizada, Funcionario, RegistroPonto
+
+@pytest.fixture
+def cliente(app):
+    for username in ('func', 'outro'):
+        f = Funcionario(username=username, nome=username.title(), setor='Expedição', data_nascimento=date(1990, 5, 5)); f.set_password('senha'); db.session.add(f)
+    db.session.commit()
+    cliente = app.test_client(); cliente.post('/login', data={'username': 'func', 'password': 'senha'}); return cliente
+
+@pytest.fixture
+def func(cliente): return Funcionario.query.filter_by(username='func').one()
+
+def _iso(momento): return momento.isoformat() + 'Z'
+
+def _sincronizar(cliente, *batidas):
+    resposta = cliente.post('/ponto/sincronizar', json={'batidas': list(batidas)})
+    assert resposta.status_code == 200, resposta.get_data(as_text=True)
+    return {r['id']: r for r in resposta.get_json()['resultados']}
+
+def _batida(id_cliente, momento, funcionario_id): return {'id': id_cliente, 'capturado_em': _iso(momento), 'funcionario_id': funcionario_id}
+
+def test_aplica_em_ordem_cronologica(cliente, func):
+    base = datetime.utcnow().replace(microsecond=0) - timedelta(hours=3)
+    # Enviadas fora de ordem: o servidor ordena pelo horário capturado
+    resultados = _sincronizar(cliente, _batida('c', base + timedelta(hours=2), func.id), _batida('a', base, func.id), _batida('b', base + timedelta(hours=1), func.id))
+    assert {i: r['status'] for i, r in resultados.items()} == {'a': 'entrada', 'b': 'saida', 'c': 'entrada'}
+    assert all(r['motivo'] is None for r in resultados.values())
+    assert [(r.timestamp_entrada, r.timestamp_saida) for r in RegistroPonto.query.order_by(RegistroPonto.timestamp_entrada)] == [(base, base + timedelta(hours=1)), (base + timedelta(hours=2), None)]
+
+def test_reenvio_nao_duplica_e_devolve_o_status_original(cliente, func):
+    momento = datetime.utcnow().replace(microsecond=0) - timedelta(minutes=30)
+    assert _sincronizar(cliente, _batida('x', momento, func.id))['x']['status'] == 'entrada'
+    reenvio = _sincronizar(cliente, _batida('x', momento, func.id))['x']
+    assert reenvio['status'] == 'ja_recebida' and reenvio['status_original'] == 'entrada' and reenvio['motivo'] == 'Batida já recebida antes.'
+    # Id repetido dentro do mesmo lote também é aplicado uma vez só
+    repetido = _sincronizar(cliente, _batida('y', momento + timedelta(minutes=10), func.id), _batida('y', momento + timedelta(minutes=10), func.id))
+    assert repetido['y']['status'] == 'saida' and RegistroPonto.query.count() == 1 and BatidaSincronizada.query.count() == 2
+
+def test_limites_de_horario(app, cliente, func):
+    agora = datetime.utcnow().replace(microsecond=0); dias = app.config['PONTO_OFFLINE_MAX_DIAS']; futuro = app.config['PONTO_OFFLINE_TOLERANCIA_FUTURO_SEGUNDOS']
+    resultados = _sincronizar(cliente, _batida('velha', agora - timedelta(days=dias, hours=1), func.id), _batida('futura', agora + timedelta(seconds=futuro + 60), func.id),
+                              _batida('adiantada', agora + timedelta(seconds=futuro // 2), func.id), {'id': 'invalida', 'capturado_em': 'ontem', 'funcionario_id': func.id}, {'capturado_em': _iso(agora)})
+    assert {i: (r['status'], r['motivo']) for i, r in resultados.items()} == {
+        'velha': ('rejeitado', 'Horário fora do intervalo aceito.'), 'futura': ('rejeitado', 'Horário fora do intervalo aceito.'), 'adiantada': ('entrada', None),
+        'invalida': ('rejeitado', 'Horário inválido.'), None: ('rejeitado', 'Batida sem identificador.')}
+    assert RegistroPonto.query.count() == 1
+
+def test_anterior_ao_ultimo_registro_e_recusada(cliente, func):
+    agora = datetime.utcnow().replace(microsecond=0)
+    cliente.post('/registrar_ponto'); cliente.post('/registrar_ponto')
+    assert RegistroPonto.query.count() == 1 # Janela de duplicidade: a segunda foi ignorada
+    resultado = _sincronizar(cliente, _batida('atrasada', agora - timedelta(hours=1), func.id))['atrasada']
+    assert (resultado['status'], resultado['motivo']) == ('rejeitado', 'Anterior ao último registro de ponto.')
+    assert db.session.get(BatidaSincronizada, 'atrasada').resultado == 'rejeitado' and RegistroPonto.query.count() == 1
+
+def test_batida_de_outro_usuario_fica_na_fila(cliente, func):
+    outro = Funcionario.query.filter_by(username='outro').one(); momento = datetime.utcnow().replace(microsecond=0) - timedelta(minutes=5)
+    resultado = _sincronizar(cliente, _batida('dele', momento, outro.id))['dele']
+    assert resultado['status'] == 'outro_usuario' and RegistroPonto.query.count() == 0 and BatidaSincronizada.query.count() == 0
+
+def test_lote_invalido(app, cliente):
+    assert cliente.post('/ponto/sincronizar', json={'batidas': 'x'}).status_code == 400
+    assert cliente.post('/ponto/sincronizar', json={'batidas': [{}] * (app.config['PONTO_OFFLINE_MAX_LOTE'] + 1)}).status_code == 400
+
+def test_batida_sem_dono_e_recusada(cliente, func):
+    momento = datetime.utcnow().replace(microsecond=0) - timedelta(minutes=5)
+    resultados = _sincronizar(cliente, {'id': 'sem-dono', 'capturado_em': _iso(momento)}, _batida('vazio', momento, ''))
+    assert {i: (r['status'], r['motivo']) for i, r in resultados.items()} == {'sem-dono': ('rejeitado', 'Batida sem funcionário identificado.'), 'vazio': ('rejeitado', 'Batida sem funcionário identificado.')}
+    assert RegistroPonto.query.count() == 0
+
+def test_formulario_da_batida_leva_o_dono(cliente, func):
+    # O service worker lê esse campo quando a batida fica na fila offline
+    assert f'name="funcionario_id" value="{func.id}"' in cliente.get('/ponto').get_data(as_text=True)